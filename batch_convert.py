@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Excel to PDF 一括変換ツール - 対話なしでディレクトリやglobパターンのファイルをまとめて変換する
+
+例:
+    python batch_convert.py ./input -o ./output --workers 8 --summary summary.json
+    python batch_convert.py "reports/**/*.xlsx" -o ./output --all-sheets --columns ALL
+    python batch_convert.py ./input -o ./output --merge
+"""
+
+import argparse
+import glob
+import json
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from conversion_cache import DEFAULT_MAX_BYTES, ConversionCache, default_cache_dir
+from metrics import Instrumentation
+from parallel_convert import ConversionResult, convert_files_parallel, resolve_workers
+
+SUPPORTED_EXTENSIONS = ['.xlsx', '.xls', '.xlsm']
+
+# globのワイルドカードを含むパスの要素
+_GLOB_MAGIC = re.compile(r"[*?[]")
+
+
+def _is_excel_file(path: Path) -> bool:
+    """変換対象のExcelファイルかどうか（Excelの一時ファイル ~$*.xlsx は除外）"""
+    return (path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
+            and not path.name.startswith("~$"))
+
+
+def _glob_root(pattern: str) -> Path:
+    """globパターンのワイルドカードより前の部分（"reports/**/*.xlsx" なら reports）"""
+    parts = Path(pattern).parts
+    for index, part in enumerate(parts):
+        if _GLOB_MAGIC.search(part):
+            return Path(*parts[:index]) if index else Path(".")
+    return Path(pattern).parent
+
+
+def collect_files(inputs: List[str], recursive: bool = False) -> List[Tuple[Path, Path]]:
+    """入力（ファイル・ディレクトリ・globパターン）から (ファイル, 基準ディレクトリ) のリストを作る
+
+    基準ディレクトリは出力先にサブディレクトリ構成を再現するために使う
+    （globパターンではワイルドカードより前の部分）。
+    同じファイルが複数回指定された場合は最初の1回だけ残す。
+    """
+    found = []
+    seen = set()
+
+    def add(path: Path, root: Path):
+        key = path.resolve()
+        if key not in seen and _is_excel_file(path):
+            seen.add(key)
+            found.append((path, root))
+
+    for pattern in inputs:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = path.rglob("*") if recursive else path.iterdir()
+            for candidate in sorted(candidates):
+                add(candidate, path)
+        elif path.is_file():
+            add(path, path.parent)
+        else:
+            root = _glob_root(pattern)
+            for match in sorted(glob.glob(pattern, recursive=True)):
+                add(Path(match), root)
+    return found
+
+
+def find_output_conflicts(jobs: List[Tuple[str, str]]) -> Dict[str, str]:
+    """出力ファイルが他のファイルと同じになるジョブを探す
+
+    出力ファイル名は入力ファイル名の拡張子を除いた部分から作るため、同じ出力
+    ディレクトリに同じ名前（a/x.xlsx と b/x.xlsx を --flat で変換する場合や、
+    x.xlsx と x.xlsm）があると、同時に同じファイルへ書き込んでしまう。
+    {後のファイル: 先に同じ出力先を使うファイル} を返す。
+    """
+    owners = {}
+    conflicts = {}
+    for path, output_dir in jobs:
+        # Windowsなどではファイル名の大文字・小文字を区別しない
+        key = (Path(output_dir).resolve(), Path(path).stem.casefold())
+        owner = owners.setdefault(key, path)
+        if owner != path:
+            conflicts[path] = owner
+    return conflicts
+
+
+def build_summary(results, files: List[Tuple[Path, Path]], started_at: datetime,
+                  duration: float, options: dict) -> dict:
+    """ファイルごとの変換結果をJSONに書き出せる形にまとめる"""
+    by_file = {}
+    for result in results:
+        by_file.setdefault(result.excel_path, []).append(result)
+
+    entries = []
+    for path, _root in files:
+        file_results = by_file.get(str(path), [])
+        errors = [r.error for r in file_results if not r.ok]
+        entries.append({
+            "path": str(path),
+            "status": "error" if errors or not file_results else "ok",
+            "duration": round(sum(r.duration for r in file_results), 3),
+            "outputs": [
+                {"sheet": r.sheet_name, "word": r.word_path, "pdf": r.pdf_path}
+                for r in file_results if r.ok
+            ],
+            "errors": [
+                {"sheet": r.sheet_name, "error": r.error}
+                for r in file_results if not r.ok
+            ],
+        })
+
+    failed = sum(1 for entry in entries if entry["status"] != "ok")
+    return {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "duration": round(duration, 3),
+        "total": len(entries),
+        "succeeded": len(entries) - failed,
+        "failed": failed,
+        "options": options,
+        "files": entries,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='ディレクトリやglobパターンに一致するExcelファイルを対話なしで一括変換します')
+    parser.add_argument('inputs', nargs='+', help='Excelファイル、ディレクトリ、またはglobパターン（例: "data/**/*.xlsx"）')
+    parser.add_argument('-o', '--output', required=True, help='出力ディレクトリ')
+    parser.add_argument('-r', '--recursive', action='store_true', help='ディレクトリをサブディレクトリまで検索する')
+    parser.add_argument('--flat', action='store_true',
+                        help='出力先にサブディレクトリ構成を再現せず、すべて同じディレクトリに出力する')
+    sheet_group = parser.add_mutually_exclusive_group()
+    sheet_group.add_argument('--all-sheets', action='store_true', help='すべてのシートを変換する')
+    sheet_group.add_argument('--sheet', help='変換するシート名（省略時はアクティブシート）')
+    sheet_group.add_argument('--merge', action='store_true',
+                             help='ファイルごとにすべてのシートを1つのPDFにまとめる（シートごとのしおり付き、PDFのみ）')
+    parser.add_argument('--columns', default='B',
+                        help='変換する列（カンマ区切り、例: B / A,C / C:F / ALL）デフォルト: B')
+    parser.add_argument('--format', choices=['pdf', 'docx', 'both'], default='pdf',
+                        help='出力形式（デフォルト: pdf）')
+    parser.add_argument('--table', action='store_true', help='通常モード（表形式）で出力する（デフォルトはテキストのみ）')
+    parser.add_argument('--font', default='HeiseiKakuGo-W5', help='PDFのフォント（CIDフォント名）デフォルト: HeiseiKakuGo-W5')
+    parser.add_argument('--font-size', type=float, default=10, help='PDFの文字サイズ（ポイント）デフォルト: 10')
+    parser.add_argument('-j', '--workers', type=int, default=0, help='並列数（0はCPUコア数）')
+    parser.add_argument('--summary', help='変換結果のサマリーを書き出すJSONファイル')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='変換結果のキャッシュを使わず、すべてのファイルを変換し直す')
+    parser.add_argument('--cache-dir', help=f'キャッシュの保存先（デフォルト: {default_cache_dir()}）')
+    parser.add_argument('--cache-size-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f'キャッシュの合計サイズの上限（MB）デフォルト: {DEFAULT_MAX_BYTES // (1024 * 1024)}')
+    parser.add_argument('--metrics', help='段階ごとの計測結果（時間・行数・ページ数）を追記するJSON Linesファイル')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='段階ごとに、開始時から増えたメモリの最大値も計測する（tracemallocを使うため遅くなる）')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='cProfileで計測してpstats形式で保存する（1プロセスで順番に変換し、キャッシュは使わない）')
+    parser.add_argument('--pdf-memory-limit', type=float, metavar='MB',
+                        help='PDFのページをメモリに保持する上限（MB、ワーカーごと）。超えたページはディスクへ書き出す')
+    parser.add_argument('-v', '--verbose', action='store_true', help='ファイルごとの詳細メッセージを表示する')
+    args = parser.parse_args(argv)
+    if args.merge and args.format != 'pdf':
+        parser.error('--merge はPDFのみを出力します（--format pdf）')
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """メイン関数（終了コードを返す）"""
+    args = parse_args(argv)
+
+    files = collect_files(args.inputs, args.recursive)
+    if not files:
+        print("❌ 変換対象のExcelファイルが見つかりませんでした")
+        return 1
+
+    output_root = Path(args.output)
+    jobs = []
+    for path, root in files:
+        if args.flat:
+            output_dir = output_root
+        else:
+            # 入力ディレクトリからの相対パスを出力先に再現する（同名ファイルの上書きを防ぐ）
+            output_dir = output_root / path.parent.relative_to(root)
+        jobs.append((str(path), str(output_dir)))
+    conflicts = find_output_conflicts(jobs)
+    for path, owner in conflicts.items():
+        print(f"❌ {path}: 出力ファイル名が {owner} と同じになるため変換しません")
+    jobs = [job for job in jobs if job[0] not in conflicts]
+
+    selected_columns = [col.strip().upper() for col in args.columns.split(",") if col.strip()] or ["B"]
+    # cProfileはこのプロセスしか計測できないため、プロファイル時は並列にしない
+    workers = 1 if args.profile else resolve_workers(args.workers)
+    options = {
+        "text_only": not args.table,
+        "selected_columns": selected_columns,
+        "outputs": ['docx', 'pdf'] if args.format == 'both' else [args.format],
+        "font_name": args.font,
+        "font_size": args.font_size,
+        "leading": args.font_size * 1.2,
+        "pdf_memory_limit": None if args.pdf_memory_limit is None else int(args.pdf_memory_limit * 1024 * 1024),
+    }
+    # 内容と設定が前回と同じファイルはキャッシュの出力をコピーするだけで済ませる
+    cache = None
+    if not args.no_cache and not args.profile:
+        cache = ConversionCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024 * 1024)
+    print(f"🔄 {len(jobs)}個のファイルを変換します（並列数: {min(workers, len(jobs))}）")
+
+    def show_progress(done, total, file_results):
+        if isinstance(file_results, Exception):
+            print(f"[{done}/{total}] ❌ {file_results}")
+            return
+        path = file_results[0].excel_path if file_results else ""
+        errors = [r for r in file_results if not r.ok]
+        duration = sum(r.duration for r in file_results)
+        if errors:
+            print(f"[{done}/{total}] ❌ {path}: {errors[0].error}")
+        else:
+            print(f"[{done}/{total}] ✅ {path} ({duration:.1f}秒)")
+
+    started_at = datetime.now()
+    started = time.perf_counter()
+    instrumentation = None
+    if args.metrics or args.trace_memory:
+        # ワーカープロセスはそれぞれ同じファイルに1行ずつ追記する
+        instrumentation = Instrumentation(metrics_file=args.metrics, trace_memory=args.trace_memory)
+
+    def run():
+        return convert_files_parallel(
+            jobs, all_sheets=args.all_sheets, sheet_name=args.sheet, merge=args.merge, workers=workers,
+            progress=show_progress, quiet=not args.verbose, cache=cache,
+            instrumentation=instrumentation, parallel_outputs=not args.profile, **options,
+        )
+
+    if args.profile:
+        from metrics import profiled
+        with profiled(args.profile):
+            results = run()
+    else:
+        results = run()
+    duration = time.perf_counter() - started
+    results.extend(
+        ConversionResult(path, error=f"出力ファイル名が {owner} と同じになるため変換しませんでした")
+        for path, owner in conflicts.items()
+    )
+
+    summary = build_summary(results, files, started_at, duration, {
+        **options,
+        "all_sheets": args.all_sheets,
+        "merge": args.merge,
+        "sheet": args.sheet,
+        "workers": workers,
+        "cache": str(cache.cache_dir) if cache else None,
+        "metrics": args.metrics,
+    })
+    if args.summary:
+        summary_path = Path(args.summary)
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"📝 サマリー: {summary_path}")
+
+    print(f"\n✅ 成功: {summary['succeeded']}  ❌ 失敗: {summary['failed']}  ⏱ {duration:.1f}秒")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+変換処理のベンチマーク
+
+openpyxlで合成したワークブック（行数・列数・シート数・セルの文字数・
+日本語/英数字・密/疎を変えたもの）を使い、変換の各段階
+（get_sheet_names, read_excel, create_word_document, convert_to_pdf_from_data）の
+時間と、読み取りから出力までを通した convert の時間を、
+テキストのみモードと通常モード（表形式）で別々に測定する。
+各ケースは別のプロセスで実行し、段階ごとの処理時間・行数/秒・その段階で増えた
+最大メモリ使用量（peak RSSの増加量）と、ケース全体の最大メモリ使用量をJSONに保存する。
+保存済みの結果（ベースライン）と比較すると、遅くなった段階を表示する。
+
+例:
+    python benchmark.py --preset quick -o bench.json
+    python benchmark.py --rows 1000,100000 --cols 5 --lang ja,ascii --layout dense,sparse
+    python benchmark.py --preset quick --baseline bench.json   # 前回の結果と比較
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+# 測定する段階（この順に実行する）。convert は読み取りから出力までを通した時間（行を逐次流す経路）
+STAGES = ['get_sheet_names', 'read_excel', 'create_word_document', 'convert_to_pdf_from_data', 'convert']
+
+# 変換モード -> ExcelToWordPDFConverterの引数
+MODES = {
+    'text': {'text_only': True},
+    'table': {'text_only': False},
+}
+
+# 用意されたケースの組み合わせ
+PRESETS = {
+    'quick': dict(rows=[1000], cols=[3], sheets=[1], text_len=[20], lang=['ja'], layout=['dense']),
+    'default': dict(rows=[1000, 10000], cols=[1, 10], sheets=[1], text_len=[20],
+                    lang=['ja', 'ascii'], layout=['dense', 'sparse']),
+    'full': dict(rows=[1000, 100000, 1000000], cols=[1, 10, 1000], sheets=[1, 5], text_len=[10, 100],
+                 lang=['ja', 'ascii'], layout=['dense', 'sparse']),
+}
+
+# ベースラインより何倍遅くなったら遅延（regression）とみなすか
+DEFAULT_THRESHOLD = 1.2
+
+_JA_CHARS = "日本語のテキストを変換する試験データです漢字ひらがなカタカナ東京大阪名古屋"
+_ASCII_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+def make_text(rng: random.Random, length: int, lang: str) -> str:
+    """指定した長さのセル文字列を作る（単語の区切りとして時々空白を入れる）"""
+    chars = _JA_CHARS if lang == 'ja' else _ASCII_CHARS
+    text = "".join(rng.choice(chars) for _ in range(length))
+    if lang == 'ascii' and length > 8:
+        # 英数字は単語単位で折り返されるため、適度に空白を入れる
+        text = " ".join(text[i:i + 8] for i in range(0, length, 8))[:length]
+    return text
+
+
+def generate_workbook(path, rows: int, cols: int, sheets: int = 1, text_len: int = 20,
+                      lang: str = 'ja', layout: str = 'dense', seed: int = 0):
+    """合成ワークブックを作る（.xlsx/.xlsmは拡張子で決まる）
+
+    1行目は見出し行。layout='sparse' の場合は各行の約1割のセルだけに値を入れる。
+    同じ引数なら同じ内容になる。
+    """
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    # 文字列を毎回作ると生成に時間がかかるため、候補を用意して使い回す
+    pool = [make_text(rng, text_len, lang) for _ in range(997)]
+    workbook = Workbook(write_only=True)
+    for sheet_index in range(sheets):
+        sheet = workbook.create_sheet(f"Sheet{sheet_index + 1}")
+        sheet.append([f"列{col + 1}" if lang == 'ja' else f"Column{col + 1}" for col in range(cols)])
+        for row in range(rows):
+            if layout == 'sparse':
+                values = [None] * cols
+                for col in range(cols):
+                    if rng.random() < 0.1:
+                        values[col] = pool[(row * cols + col) % len(pool)]
+                if not any(values):
+                    values[row % cols] = pool[row % len(pool)]  # 空行にしない
+            else:
+                values = [pool[(row * cols + col) % len(pool)] for col in range(cols)]
+            sheet.append(values)
+    workbook.save(str(path))
+
+
+def peak_rss_mb() -> Optional[float]:
+    """このプロセスの最大メモリ使用量（MB）。取得できない場合はNone"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # LinuxはKB、macOSはバイト単位
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def case_id(case: dict) -> str:
+    """ケースを識別する文字列（ベースラインとの対応付けに使う）"""
+    return (f"{case['format']}-r{case['rows']}-c{case['cols']}-s{case['sheets']}-"
+            f"t{case['text_len']}-{case['lang']}-{case['layout']}-{case['mode']}")
+
+
+def run_case(case: dict) -> dict:
+    """1つのケースを現在のプロセスで実行し、段階ごとの測定結果を返す"""
+    from excel_to_pdf import ExcelToWordPDFConverter
+
+    converter = ExcelToWordPDFConverter(selected_columns=['ALL'], **MODES[case['mode']])
+    workbook_path = case['workbook']
+    stages = {}
+    data = None
+    with tempfile.TemporaryDirectory() as output_dir, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for stage in STAGES:
+            rss_started = peak_rss_mb()
+            started = time.perf_counter()
+            cpu_started = time.process_time()
+            if stage == 'get_sheet_names':
+                sheet_names = converter.get_sheet_names(workbook_path)
+            elif stage == 'read_excel':
+                data = converter.read_excel(workbook_path, sheet_names[0])
+            elif stage == 'create_word_document':
+                converter.create_word_document(data, os.path.join(output_dir, "out.docx"))
+            elif stage == 'convert_to_pdf_from_data':
+                converter.convert_to_pdf_from_data(data, os.path.join(output_dir, "out.pdf"))
+            else:
+                converter.convert(workbook_path, output_dir, sheet_names[0])
+            wall = time.perf_counter() - started
+            rows = len(data) if data is not None and stage != 'get_sheet_names' else 0
+            stages[stage] = {
+                "seconds": round(wall, 4),
+                "cpu_seconds": round(time.process_time() - cpu_started, 4),
+                "rows": rows,
+                "rows_per_sec": round(rows / wall, 1) if rows and wall > 0 else None,
+                # プロセス全体の最大値は前の段階の分も含むため、この段階で増えた分だけを記録する
+                "rss_increase_mb": _rss_increase(rss_started, peak_rss_mb()),
+            }
+    return {"id": case_id(case), "case": {k: v for k, v in case.items() if k != 'workbook'},
+            "stages": stages, "peak_rss_mb": _round(peak_rss_mb())}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def _rss_increase(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    """段階の前後の最大メモリ使用量の差（MB）。前の段階の最大値を超えなかった場合は0"""
+    if before is None or after is None:
+        return None
+    return _round(after - before)
+
+
+def run_case_subprocess(case: dict, timeout: Optional[float] = None) -> dict:
+    """ケースを別のプロセスで実行する（最大メモリ使用量をケースごとに測るため）"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-case", json.dumps(case)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, timeout=timeout)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        return {"id": case_id(case), "case": {k: v for k, v in case.items() if k != 'workbook'},
+                "error": error[-1] if error else f"終了コード {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def build_cases(grid: dict, modes: List[str], formats: List[str], workdir: Path) -> List[dict]:
+    """パラメーターの組み合わせからケースのリストを作り、必要なワークブックを生成する"""
+    cases = []
+    keys = ['rows', 'cols', 'sheets', 'text_len', 'lang', 'layout']
+    for fmt, values in itertools.product(formats, itertools.product(*(grid[key] for key in keys))):
+        params = dict(zip(keys, values))
+        name = (f"bench-r{params['rows']}-c{params['cols']}-s{params['sheets']}-t{params['text_len']}-"
+                f"{params['lang']}-{params['layout']}.{fmt}")
+        workbook_path = workdir / name
+        if not workbook_path.exists():
+            # 生成済みのワークブックは使い回す（大きなワークブックの生成は時間がかかる）
+            print(f"📄 ワークブックを生成中: {workbook_path.name}")
+            temp_path = workbook_path.with_name(f".tmp-{workbook_path.name}")
+            generate_workbook(temp_path, **params)
+            os.replace(temp_path, workbook_path)
+        for mode in modes:
+            cases.append({**params, "format": fmt, "mode": mode, "workbook": str(workbook_path)})
+    return cases
+
+
+def compare_results(results: List[dict], baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """ベースラインと比較し、threshold倍以上遅くなった段階の説明を返す"""
+    previous = {result["id"]: result for result in baseline.get("results", [])}
+    regressions = []
+    print(f"\n{'ケース / 段階':<60}{'前回(秒)':>10}{'今回(秒)':>10}{'比':>8}")
+    for result in results:
+        before = previous.get(result["id"])
+        if before is None or "stages" not in before or "stages" not in result:
+            continue
+        for stage in STAGES:
+            old = before["stages"].get(stage, {}).get("seconds")
+            new = result["stages"].get(stage, {}).get("seconds")
+            if not old or new is None:
+                continue
+            ratio = new / old
+            # ごく短い段階は誤差が大きいため、10ms未満の差は遅延とみなさない
+            slow = ratio >= threshold and new - old >= 0.01
+            mark = " ⚠️" if slow else ""
+            print(f"{result['id'] + ' / ' + stage:<60}{old:>10.3f}{new:>10.3f}{ratio:>7.2f}x{mark}")
+            if slow:
+                regressions.append(f"{result['id']} / {stage}: {old:.3f}秒 → {new:.3f}秒 ({ratio:.2f}倍)")
+    return regressions
+
+
+def print_results(results: List[dict]):
+    print(f"\n{'ケース':<52}{'段階':<28}{'秒':>9}{'行/秒':>12}{'RSS増(MB)':>10}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['id']:<52}❌ {result['error']}")
+            continue
+        for stage, metrics in result["stages"].items():
+            rate = f"{metrics['rows_per_sec']:.0f}" if metrics["rows_per_sec"] else "-"
+            rss = f"{metrics['rss_increase_mb']:.0f}" if metrics.get("rss_increase_mb") is not None else "-"
+            print(f"{result['id']:<52}{stage:<28}{metrics['seconds']:>9.3f}{rate:>12}{rss:>10}")
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(value) for value in text.split(",") if value.strip()]
+
+
+def _str_list(text: str) -> List[str]:
+    return [value.strip() for value in text.split(",") if value.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='合成ワークブックで変換の各段階の性能を測定します')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick',
+                        help='ケースの組み合わせ（個別の指定で上書きできる）デフォルト: quick')
+    parser.add_argument('--rows', type=_int_list, help='行数（カンマ区切り、例: 1000,100000）')
+    parser.add_argument('--cols', type=_int_list, help='列数（カンマ区切り、例: 1,10,1000）')
+    parser.add_argument('--sheets', type=_int_list, help='シート数（カンマ区切り）')
+    parser.add_argument('--text-len', type=_int_list, help='セルの文字数（カンマ区切り）')
+    parser.add_argument('--lang', type=_str_list, help='セルの文字種（ja / ascii、カンマ区切り）')
+    parser.add_argument('--layout', type=_str_list, help='セルの配置（dense / sparse、カンマ区切り）')
+    parser.add_argument('--modes', type=_str_list, default=list(MODES),
+                        help='変換モード（text / table、カンマ区切り）デフォルト: text,table')
+    parser.add_argument('--formats', type=_str_list, default=['xlsx'],
+                        help='ファイル形式（xlsx / xlsm、カンマ区切り）デフォルト: xlsx')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'excel-to-pdf-bench'),
+                        help='生成したワークブックの保存先（次回以降も使い回す）')
+    parser.add_argument('-o', '--output', help='結果を書き出すJSONファイル')
+    parser.add_argument('--baseline', help='比較するベースライン（以前の結果のJSONファイル）')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'ベースラインの何倍以上で遅延とみなすか（デフォルト: {DEFAULT_THRESHOLD}）')
+    parser.add_argument('--timeout', type=float, help='1ケースあたりの制限時間（秒）')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)  # 子プロセス用
+    args = parser.parse_args(argv)
+
+    for key in ('lang', 'layout', 'modes', 'formats'):
+        allowed = {'lang': ('ja', 'ascii'), 'layout': ('dense', 'sparse'),
+                   'modes': tuple(MODES), 'formats': ('xlsx', 'xlsm')}[key]
+        for value in getattr(args, key) or []:
+            if value not in allowed:
+                parser.error(f"--{key.replace('_', '-')} に指定できない値です: {value}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """メイン関数（終了コードを返す。ベースラインより遅くなった場合は1）"""
+    args = parse_args(argv)
+
+    if args.run_case:
+        # 子プロセス：1ケースを実行して結果のJSONを1行で出力する
+        print(json.dumps(run_case(json.loads(args.run_case)), ensure_ascii=False))
+        return 0
+
+    grid = dict(PRESETS[args.preset])
+    for key in ('rows', 'cols', 'sheets', 'text_len', 'lang', 'layout'):
+        if getattr(args, key):
+            grid[key] = getattr(args, key)
+
+    workdir = Path(args.workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    cases = build_cases(grid, args.modes, args.formats, workdir)
+
+    results = []
+    started_at = datetime.now()
+    for index, case in enumerate(cases, 1):
+        print(f"⏱ [{index}/{len(cases)}] {case_id(case)}")
+        try:
+            results.append(run_case_subprocess(case, args.timeout))
+        except subprocess.TimeoutExpired:
+            results.append({"id": case_id(case), "case": {k: v for k, v in case.items() if k != 'workbook'},
+                            "error": f"制限時間（{args.timeout}秒）を超えました"})
+    print_results(results)
+
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 結果: {output_path}")
+
+    failed = any("error" in result for result in results)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n⚠️ ベースラインより遅くなった段階: {len(regressions)}件")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\n✅ ベースラインからの遅延はありません")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+起動時間（インポート時間）の確認ツール
+
+各エントリーポイントを新しいPythonプロセスで `python -X importtime` を付けて
+インポートし、累積インポート時間と、起動時に読み込まれてはいけない重い
+ライブラリ（openpyxl / python-docx / reportlab / tkinter）が読み込まれて
+いないかを確認する。予算を超えた場合や重いライブラリが読み込まれた場合は
+終了コード1を返す。
+
+例:
+    python check_startup.py
+    python check_startup.py --budget-ms 150 --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 確認するエントリーポイント
+ENTRY_MODULES = ['excel_to_pdf', 'main', 'easy_converter', 'batch_convert', 'parallel_convert']
+
+# 起動時に読み込まれてはいけないモジュール（実際に変換するときに読み込む）
+HEAVY_MODULES = ['openpyxl', 'docx', 'reportlab', 'tkinter']
+
+# 1モジュールあたりの累積インポート時間の予算（ミリ秒）
+DEFAULT_BUDGET_MS = 150.0
+
+_PROBE = (
+    "import sys, {module}\n"
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))\n"
+)
+
+
+def measure_import(module: str, cwd: Optional[Path] = None) -> Dict:
+    """1つのモジュールを新しいプロセスでインポートし、累積時間と読み込まれた重いモジュールを返す"""
+    cwd = cwd or Path(__file__).resolve().parent
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=str(cwd), env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{module} をインポートできません:\n{completed.stderr.strip()}")
+
+    # importtimeの出力: "import time: self [us] | cumulative | imported package"
+    cumulative_us = None
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            cumulative_us = int(fields[1])
+    loaded = [name for name in completed.stdout.strip().split(",") if name]
+    return {"module": module, "cumulative_ms": (cumulative_us or 0) / 1000, "heavy_loaded": loaded}
+
+
+def check_startup(modules: List[str], budget_ms: float, repeat: int = 3) -> bool:
+    """各モジュールの起動時間を測定して表示し、すべて基準内ならTrueを返す"""
+    ok = True
+    print(f"{'モジュール':<20}{'累積(ms)':>10}  判定")
+    for module in modules:
+        # 測定のばらつきを抑えるため、最小値を採用する
+        results = [measure_import(module) for _ in range(max(1, repeat))]
+        best = min(result["cumulative_ms"] for result in results)
+        heavy = sorted({name for result in results for name in result["heavy_loaded"]})
+
+        problems = []
+        if best > budget_ms:
+            problems.append(f"予算 {budget_ms:.0f}ms 超過")
+        if heavy:
+            problems.append(f"重いモジュールを読み込み: {', '.join(heavy)}")
+        status = "✅" if not problems else "❌ " + " / ".join(problems)
+        print(f"{module:<20}{best:>10.1f}  {status}")
+        ok = ok and not problems
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="エントリーポイントの起動時間（インポート時間）を確認する")
+    parser.add_argument('modules', nargs='*', default=ENTRY_MODULES,
+                        help=f"確認するモジュール（デフォルト: {' '.join(ENTRY_MODULES)}）")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"1モジュールあたりの累積インポート時間の上限（デフォルト: {DEFAULT_BUDGET_MS:.0f}）")
+    parser.add_argument('--repeat', type=int, default=3, help="各モジュールの測定回数（デフォルト: 3）")
+    args = parser.parse_args()
+
+    try:
+        ok = check_startup(args.modules, args.budget_ms, args.repeat)
+    except RuntimeError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+列選択（列の射影）を扱うモジュール
+
+列の指定は次の形式を受け付ける:
+    - 列文字: "B", "AA", "XFD"（大文字・小文字は区別しない）
+    - 列範囲: "C:F"
+    - 見出し名: 1行目のセルの値（大文字・小文字は区別しない）
+    - "ALL": すべての列
+列文字として解釈できる指定（例: "ID"）は見出し名より列文字を優先する。
+指定は一度だけ解析し、昇順・重複なしの0始まりインデックスに変換する。
+"""
+
+import re
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+_LETTERS_RE = re.compile(r"^[A-Za-z]{1,3}$")
+
+# Excelの最大列（XFD）
+MAX_COLUMN = 16384
+
+
+def column_index_from_string(letters: str) -> int:
+    """列文字を1始まりの列番号に変換する（openpyxlを読み込まずに済むよう自前で計算する）"""
+    if not _LETTERS_RE.match(letters):
+        raise ValueError(f"無効な列文字です: {letters}")
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - ord("A") + 1)
+    if index > MAX_COLUMN:
+        raise ValueError(f"無効な列文字です: {letters}")
+    return index
+
+
+def _letter_to_index(letter: str) -> Optional[int]:
+    """列文字を0始まりのインデックスに変換する（列文字でない場合はNone）"""
+    try:
+        return column_index_from_string(letter) - 1
+    except ValueError:
+        # 列文字でない場合やXFDを超える場合など
+        return None
+
+
+class ColumnProjection:
+    """列の指定を解析し、読み取る列のインデックスに変換するクラス"""
+
+    def __init__(self, specs: Optional[Iterable[str]] = None):
+        specs = [str(spec).strip() for spec in (specs or []) if str(spec).strip()]
+        self.specs = specs
+        self.select_all = not specs or any(spec.upper() == "ALL" for spec in specs)
+        self._indices = set()
+        self._headers = []
+
+        if self.select_all:
+            return
+
+        for spec in specs:
+            if ":" in spec:
+                start, end = (part.strip() for part in spec.split(":", 1))
+                start_idx = _letter_to_index(start)
+                end_idx = _letter_to_index(end)
+                if start_idx is None or end_idx is None:
+                    raise ValueError(f"無効な列範囲です: {spec}")
+                if start_idx > end_idx:
+                    start_idx, end_idx = end_idx, start_idx
+                self._indices.update(range(start_idx, end_idx + 1))
+                continue
+
+            idx = _letter_to_index(spec)
+            if idx is not None:
+                self._indices.add(idx)
+            else:
+                self._headers.append(spec)
+
+    @property
+    def needs_header(self) -> bool:
+        """見出し名の解決に1行目の値が必要かどうか"""
+        return bool(self._headers)
+
+    def resolve(self, header: Optional[Sequence] = None,
+                max_column: Optional[int] = None) -> Optional[List[int]]:
+        """読み取る列の0始まりインデックスを昇順で返す（全列の場合はNone）
+
+        header は1行目の値、max_column はシートの列数（不明な場合はNone）。
+        シートの範囲外の列は含めない。
+        """
+        if self.select_all:
+            return None
+
+        indices = set(self._indices)
+        if self._headers:
+            names = {}
+            for idx, value in enumerate(header or ()):
+                if value is not None:
+                    names.setdefault(str(value).strip().casefold(), idx)
+            for name in self._headers:
+                idx = names.get(name.casefold())
+                if idx is None:
+                    print(f"Warning: Column '{name}' not found in header row.")
+                else:
+                    indices.add(idx)
+
+        if max_column:
+            indices = {idx for idx in indices if idx < max_column}
+        return sorted(indices)
+
+
+def column_bounds(indices: Sequence[int]) -> Tuple[int, int, List[int]]:
+    """インデックスから読み取り範囲 (min_col, max_col)（1始まり）と範囲内の位置を返す"""
+    first = indices[0]
+    return first + 1, indices[-1] + 1, [idx - first for idx in indices]
+
+
+def row_getter(offsets: Sequence[int]):
+    """行（タプルやリスト）から指定位置の要素をタプルで取り出す関数を返す"""
+    if len(offsets) == 1:
+        offset = offsets[0]
+        return lambda row: (row[offset],)
+    return itemgetter(*offsets)
+
+
+def partial_row_getter(offsets: Sequence[int]):
+    """行から指定位置の要素をリストで取り出す関数を返す（行の長さを超える位置は含めない）
+
+    シートの列数が分からず行ごとに長さが異なる場合に使う。offsets は昇順。
+    """
+    offsets = list(offsets)
+
+    def get(row):
+        return [row[offset] for offset in offsets[:bisect_left(offsets, len(row))]]
+    return get
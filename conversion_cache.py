@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+変換結果のディスクキャッシュ
+
+ワークブックの内容のハッシュ・シート名・変換オプション（列選択、テキストのみ
+モードなど）・コンバーターのバージョンからキーを作り、作成済みのWord/PDFを
+キャッシュディレクトリに保存する。同じキーで変換するときは読み取りと描画を
+省略し、保存してあるファイルを出力先にコピーする。
+
+キャッシュは1キーにつき1ディレクトリで、最後に使われた時刻（ディレクトリの
+更新時刻）が古いものから、合計サイズが上限に収まるまで削除する（LRU）。
+合計サイズは保存のたびに足し合わせておき、上限を超えたときだけディレクトリ全体を
+調べ直して上限の9割まで削除する（他のプロセスが保存した分は、そのときに合計に含まれる）。
+複数のプロセスから同時に使っても壊れないよう、ファイルは一時ファイルに
+書いてから置き換える。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# キャッシュの合計サイズの上限（デフォルト: 1GB）
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# ハッシュ計算時に一度に読むサイズ
+_READ_SIZE = 1024 * 1024
+# 保存で上限を超えたときは上限のこの割合まで削除する（保存のたびに調べ直さないように）
+_EVICT_RATIO = 0.9
+
+
+def default_cache_dir() -> Path:
+    """OSごとの標準的なキャッシュディレクトリを返す"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "excel-to-pdf"
+
+
+class ConversionCache:
+    """変換結果（出力形式ごとのファイル）をキーごとに保存するキャッシュ"""
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        # (パス, サイズ, 更新時刻) -> 内容のハッシュ（変更のないファイルを再計算しない）
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        # キャッシュの合計サイズ（最初にディレクトリを調べるまではNone）
+        self._total_bytes: Optional[int] = None
+
+    def file_hash(self, path) -> str:
+        """ファイルの内容のハッシュ（同じプロセス内ではサイズと更新時刻が同じなら再計算しない）"""
+        path = Path(path)
+        stat = path.stat()
+        memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(memo_key)
+        if digest is None:
+            hasher = hashlib.blake2b(digest_size=20)
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(_READ_SIZE), b""):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+            self._hashes[memo_key] = digest
+        return digest
+
+    def make_key(self, excel_path, sheet_name: Optional[str], options: dict) -> str:
+        """ワークブックの内容・シート名・変換オプションからキーを作る"""
+        material = json.dumps({
+            "content": self.file_hash(excel_path),
+            "sheet": sheet_name,
+            "options": options,
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def restore(self, key: str, targets: Dict[str, Path]) -> bool:
+        """キャッシュにすべての形式があれば出力先にコピーしてTrueを返す
+
+        targets は 出力形式（'docx', 'pdf'）-> 出力先のパス。
+        出力先に同じファイル（サイズと更新時刻が同じ）が残っている場合はそのまま使う。
+        """
+        entry = self._entry_dir(key)
+        sources = {fmt: entry / f"output.{fmt}" for fmt in targets}
+        if not all(source.is_file() for source in sources.values()):
+            return False
+
+        try:
+            for fmt, target in targets.items():
+                source = sources[fmt]
+                if not _same_file(source, target):
+                    target = Path(target)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    _atomic_copy(source, target)
+            # 最後に使った時刻を記録する（LRUの判定に使う）
+            os.utime(entry)
+        except OSError:
+            # 別のプロセスが削除した場合などはキャッシュなしで変換する
+            return False
+        return True
+
+    def store(self, key: str, outputs: Dict[str, Path]):
+        """作成した出力ファイルをキャッシュに保存し、上限を超えたら古いものを削除する"""
+        entry = self._entry_dir(key)
+        try:
+            # 同じキーを保存し直す場合は、置き換える前のサイズを合計から引く
+            previous = _entry_size(entry)
+            entry.mkdir(parents=True, exist_ok=True)
+            for fmt, path in outputs.items():
+                _atomic_copy(Path(path), entry / f"output.{fmt}")
+            os.utime(entry)
+            added = _entry_size(entry) - previous
+        except OSError as e:
+            print(f"キャッシュの保存エラー: {e}")
+            return
+        if self._total_bytes is not None:
+            self._total_bytes += added
+            if self._total_bytes <= self.max_bytes:
+                return
+            self.evict(int(self.max_bytes * _EVICT_RATIO))
+        else:
+            self.evict()
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """合計サイズが上限を超えている場合、最後に使われた時刻が古いものから削除する
+
+        キャッシュディレクトリ全体を調べるため、エントリ数に比例して時間がかかる。
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*/*"):
+            try:
+                size = _entry_size(entry)
+                entries.append((entry.stat().st_mtime, size, entry))
+            except OSError:
+                continue
+            total += size
+
+        entries.sort()
+        for _mtime, size, entry in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+        self._total_bytes = total
+
+    def clear(self):
+        """キャッシュをすべて削除する"""
+        self.evict(max_bytes=0)
+
+
+def _entry_size(entry: Path) -> int:
+    """キャッシュのエントリ（ディレクトリ）内のファイルの合計サイズ（ない場合は0）"""
+    try:
+        return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+    except FileNotFoundError:
+        return 0
+
+
+def _same_file(source: Path, target: Path) -> bool:
+    """出力先がキャッシュからコピーしたままのファイルかどうか（copy2は更新時刻を保つ）"""
+    try:
+        source_stat = source.stat()
+        target_stat = Path(target).stat()
+    except OSError:
+        return False
+    return (source_stat.st_size == target_stat.st_size
+            and source_stat.st_mtime_ns == target_stat.st_mtime_ns)
+
+
+def _atomic_copy(source: Path, target: Path):
+    """一時ファイルにコピーしてから置き換える（読み取り中のプロセスに途中の内容を見せない）"""
+    fd, temp_path = tempfile.mkstemp(dir=str(target.parent), prefix=".tmp-", suffix=target.suffix)
+    os.close(fd)
+    try:
+        shutil.copy2(str(source), temp_path)
+        os.replace(temp_path, str(target))
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Excel to PDF 変換サービス（convert_server.py）のクライアント
+
+ワークブックをアップロード（またはサーバーと同じホスト上のパスを指定）して
+変換し、作成されたPDF/Wordを保存する。標準ライブラリ（urllib）だけを使う。
+
+例:
+    python convert_client.py input.xlsx -o ./output
+    python convert_client.py a.xlsx b.xlsx -o ./output --format both --columns ALL --table
+    python convert_client.py input.xlsx --path --server http://127.0.0.1:8765   # アップロードせずパスを渡す
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlencode
+
+DEFAULT_SERVER = "http://127.0.0.1:8765"
+
+
+class ServiceError(Exception):
+    """変換サービスがエラーを返した"""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class ServiceBusyError(ServiceError):
+    """待ち行列が満杯で受け付けられなかった（429）"""
+
+
+class ConversionClient:
+    """変換サービスのHTTP APIを呼び出すクライアント"""
+
+    def __init__(self, server: str = DEFAULT_SERVER, timeout: float = 600):
+        self.server = server.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, data: Optional[bytes] = None,
+                 content_type: Optional[str] = None) -> bytes:
+        request = urllib.request.Request(self.server + path, data=data, method=method)
+        if content_type:
+            request.add_header('Content-Type', content_type)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            try:
+                message = json.loads(body).get('error', '')
+            except (ValueError, AttributeError):
+                message = body.decode('utf-8', 'replace')
+            retry_after = e.headers.get('Retry-After')
+            error_class = ServiceBusyError if e.code == 429 else ServiceError
+            raise error_class(e.code, message, float(retry_after) if retry_after else None) from None
+
+    def _json(self, method: str, path: str, **kwargs) -> dict:
+        return json.loads(self._request(method, path, **kwargs))
+
+    def health(self) -> dict:
+        return self._json('GET', '/health')
+
+    def submit(self, excel_path, wait: bool = False, upload: bool = True, **options) -> dict:
+        """ジョブを登録し、ジョブの情報を返す
+
+        upload=False の場合はファイルを送らず、パスをサーバーに渡す（同じホストの場合のみ）。
+        options は sheet, columns, format, table, font, font_size, output_dir（パス指定のみ）。
+        """
+        params = {key: value for key, value in options.items() if value is not None}
+        if wait:
+            params['wait'] = 1
+        if upload:
+            excel_path = Path(excel_path)
+            params['filename'] = excel_path.name
+            if isinstance(params.get('table'), bool):
+                params['table'] = int(params['table'])
+            return self._json('POST', '/jobs?' + urlencode(params), data=excel_path.read_bytes(),
+                              content_type='application/octet-stream')
+        params['path'] = str(Path(excel_path).resolve())
+        return self._json('POST', '/jobs', data=json.dumps(params).encode('utf-8'),
+                          content_type='application/json')
+
+    def status(self, job_id: str) -> dict:
+        return self._json('GET', f'/jobs/{job_id}')
+
+    def wait(self, job_id: str, interval: float = 0.2, timeout: Optional[float] = None) -> dict:
+        """ジョブが終わるまで状態を確認し続ける"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job['status'] not in ('queued', 'running'):
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"ジョブが終わりません: {job_id}")
+            time.sleep(interval)
+
+    def download(self, job_id: str, output_format: str) -> bytes:
+        """作成されたファイルの内容を返す"""
+        return self._request('GET', f'/jobs/{job_id}/{output_format}')
+
+    def delete(self, job_id: str) -> dict:
+        return self._json('DELETE', f'/jobs/{job_id}')
+
+    def convert(self, excel_path, output_dir, upload: bool = True, **options) -> List[str]:
+        """変換して出力ディレクトリに保存し、保存したファイルのパスを返す（エラーはServiceError）"""
+        job = self.submit(excel_path, wait=True, upload=upload, **options)
+        try:
+            if job['status'] != 'done':
+                raise ServiceError(500, job.get('error') or job['status'])
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            saved = []
+            for output_format, output in job['outputs'].items():
+                target = output_dir / Path(output['path']).name
+                target.write_bytes(self.download(job['id'], output_format))
+                saved.append(str(target))
+            return saved
+        finally:
+            self.delete(job['id'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='変換サービスにExcelファイルを送ってPDF（Word）に変換します')
+    parser.add_argument('files', nargs='+', help='変換するExcelファイル')
+    parser.add_argument('-o', '--output', default='.', help='出力ディレクトリ（デフォルト: カレントディレクトリ）')
+    parser.add_argument('--server', default=DEFAULT_SERVER, help=f'サービスのURL（デフォルト: {DEFAULT_SERVER}）')
+    parser.add_argument('--sheet', help='変換するシート名（省略時はアクティブシート）')
+    parser.add_argument('--columns', default='B', help='変換する列（カンマ区切り、例: B / A,C / C:F / ALL）デフォルト: B')
+    parser.add_argument('--format', choices=['pdf', 'docx', 'both'], default='pdf', help='出力形式（デフォルト: pdf）')
+    parser.add_argument('--table', action='store_true', help='通常モード（表形式）で出力する')
+    parser.add_argument('--path', action='store_true', help='アップロードせず、ファイルのパスをサービスに渡す（同じホストで、サービスを --allow-paths で起動した場合）')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    client = ConversionClient(args.server)
+    failed = 0
+    for excel_file in args.files:
+        started = time.perf_counter()
+        try:
+            saved = client.convert(excel_file, args.output, upload=not args.path, sheet=args.sheet,
+                                   columns=args.columns, format=args.format, table=args.table)
+        except (ServiceError, OSError) as e:
+            print(f"❌ {excel_file}: {e}")
+            failed += 1
+            continue
+        print(f"✅ {excel_file} → {', '.join(saved)} ({time.perf_counter() - started:.2f}秒)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
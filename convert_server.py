@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+"""
+Excel to PDF 変換サービス - ローカルで常駐し、HTTPで変換を受け付ける
+
+起動時にワーカープロセスを作り、ライブラリの読み込みとフォント登録を
+済ませておく（ウォームアップ）ため、変換ごとにPythonの起動・インポート・
+フォント登録のコストがかからない。受け付けた変換はジョブとして待ち行列に入れ、
+空いたワーカーから順に実行する。待ち行列が上限に達している間は
+新しいジョブを受け付けず、429（Retry-After付き）を返す。
+標準ライブラリ（asyncio）だけで動き、ネットワークには接続しない。
+
+エンドポイント:
+    POST   /jobs             ジョブを登録する（202、待ち行列が満杯なら429）
+                             本文がExcelファイルならアップロード（クエリの filename でファイル名を指定）、
+                             JSONなら {"path": "..."} でこのホスト上のファイルを指定する
+                             （--allow-paths で許可したディレクトリの中のファイルだけ。
+                             "output_dir" を指定するとそこに出力し、パスだけを返す。
+                             output_dir も許可したディレクトリの中に限る）。
+                             変換オプション（クエリ文字列またはJSON）:
+                             sheet, columns, format (pdf/docx/both), table, font, font_size
+                             wait=1 を付けると変換が終わるまで待ってから結果を返す
+    GET    /jobs/{id}        ジョブの状態（queued / running / done / failed）と出力
+    GET    /jobs/{id}/pdf    作成したPDFの内容（/docx でWord文書）
+    DELETE /jobs/{id}        ジョブと作業ディレクトリのファイルを削除する
+    GET    /health           ワーカー数・待ち行列の長さなど
+
+例:
+    python convert_server.py --port 8765 --workers 4
+    python convert_server.py --allow-paths ~/excel   # ~/excel の中のファイルはパスで変換できる
+    curl --data-binary @input.xlsx "http://127.0.0.1:8765/jobs?filename=input.xlsx&wait=1"
+    curl -o input.pdf http://127.0.0.1:8765/jobs/<id>/pdf
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, quote, urlsplit
+
+from conversion_cache import ConversionCache
+from excel_to_pdf import ExcelToWordPDFConverter
+import font_registry
+from parallel_convert import resolve_workers
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 実行を待っているジョブの上限（これを超えると429を返す）
+DEFAULT_MAX_QUEUE = 32
+# アップロードできるファイルの上限（MB）
+DEFAULT_MAX_UPLOAD_MB = 100
+# 終了したジョブを保持する数（古いものから作業ディレクトリごと削除する）
+DEFAULT_KEEP_JOBS = 200
+
+UPLOAD_EXTENSIONS = ('.xlsx', '.xlsm')
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found',
+            405: 'Method Not Allowed',
+            409: 'Conflict', 411: 'Length Required', 413: 'Payload Too Large', 429: 'Too Many Requests',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def job_options(params: dict) -> Tuple[dict, Optional[str]]:
+    """リクエストのパラメータから (コンバーターの引数, シート名) を作る（不正な値はValueError）"""
+    output_format = str(params.get('format', 'pdf'))
+    if output_format not in ('pdf', 'docx', 'both'):
+        raise ValueError(f"format は pdf / docx / both のいずれかです: {output_format}")
+    columns = [col.strip().upper() for col in str(params.get('columns', 'B')).split(",") if col.strip()]
+    try:
+        font_size = float(params.get('font_size', font_registry.DEFAULT_FONT_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError(f"font_size が数値ではありません: {params.get('font_size')}")
+    if font_size <= 0:
+        raise ValueError(f"font_size は正の数です: {font_size}")
+    options = {
+        'text_only': not _flag(params.get('table')),
+        'selected_columns': columns or ['B'],
+        'outputs': ['docx', 'pdf'] if output_format == 'both' else [output_format],
+        'font_name': str(params.get('font', font_registry.DEFAULT_FONT_NAME)),
+        'font_size': font_size,
+        'leading': font_size * 1.2,
+    }
+    return options, params.get('sheet') or None
+
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+# --- ワーカープロセス側 ---
+
+# オプションの組み合わせごとのコンバーター（ワーカープロセスごとに保持する）
+_worker_converters: "OrderedDict[str, ExcelToWordPDFConverter]" = OrderedDict()
+_worker_cache: Optional[ConversionCache] = None
+# 1つのワーカーが保持するコンバーターの数
+_MAX_WORKER_CONVERTERS = 16
+
+
+def _init_service_worker(use_cache: bool):
+    """ワーカープロセスの初期化（ライブラリの読み込みとフォント登録を済ませておく）"""
+    global _worker_cache
+    sys.stdout = open(os.devnull, "w")
+    _worker_cache = ConversionCache() if use_cache else None
+    _worker_converter(job_options({})[0]).preload()
+
+
+def _worker_converter(options: dict) -> ExcelToWordPDFConverter:
+    key = json.dumps(options, sort_keys=True)
+    converter = _worker_converters.get(key)
+    if converter is None:
+        converter = ExcelToWordPDFConverter(cache=_worker_cache, **options)
+        _worker_converters[key] = converter
+        if len(_worker_converters) > _MAX_WORKER_CONVERTERS:
+            _worker_converters.popitem(last=False)
+    else:
+        _worker_converters.move_to_end(key)
+    return converter
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _run_job(excel_path: str, output_dir: str, sheet_name: Optional[str],
+             options: dict) -> Tuple[Optional[str], Optional[str]]:
+    """ワーカーで1つのジョブを変換し、(Wordのパス, PDFのパス) を返す"""
+    return _worker_converter(options).convert(excel_path, output_dir, sheet_name)
+
+
+# --- サービス（イベントループ側） ---
+
+class ConversionJob:
+    """1つの変換ジョブ"""
+
+    def __init__(self, job_id: str, excel_path: Path, output_dir: Path, sheet_name: Optional[str],
+                 options: dict, work_dir: Optional[Path] = None):
+        self.id = job_id
+        self.excel_path = excel_path
+        self.output_dir = output_dir
+        self.sheet_name = sheet_name
+        self.options = options
+        self.work_dir = work_dir  # サービスが作った作業ディレクトリ（削除時に消す）
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.outputs: Dict[str, str] = {}  # 出力形式 -> パス
+        self.error = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        def stamp(value):
+            return datetime.fromtimestamp(value).isoformat(timespec="milliseconds") if value else None
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "excel_path": str(self.excel_path),
+            "sheet": self.sheet_name,
+            "formats": list(self.options['outputs']),
+            "created": stamp(self.created),
+            "started": stamp(self.started),
+            "finished": stamp(self.finished),
+            "duration": round(self.finished - self.started, 3) if self.finished and self.started else None,
+            "outputs": {fmt: {"path": path, "url": f"/jobs/{self.id}/{fmt}"} for fmt, path in self.outputs.items()},
+            "error": self.error,
+        }
+
+
+class ServiceBusy(Exception):
+    """待ち行列が満杯でジョブを受け付けられない"""
+
+
+class ConversionService:
+    """ウォームアップ済みのプロセスプールで変換ジョブを実行するサービス"""
+
+    def __init__(self, workers: Optional[int] = None, max_queue: int = DEFAULT_MAX_QUEUE,
+                 work_dir=None, use_cache: bool = True, keep_jobs: int = DEFAULT_KEEP_JOBS):
+        self.workers = resolve_workers(workers)
+        self.max_queue = max_queue
+        self.use_cache = use_cache
+        self.keep_jobs = keep_jobs
+        self._own_work_dir = work_dir is None
+        self.work_dir = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix="excel-to-pdf-service-"))
+        self.jobs: "OrderedDict[str, ConversionJob]" = OrderedDict()
+        self.running = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._dispatchers = []
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_service_worker,
+                                   initargs=(self.use_cache,))
+
+    async def start(self):
+        """ワーカープロセスを起動してウォームアップし、ジョブの実行を始める"""
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue(self.max_queue)
+        self._pool = self._new_pool()
+        await self._warm_up()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def _warm_up(self):
+        # 同時に workers 個のジョブを投げると、プールはワーカーを workers 個起動する
+        # （各ワーカーは初期化でライブラリの読み込みとフォント登録を行う）
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)])
+
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._own_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def new_job_dir(self) -> Tuple[str, Path]:
+        job_id = uuid.uuid4().hex
+        return job_id, self.work_dir / job_id
+
+    def submit(self, job: ConversionJob):
+        """ジョブを待ち行列に入れる（満杯の場合はServiceBusy）"""
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise ServiceBusy(f"待ち行列が満杯です（{self.max_queue}件）")
+        self.jobs[job.id] = job
+
+    def check_capacity(self):
+        """アップロードを受け取る前に、ジョブを受け付けられるか確認する"""
+        if self._queue.full():
+            raise ServiceBusy(f"待ち行列が満杯です（{self.max_queue}件）")
+
+    async def _dispatch(self):
+        """待ち行列からジョブを取り出してワーカーで実行する（ワーカー数だけ並行に動く）"""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.status != 'queued':
+                continue  # 実行前に削除された
+            job.status = 'running'
+            job.started = time.time()
+            self.running += 1
+            rebuilt = False
+            try:
+                pool = self._pool
+                word_path, pdf_path = await loop.run_in_executor(
+                    pool, _run_job, str(job.excel_path), str(job.output_dir), job.sheet_name, job.options)
+                job.outputs = {fmt: path for fmt, path in (('docx', word_path), ('pdf', pdf_path)) if path}
+                job.status = 'done'
+            except BrokenProcessPool as e:
+                # ワーカープロセスが異常終了した（メモリ不足など）：プールを作り直す
+                job.status, job.error = 'failed', f"ワーカープロセスが異常終了しました: {e}"
+                if self._pool is pool:
+                    self._pool = self._new_pool()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    rebuilt = True
+            except Exception as e:
+                job.status, job.error = 'failed', str(e)
+            finally:
+                job.finished = time.time()
+                self.running -= 1
+                job.done.set()
+                self._prune()
+            if rebuilt:
+                # 起動時と同じようにウォームアップし、次のジョブで読み込みとフォント登録をしないようにする
+                # （ここでも異常終了した場合は、次のジョブでもう一度作り直す）
+                with contextlib.suppress(BrokenProcessPool):
+                    await self._warm_up()
+
+    def _prune(self):
+        """終了したジョブが keep_jobs 件を超えたら、古いものから削除する"""
+        finished = [job for job in self.jobs.values() if job.status in ('done', 'failed')]
+        for job in finished[:max(len(finished) - self.keep_jobs, 0)]:
+            self.remove(job.id)
+
+    def remove(self, job_id: str) -> Optional[ConversionJob]:
+        """ジョブと作業ディレクトリを削除する（実行中のジョブは削除しない）"""
+        job = self.jobs.get(job_id)
+        if job is None or job.status == 'running':
+            return None
+        del self.jobs[job_id]
+        if job.status == 'queued':
+            job.status = 'deleted'  # 待ち行列からは取り出した時に読み飛ばす
+            job.done.set()
+        if job.work_dir is not None:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+        return job
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "jobs": len(self.jobs),
+        }
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class _Request:
+    def __init__(self, method: str, path: str, query: dict, headers: dict, body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+async def _read_request(reader: asyncio.StreamReader, max_body: int) -> Optional[_Request]:
+    """HTTP/1.1のリクエストを1つ読み取る（接続が閉じられた場合はNone）"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _version = line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(400, "リクエスト行が不正です")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+        if len(headers) > 100:
+            raise HTTPError(400, "ヘッダーが多すぎます")
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HTTPError(411, "Content-Lengthを指定してください（chunkedには対応していません）")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, "Content-Lengthが不正です")
+    if length > max_body:
+        raise HTTPError(413, f"アップロードできるのは {max_body // (1024 * 1024)}MB までです")
+    body = await reader.readexactly(length) if length > 0 else b''
+
+    # パーセントエンコードされていない日本語（UTF-8）のシート名なども受け付ける
+    url = urlsplit(target.encode('latin-1').decode('utf-8', 'replace'))
+    return _Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+
+
+class ConversionServer:
+    """ConversionServiceをHTTPで公開するサーバー（1接続につき1リクエスト）"""
+
+    def __init__(self, service: ConversionService, max_upload: int = DEFAULT_MAX_UPLOAD_MB * 1024 * 1024,
+                 path_roots: Sequence = ()):
+        self.service = service
+        self.max_upload = max_upload
+        # パス指定で読み書きしてよいディレクトリ（空の場合はアップロードだけを受け付ける）
+        self.path_roots: List[Path] = [Path(root).expanduser().resolve() for root in path_roots]
+
+    def _allowed_path(self, value: str, name: str) -> Path:
+        """パス指定で受け取ったパスを、許可したディレクトリの中にあることを確かめて返す"""
+        path = Path(str(value)).expanduser().resolve()
+        if not any(path.is_relative_to(root) for root in self.path_roots):
+            raise HTTPError(403, f"{name} は許可されたディレクトリの外にあります: {value}")
+        return path
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                request = await _read_request(reader, self.max_upload)
+                if request is None:
+                    return
+                await self._route(request, writer)
+            except HTTPError as e:
+                await _send_json(writer, e.status, {"error": e.message}, e.headers)
+            except ServiceBusy as e:
+                await _send_json(writer, 429, {"error": str(e)}, {"Retry-After": "1"})
+            except ValueError as e:
+                await _send_json(writer, 400, {"error": str(e)})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                await _send_json(writer, 500, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # クライアントが途中で切断した
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _route(self, request: _Request, writer: asyncio.StreamWriter):
+        parts = [part for part in request.path.split('/') if part]
+        if parts == ['health'] and request.method == 'GET':
+            await _send_json(writer, 200, self.service.health())
+        elif parts == ['jobs'] and request.method == 'POST':
+            await self._create_job(request, writer)
+        elif len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.service.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(404, f"ジョブが見つかりません: {parts[1]}")
+            if len(parts) == 3 and request.method == 'GET':
+                await self._send_output(job, parts[2], writer)
+            elif len(parts) == 2 and request.method == 'GET':
+                await _send_json(writer, 200, job.to_dict())
+            elif len(parts) == 2 and request.method == 'DELETE':
+                if self.service.remove(job.id) is None:
+                    raise HTTPError(409, "実行中のジョブは削除できません")
+                await _send_json(writer, 200, {"id": job.id, "status": "deleted"})
+            else:
+                raise HTTPError(405, f"{request.method} {request.path} は使用できません")
+        else:
+            raise HTTPError(404, f"{request.path} は見つかりません")
+
+    async def _create_job(self, request: _Request, writer: asyncio.StreamWriter):
+        self.service.check_capacity()
+        params = dict(request.query)
+        job_id, job_dir = self.service.new_job_dir()
+        if request.headers.get('content-type', '').split(';')[0].strip() == 'application/json':
+            # このホスト上のファイルを変換する
+            if not self.path_roots:
+                raise HTTPError(403, "このサービスはアップロードだけを受け付けます（パス指定は --allow-paths で許可）")
+            try:
+                params.update(json.loads(request.body or b'{}'))
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise HTTPError(400, f"JSONが不正です: {e}")
+            if not params.get('path'):
+                raise HTTPError(400, "path を指定してください")
+            excel_path = self._allowed_path(params['path'], 'path')
+            if not excel_path.is_file():
+                raise HTTPError(404, f"Excelファイルが見つかりません: {excel_path}")
+            options, sheet_name = job_options(params)
+            if params.get('output_dir'):
+                output_dir, work_dir = self._allowed_path(params['output_dir'], 'output_dir'), None
+            else:
+                output_dir, work_dir = job_dir / 'output', job_dir
+        else:
+            # アップロードされたファイルを作業ディレクトリに保存して変換する
+            if not request.body:
+                raise HTTPError(400, "Excelファイルを本文に入れて送信してください")
+            filename = Path(params.get('filename') or 'upload.xlsx').name
+            if Path(filename).suffix.lower() not in UPLOAD_EXTENSIONS:
+                raise HTTPError(400, f"対応していないファイル形式です: {filename}（{' / '.join(UPLOAD_EXTENSIONS)}）")
+            options, sheet_name = job_options(params)
+            excel_path = job_dir / 'input' / filename
+            await asyncio.get_running_loop().run_in_executor(None, _write_upload, excel_path, request.body)
+            output_dir, work_dir = job_dir / 'output', job_dir
+
+        job = ConversionJob(job_id, excel_path, output_dir, sheet_name, options, work_dir)
+        try:
+            self.service.submit(job)
+        except ServiceBusy:
+            if work_dir is not None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        if _flag(params.get('wait')):
+            await job.done.wait()
+            await _send_json(writer, 200, job.to_dict())
+        else:
+            await _send_json(writer, 202, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+    async def _send_output(self, job: ConversionJob, output_format: str, writer: asyncio.StreamWriter):
+        if output_format not in CONTENT_TYPES:
+            raise HTTPError(404, f"出力形式が不正です: {output_format}")
+        if job.status != 'done':
+            raise HTTPError(409, f"ジョブはまだ完了していません（{job.status}）")
+        path = job.outputs.get(output_format)
+        if path is None or not os.path.isfile(path):
+            raise HTTPError(404, f"{output_format} は作成されていません")
+        size = os.path.getsize(path)
+        _write_head(writer, 200, {
+            "Content-Type": CONTENT_TYPES[output_format],
+            "Content-Length": str(size),
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(Path(path).name)}",
+        })
+        await writer.drain()
+        with open(path, 'rb') as f:
+            # ファイルの内容はカーネルからソケットへ直接送る（できない場合は読み込んで送る）
+            await asyncio.get_running_loop().sendfile(writer.transport, f)
+
+
+def _write_upload(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def _write_head(writer: asyncio.StreamWriter, status: int, headers: dict):
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append("Connection: close")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, data: dict, headers: Optional[dict] = None):
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    _write_head(writer, status, {
+        "Content-Type": "application/json; charset=utf-8",
+        "Content-Length": str(len(body)),
+        **(headers or {}),
+    })
+    writer.write(body)
+    await writer.drain()
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: Optional[int] = None,
+                max_queue: int = DEFAULT_MAX_QUEUE, max_upload_mb: int = DEFAULT_MAX_UPLOAD_MB,
+                work_dir=None, use_cache: bool = True, keep_jobs: int = DEFAULT_KEEP_JOBS,
+                path_roots: Sequence = ()):
+    """変換サービスを起動し、キャンセルされるまで動かす（path_roots はパス指定を許可するディレクトリ）"""
+    service = ConversionService(workers, max_queue, work_dir, use_cache, keep_jobs)
+    try:
+        # ポートが使用中などで起動できない場合も、ワーカーと作業ディレクトリは片付ける
+        await service.start()
+        server = ConversionServer(service, max_upload_mb * 1024 * 1024, path_roots)
+        http_server = await asyncio.start_server(server.handle, host, port)
+        print(f"🚀 変換サービスを起動しました: http://{host}:{port}"
+              f"（ワーカー {service.workers}、待ち行列の上限 {max_queue}、Ctrl+Cで終了）", flush=True)
+        with contextlib.suppress(NotImplementedError):
+            # SIGTERMでも終了処理（ワーカーの停止と作業ディレクトリの削除）を行う
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        async with http_server:
+            await http_server.serve_forever()
+    finally:
+        await service.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Excel→PDF/Wordの変換をHTTPで受け付けるローカルサービス')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'待ち受けるアドレス（デフォルト: {DEFAULT_HOST}）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'ポート番号（デフォルト: {DEFAULT_PORT}）')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='ワーカープロセス数（省略時はCPUコア数）')
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help=f'実行を待つジョブの上限（超えると429を返す）デフォルト: {DEFAULT_MAX_QUEUE}')
+    parser.add_argument('--max-upload-mb', type=int, default=DEFAULT_MAX_UPLOAD_MB,
+                        help=f'アップロードできるファイルの上限（MB）デフォルト: {DEFAULT_MAX_UPLOAD_MB}')
+    parser.add_argument('--work-dir', help='アップロードと出力を置く作業ディレクトリ（省略時は一時ディレクトリ）')
+    parser.add_argument('--keep-jobs', type=int, default=DEFAULT_KEEP_JOBS,
+                        help=f'終了したジョブを保持する数（デフォルト: {DEFAULT_KEEP_JOBS}）')
+    parser.add_argument('--no-cache', action='store_true', help='変換結果のキャッシュを使わない')
+    parser.add_argument('--allow-paths', action='append', default=[], metavar='DIR',
+                        help='このディレクトリの中のファイルをパス指定で変換できるようにする（出力先の指定も'
+                             'この中に限る、複数指定可）。省略時はアップロードだけを受け付ける')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_queue, args.max_upload_mb,
+                          args.work_dir, not args.no_cache, args.keep_jobs, args.allow_paths))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n変換サービスを終了しました")
+    except OSError as e:
+        print(f"❌ 変換サービスを起動できません: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
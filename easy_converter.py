@@ -7,15 +7,28 @@ import sys
 import os
 from pathlib import Path
 from excel_to_pdf import ExcelToWordPDFConverter
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+from parallel_convert import convert_sheets_parallel
+from progress import CancelToken, ConversionCancelled
 import threading
 
+# tkinterはGUIを起動するときだけ読み込む（CLIモードの起動を速くするため）
+tk = filedialog = messagebox = ttk = None
+
+
+def _load_tk():
+    """tkinterを読み込む（利用できない場合はImportError）"""
+    global tk, filedialog, messagebox, ttk
+    if tk is None:
+        import tkinter
+        from tkinter import filedialog as _filedialog, messagebox as _messagebox, ttk as _ttk
+        tk, filedialog, messagebox, ttk = tkinter, _filedialog, _messagebox, _ttk
+
 
 class SimpleExcelToPDFGUI:
     """シンプルなGUIインターフェース"""
     
     def __init__(self):
+        _load_tk()
         self.root = tk.Tk()
         self.root.title("Excel to PDF 変換ツール")
         self.root.geometry("650x650")
@@ -26,6 +39,7 @@ class SimpleExcelToPDFGUI:
         # デフォルトの出力先を設定
         self.output_dir = r"C:\Users\Owner\Documents\パトレオン用\PDF"
         self.converter = None
+        self.cancel_token = None  # 変換中のみ（中止ボタンで cancel() する）
         
         self.setup_ui()
         
@@ -73,6 +87,10 @@ class SimpleExcelToPDFGUI:
         ttk.Checkbutton(pdf_frame, text="テキストのみ（色やセル装飾なし）", 
                        variable=self.text_only_var).grid(row=0, column=0, sticky=tk.W)
         
+        self.word_output_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(pdf_frame, text="Wordファイル（.docx）も出力する", 
+                       variable=self.word_output_var).grid(row=0, column=1, sticky=tk.W, padx=(20, 0))
+        
         # シート選択セクション
         sheet_frame = ttk.LabelFrame(main_frame, text="4. 変換するシートを選択", padding="10")
         sheet_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -82,6 +100,18 @@ class SimpleExcelToPDFGUI:
         ttk.Radiobutton(sheet_frame, text="すべてのシートを変換", variable=self.sheet_var, 
                        value="all", command=self.on_sheet_option_change).grid(row=0, column=0, sticky=tk.W)
         
+        # すべてのシートを変換するときの並列数（プロセス数）
+        workers_frame = ttk.Frame(sheet_frame)
+        workers_frame.grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        ttk.Label(workers_frame, text="並列数:").grid(row=0, column=0, sticky=tk.W)
+        self.workers_var = tk.IntVar(value=1)
+        ttk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1, width=5,
+                    textvariable=self.workers_var).grid(row=0, column=1, padx=(5, 0))
+        # すべてのシートを1つのPDFにまとめる（シートごとのしおり付き、Wordは作成しない）
+        self.merge_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(workers_frame, text="1つのPDFにまとめる",
+                        variable=self.merge_var).grid(row=0, column=2, padx=(10, 0))
+        
         ttk.Radiobutton(sheet_frame, text="特定のシートを選択:", variable=self.sheet_var, 
                        value="selected", command=self.on_sheet_option_change).grid(row=1, column=0, sticky=tk.W)
         
@@ -110,13 +140,17 @@ class SimpleExcelToPDFGUI:
         # デフォルトで特定のシート選択が有効なので、列選択も有効にする
         self.column_frame_widgets = column_frame.winfo_children()
         
-        # 変換ボタン
-        self.convert_button = ttk.Button(main_frame, text="変換開始", command=self.convert, 
+        # 変換ボタンと中止ボタン
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=5, column=0, columnspan=3, pady=(20, 10))
+        self.convert_button = ttk.Button(button_frame, text="変換開始", command=self.convert, 
                                         state="disabled", style="Accent.TButton")
-        self.convert_button.grid(row=5, column=0, columnspan=3, pady=(20, 10))
+        self.convert_button.grid(row=0, column=0)
+        self.cancel_button = ttk.Button(button_frame, text="中止", command=self.cancel, state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=(10, 0))
         
-        # プログレスバー
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        # プログレスバー（読み取り・出力した行数とシート数から進み具合を表示）
+        self.progress = ttk.Progressbar(main_frame, mode='determinate', maximum=100)
         self.progress.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
         self.progress.grid_remove()  # 初期は非表示
         
@@ -199,57 +233,120 @@ class SimpleExcelToPDFGUI:
             
         # UIを無効化
         self.convert_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress['value'] = 0
         self.progress.grid()
-        self.progress.start()
         self.status_label.config(text="変換中...", foreground="blue")
         
+        # 並列に変換する場合は、ワーカープロセスとも共有できるトークンを使う
+        parallel = self.sheet_var.get() == "all" and self.get_workers() > 1 and not self.merge_var.get()
+        self.cancel_token = CancelToken.for_processes() if parallel else CancelToken()
+        
         # 別スレッドで変換処理を実行
-        thread = threading.Thread(target=self.do_convert)
+        thread = threading.Thread(target=self.do_convert, args=(self.cancel_token,))
         thread.start()
         
-    def do_convert(self):
+    def cancel(self):
+        """変換を中止する（読み取り・出力の途中で止まり、書きかけのファイルは削除される）"""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.cancel_button.config(state="disabled")
+            self.status_label.config(text="中止しています...", foreground="blue")
+        
+    def on_row_progress(self, progress):
+        """変換中の進み具合の通知（変換スレッドから呼ばれる）"""
+        sheets = f" [{progress.sheets_done}/{progress.sheets_total}シート]" if progress.sheets_total > 1 else ""
+        message = (f"変換中...{sheets} {progress.rows_read:,}行 / {progress.pages}ページ"
+                   f"（{progress.rows_per_second:,.0f}行/秒）")
+        self.root.after(0, self.update_progress, progress.fraction * 100, message)
+        
+    def do_convert(self, cancel_token):
         """実際の変換処理（別スレッド）"""
         try:
             text_only = self.text_only_var.get()
             selected_columns = self.get_selected_columns()
+            # PDFのみ、またはWordとPDFの両方を出力
+            outputs = ('docx', 'pdf') if self.word_output_var.get() else ('pdf',)
             
             # コンバーターを作成
-            self.converter = ExcelToWordPDFConverter(text_only=text_only, selected_columns=selected_columns)
+            self.converter = ExcelToWordPDFConverter(text_only=text_only, selected_columns=selected_columns,
+                                                     outputs=outputs, progress_callback=self.on_row_progress,
+                                                     cancel_token=cancel_token)
             
-            if self.sheet_var.get() == "all":
-                # すべてのシートを変換
+            if self.sheet_var.get() == "all" and self.merge_var.get():
+                # すべてのシートを1つのPDFにまとめる（1回の処理で作るため並列にはしない）
+                pdf_path = self.converter.convert_workbook_merged(self.excel_file, self.output_dir)
+                self.root.after(0, self.conversion_complete, [(None, pdf_path)], False)
+            elif self.sheet_var.get() == "all":
+                # すべてのシートを変換（並列数が2以上ならプロセスプールで並列に変換）
                 sheets = self.converter.get_sheet_names(self.excel_file)
-                results = []
-                for i, sheet in enumerate(sheets):
-                    self.root.after(0, self.update_status, f"変換中... ({i+1}/{len(sheets)})")
-                    word_path, pdf_path = self.converter.convert(self.excel_file, self.output_dir, sheet)
-                    results.append((sheet, pdf_path))
+                self.root.after(0, self.update_status, f"変換中... (0/{len(sheets)})")
+                
+                def on_progress(done, total, result):
+                    # 並列に変換する場合はシート単位で進み具合を表示する
+                    if self.get_workers() > 1:
+                        self.root.after(0, self.update_progress, done * 100 / total, f"変換中... ({done}/{total})")
+                
+                conversion_results = convert_sheets_parallel(
+                    self.excel_file, self.output_dir, sheets, workers=self.get_workers(),
+                    progress=on_progress, text_only=text_only, selected_columns=selected_columns,
+                    outputs=outputs, progress_callback=self.on_row_progress, cancel_token=cancel_token,
+                )
+                if cancel_token.cancelled:
+                    raise ConversionCancelled("変換が中止されました")
+                results = [(result.sheet_name, result.pdf_path) for result in conversion_results if result.ok]
+                errors = [(result.sheet_name, result.error) for result in conversion_results if not result.ok]
                 
                 # 完了メッセージ
-                self.root.after(0, self.conversion_complete, results, True)
+                self.root.after(0, self.conversion_complete, results, True, errors)
             else:
                 # 選択されたシートのみ変換
                 selected_sheet = self.sheet_combo.get()
                 word_path, pdf_path = self.converter.convert(self.excel_file, self.output_dir, selected_sheet)
                 self.root.after(0, self.conversion_complete, [(selected_sheet, pdf_path)], False)
                 
+        except ConversionCancelled:
+            self.root.after(0, self.conversion_cancelled)
         except Exception as e:
             self.root.after(0, self.conversion_error, str(e))
             
+    def get_workers(self):
+        """並列数を取得（不正な値の場合は1）"""
+        try:
+            return max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            return 1
+            
     def update_status(self, message):
         """ステータスメッセージを更新"""
         self.status_label.config(text=message, foreground="blue")
         
-    def conversion_complete(self, results, is_multiple):
-        """変換完了時の処理"""
-        self.progress.stop()
+    def update_progress(self, percent, message):
+        """プログレスバーとステータスメッセージを更新"""
+        if self.cancel_token is None or self.cancel_token.cancelled:
+            return  # 変換が終わった後・中止した後に届いた通知
+        self.progress['value'] = percent
+        self.update_status(message)
+        
+    def finish_conversion(self):
+        """変換の終了時（完了・中止・エラー）にUIを戻す"""
+        self.cancel_token = None
         self.progress.grid_remove()
         self.convert_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        
+    def conversion_complete(self, results, is_multiple, errors=None):
+        """変換完了時の処理"""
+        self.finish_conversion()
         
         if is_multiple:
             message = f"✅ {len(results)}個のシートの変換が完了しました！\n\n"
             for sheet, pdf_path in results:
                 message += f"• {sheet} → {Path(pdf_path).name}\n"
+            if errors:
+                message += f"\n❌ {len(errors)}個のシートでエラーが発生しました:\n"
+                for sheet, error in errors:
+                    message += f"• {sheet}: {error}\n"
         else:
             sheet, pdf_path = results[0]
             message = f"✅ 変換が完了しました！\n\nPDF: {Path(pdf_path).name}"
@@ -257,11 +354,14 @@ class SimpleExcelToPDFGUI:
         self.status_label.config(text="変換完了！", foreground="green")
         messagebox.showinfo("完了", message)
         
+    def conversion_cancelled(self):
+        """変換を中止した時の処理"""
+        self.finish_conversion()
+        self.status_label.config(text="変換を中止しました", foreground="orange")
+        
     def conversion_error(self, error_message):
         """変換エラー時の処理"""
-        self.progress.stop()
-        self.progress.grid_remove()
-        self.convert_button.config(state="normal")
+        self.finish_conversion()
         self.status_label.config(text="エラーが発生しました", foreground="red")
         messagebox.showerror("エラー", f"変換中にエラーが発生しました:\n{error_message}")
         
@@ -322,7 +422,7 @@ def simple_cli_mode():
             if col_choice == "2":
                 selected_columns = ["ALL"]
             elif col_choice == "3":
-                custom = input("列を入力（カンマ区切り、例: A,B,D）: ").strip()
+                custom = input("列を入力（カンマ区切り、例: A,B,D / C:F / AA / 見出し名）: ").strip()
                 selected_columns = [col.strip().upper() for col in custom.split(",") if col.strip()] or ["B"]
             else:
                 selected_columns = ["B"]
@@ -343,9 +443,9 @@ def simple_cli_mode():
             if choice == '' or choice == 'y':
                 # すべて変換
                 print("\n🔄 すべてのシートを変換します...")
-                for sheet_name in sheets:
-                    print(f"  • {sheet_name} を変換中...")
-                    word_path, pdf_path = converter.convert(excel_file, None, sheet_name)
+                # ワークブックは1回だけ開き、シートごとに変換する
+                for sheet_name, word_path, pdf_path in converter.iter_convert_workbook(excel_file, None, sheets):
+                    print(f"  • {sheet_name} を変換しました")
                 print(f"\n✅ {len(sheets)}個のシートの変換が完了しました!")
             else:
                 # 個別選択
@@ -369,7 +469,7 @@ def simple_cli_mode():
                             if col_choice == "2":
                                 selected_columns = ["ALL"]
                             elif col_choice == "3":
-                                custom = input("列を入力（カンマ区切り、例: A,B,D）: ").strip()
+                                custom = input("列を入力（カンマ区切り、例: A,B,D / C:F / AA / 見出し名）: ").strip()
                                 selected_columns = [col.strip().upper() for col in custom.split(",") if col.strip()] or ["B"]
                             else:
                                 selected_columns = ["B"]
@@ -411,24 +511,21 @@ def main():
         print("  • テキストのみのPDF出力（色やセル装飾なし）")
         print("  • 列選択機能（デフォルトはB列）")
     else:
-        # デフォルトはCLIモード
+        # 引数があればCLIモード（tkinterは読み込まない）
+        # 環境変数でGUIを無効化できる
+        if len(sys.argv) > 1 or os.environ.get('NO_GUI') == '1':
+            simple_cli_mode()
+            return
         try:
             # tkinterが利用可能か確認
-            import tkinter
-            # 環境変数でGUIを無効化できる
-            if os.environ.get('NO_GUI') != '1':
-                # 引数がなければGUIを起動
-                if len(sys.argv) == 1:
-                    app = SimpleExcelToPDFGUI()
-                    app.run()
-                else:
-                    # 引数があればCLIモード
-                    simple_cli_mode()
-            else:
-                simple_cli_mode()
+            _load_tk()
         except ImportError:
             # tkinterが利用不可の場合はCLIモード
             simple_cli_mode()
+            return
+        # 引数がなければGUIを起動
+        app = SimpleExcelToPDFGUI()
+        app.run()
 
 
 if __name__ == "__main__":
@@ -3,78 +3,208 @@
 ExcelからWordへ文章内容をコピーし、PDFで出力するプログラム
 """
 
+import contextlib
+import io
 import os
 import sys
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-# Excel操作用
-from openpyxl import load_workbook
-from openpyxl.cell.cell import Cell
-from openpyxl.utils import get_column_letter
-
-# Word操作用
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-
-# PDF変換用
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.platypus.tables import Table
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+# openpyxl / python-docx / reportlab は起動時間を短くするため、
+# それぞれの処理（読み取り・Word出力・PDF出力）の中で必要になったときに読み込む
+import font_registry
+import workbook_info
+from column_projection import ColumnProjection, column_bounds, partial_row_getter, row_getter
+from row_pipeline import RowStream, as_row_stream, tee
+from row_table import RowTable
+from metrics import Instrumentation, StageMetrics
+from progress import ConversionCancelled, ProgressReporter
+
+
+# 出力できる形式
+OUTPUT_FORMATS = ('docx', 'pdf')
+
+# 出力の内容が変わる変更をしたら上げる（古い変換結果のキャッシュを使わないようにする）
+CONVERTER_VERSION = 4
+
+
+def _modified_time(path) -> Optional[int]:
+    """ファイルの更新時刻（ファイルがない場合はNone）"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _is_stream(target) -> bool:
+    """パスではなくファイルオブジェクト（ストリーム）かどうか"""
+    return hasattr(target, "write") or hasattr(target, "read")
+
+
+def _output_target(target):
+    """出力先（パスは文字列にし、バイナリのファイルオブジェクトはそのまま使う）"""
+    return target if _is_stream(target) else str(target)
+
+
+def _target_label(target) -> str:
+    """メッセージや計測結果に表示する出力先・入力元の名前"""
+    if _is_stream(target):
+        name = getattr(target, "name", None)
+        return name if isinstance(name, str) else "（メモリ上のデータ）"
+    return str(target)
+
+
+def _has_reliable_dimension(sheet) -> bool:
+    """読み取り専用モードのシートのdimensionを信用してよいか
+
+    dimensionがないシートと、セルがあっても "A1" しか書かないアプリが作った
+    シートでは、dimensionを使うと行・列が欠ける。
+    """
+    return sheet.max_column is not None and (sheet.max_row, sheet.max_column) != (1, 1)
+
+
+def _stage_identity(stage) -> Optional[str]:
+    """行の変換ステージをキャッシュのキーで区別する名前（区別できない場合はNone）
+
+    モジュールの関数（row_pipeline.drop_empty_rows など）は「モジュール名.関数名」で区別する。
+    ラムダ・クロージャ・メソッドなどは同じ名前でも結果が変わりうるため区別できない。
+    """
+    module = getattr(stage, '__module__', None)
+    qualname = getattr(stage, '__qualname__', None)
+    if (not module or not qualname or '<' in qualname
+            or getattr(stage, '__closure__', None) or getattr(stage, '__self__', None) is not None):
+        return None
+    return f"{module}.{qualname}"
+
+
+def _workbook_source(source):
+    """bytes またはバイナリのファイルオブジェクトを、openpyxlで開ける形にする
+
+    openpyxl（zipfile）はシークできるファイルオブジェクトが必要なため、
+    シークできないストリームはメモリに読み込む（ディスクには書き出さない）。
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    seekable = getattr(source, "seekable", None)
+    if seekable is not None and seekable():
+        return source
+    return io.BytesIO(source.read())
+
+
+class _LazyWorkbook:
+    """最初にシートを読むときにワークブックを開く代理オブジェクト"""
+    
+    def __init__(self, converter, excel_path: str):
+        self._converter = converter
+        self._excel_path = excel_path
+        self._workbook = None
+    
+    def _open(self):
+        if self._workbook is None:
+            self._workbook = self._converter.open_workbook(self._excel_path)
+        return self._workbook
+    
+    @property
+    def sheetnames(self) -> List[str]:
+        if self._workbook is None:
+            # シート名はセルデータを読まずに取得できる
+            return workbook_info.get_sheet_names(self._excel_path)
+        return self._workbook.sheetnames
+    
+    @property
+    def active(self):
+        return self._open().active
+    
+    def __getitem__(self, sheet_name: str):
+        return self._open()[sheet_name]
+    
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
 
 
 class ExcelToWordPDFConverter:
     """ExcelファイルをWord経由でPDFに変換するクラス"""
     
-    def __init__(self, text_only=False, selected_columns=None):
-        self.styles = getSampleStyleSheet()
-        self._setup_japanese_font()
+    def __init__(self, text_only=False, selected_columns=None, streaming=True, outputs=None,
+                 fast_docx=True, table_chunk_rows=200, fast_text=True,
+                 font_name=font_registry.DEFAULT_FONT_NAME, font_size=font_registry.DEFAULT_FONT_SIZE,
+                 leading=font_registry.DEFAULT_LEADING, fallback_fonts=font_registry.DEFAULT_FALLBACK_FONTS,
+                 cache=None, row_stages=None, instrumentation=None, parallel_outputs=True,
+                 progress_callback=None, cancel_token=None, pdf_memory_limit=None):
+        # フォントとスタイルはプロセス全体で共有する（登録は1回だけ）
+        self.font_name = font_name
+        self.font_size = font_size
+        self.leading = leading
+        self.fallback_fonts = tuple(fallback_fonts)
+        self._japanese_style = None  # PDFを作るときに共有のレジストリから取得する
         self.text_only = text_only  # テキストのみのPDF出力モード
         self.selected_columns = selected_columns or ['B']  # デフォルトはB列
+        self.column_projection = ColumnProjection(self.selected_columns)  # 列指定は一度だけ解析する
+        self.streaming = streaming  # 読み取り専用モードで行を逐次読み込む（大きなファイル向け）
+        self.outputs = tuple(outputs) if outputs else OUTPUT_FORMATS  # 出力する形式（'docx', 'pdf'）
+        self.fast_docx = fast_docx  # 表の行をdocument.xmlへ直接書き込む高速なWord出力
+        self.table_chunk_rows = table_chunk_rows  # 通常モードの表をページ単位で作る際の測定単位（0で無効、すべての行を読み込む）
+        self.fast_text = fast_text  # テキストのみモードをcanvasへ直接描画する
+        self.cache = cache  # 変換結果のキャッシュ（ConversionCache、Noneで無効）
+        self.row_stages = list(row_stages or [])  # 読み取った行を出力前に変換するステージ
+        self.instrumentation = instrumentation or Instrumentation.disabled()  # 段階ごとの計測
+        self._metrics_context = {}  # 計測結果に付けるファイル名・シート名
+        self.parallel_outputs = parallel_outputs  # WordとPDFを並行して作る（Falseなら順番に作る）
+        # 進み具合の通知（ConversionProgressを受け取る関数）と中止の確認（CancelToken）
+        self.progress = ProgressReporter(progress_callback, cancel_token)
+        # PDFのページ内容をメモリに保持する上限（バイト）。指定すると書き終えたページを
+        # ディスクへ書き出し、フローアブルも少しずつ作る（Noneなら従来どおりメモリ上で作る）
+        self.pdf_memory_limit = pdf_memory_limit
+        unknown = set(self.outputs) - set(OUTPUT_FORMATS)
+        if unknown:
+            raise ValueError(f"未対応の出力形式です: {', '.join(sorted(unknown))}")
     
     def _setup_japanese_font(self):
-        """日本語フォントの設定（CIDフォントを使用）"""
-        try:
-            # 日本語CIDフォントを登録
-            pdfmetrics.registerFont(UnicodeCIDFont('HeiseiKakuGo-W5'))
-            
-            # 日本語フォントのスタイルを作成
-            self.japanese_style = ParagraphStyle(
-                'Japanese',
-                parent=self.styles['Normal'],
-                fontName='HeiseiKakuGo-W5',
-                fontSize=10,
-                leading=12,
-            )
-        except Exception as e:
-            print(f"フォント設定エラー: {e}")
-            # フォールバックとして別のCIDフォントを試す
-            try:
-                pdfmetrics.registerFont(UnicodeCIDFont('HeiseiMin-W3'))
-                self.japanese_style = ParagraphStyle(
-                    'Japanese',
-                    parent=self.styles['Normal'],
-                    fontName='HeiseiMin-W3',
-                    fontSize=10,
-                    leading=12,
-                )
-            except:
-                self.japanese_style = self.styles['Normal']
+        """日本語フォントの設定（CIDフォントを使用、共有のレジストリから取得）"""
+        self._japanese_style = font_registry.get_paragraph_style(
+            self.font_name, self.font_size, self.leading, self.fallback_fonts)
+    
+    @property
+    def styles(self):
+        """共有のサンプルスタイルシート"""
+        return font_registry.get_stylesheet()
+    
+    @property
+    def japanese_style(self):
+        """日本語フォントのParagraphStyle（初めて使うときにフォントを登録する）"""
+        if self._japanese_style is None:
+            self._setup_japanese_font()
+        return self._japanese_style
+    
+    def preload(self):
+        """出力に必要なライブラリとフォントを先に読み込んでおく（常駐プロセス用）"""
+        from openpyxl import load_workbook  # noqa: F401
+        if 'docx' in self.outputs:
+            if self.fast_docx:
+                import docx_writer  # noqa: F401
+            else:
+                import docx  # noqa: F401
+        if 'pdf' in self.outputs:
+            self._setup_japanese_font()
+            if self.text_only and self.fast_text:
+                import pdf_text  # noqa: F401
+            else:
+                import pdf_tables  # noqa: F401
+                import reportlab.platypus  # noqa: F401
     
     def get_sheet_names(self, excel_path: str) -> List[str]:
-        """Excelファイルからシート名のリストを取得する"""
+        """Excelファイルからシート名のリストを取得する（セルデータは読み込まない）"""
+        try:
+            return workbook_info.get_sheet_names(excel_path)
+        except Exception:
+            # パッケージ構造を直接読めない場合はopenpyxlで読み込む
+            pass
         try:
-            workbook = load_workbook(excel_path, data_only=True)
+            from openpyxl import load_workbook
+            workbook = load_workbook(excel_path, read_only=True, data_only=True)
             sheet_names = workbook.sheetnames
             workbook.close()
             return sheet_names
@@ -82,58 +212,207 @@ class ExcelToWordPDFConverter:
             print(f"Error listing sheets: {e}")
             return []
     
-    def read_excel(self, excel_path: str, sheet_name: str = None) -> List[List[str]]:
-        """Excelファイルからデータを読み取る（.xlsm対応、列選択対応）"""
+    def _selected_column_indices(self, sheet, max_column: Optional[int] = None) -> Optional[List[int]]:
+        """選択された列の0始まりインデックスを昇順・重複なしで返す（全列の場合はNone）
+
+        max_column はセルから確かめたシートの列数（省略した場合はシートの max_column）。
+        dimension を捨てたシートで列数が分からなければ、範囲外の列も残す。
+        """
+        header = None
+        if self.column_projection.needs_header:
+            # 見出し名での指定は1行目だけを読んで解決する
+            header = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        return self.column_projection.resolve(header, max_column if max_column is not None else sheet.max_column)
+    
+    def open_workbook(self, excel_path: str):
+        """ワークブックを開く（.xlsmファイルもサポート、マクロは無視される）"""
+        from openpyxl import load_workbook
+        return load_workbook(excel_path, read_only=self.streaming, data_only=True, keep_vba=False)
+    
+    def open_workbook_for_sheets(self, excel_path: str):
+        """シートを順に変換するためにワークブックを開く
+        
+        キャッシュを使う場合は、キャッシュにないシートを読むときまで実際には開かない
+        （すべてのシートがキャッシュにあればワークブックを開かずに済む）。
+        """
+        if self.cache is None:
+            return self.open_workbook(excel_path)
+        return _LazyWorkbook(self, excel_path)
+    
+    def read_excel(self, excel_path: str, sheet_name: str = None) -> RowTable:
+        """Excelファイルからデータを読み取る（.xlsm対応、列選択対応）
+        
+        戻り値のRowTableは行のリストと同じように行（RowView）を順に取り出せる。
+        """
         try:
-            # .xlsmファイルもサポート（マクロは無視される）
-            workbook = load_workbook(excel_path, data_only=True, keep_vba=False)
-            if sheet_name:
-                if sheet_name in workbook.sheetnames:
-                    sheet = workbook[sheet_name]
-                else:
-                    print(f"Warning: Sheet '{sheet_name}' not found. Using active sheet.")
-                    sheet = workbook.active
-            else:
-                sheet = workbook.active
-            
-            data = []
-            
-            # 列選択が有効な場合
-            if self.selected_columns and self.selected_columns != ['ALL']:
-                # 選択された列のインデックスを計算
-                column_indices = []
-                for col_letter in self.selected_columns:
-                    col_idx = ord(col_letter.upper()) - ord('A')
-                    column_indices.append(col_idx)
-                
-                for row in sheet.iter_rows():
-                    row_data = []
-                    for idx, cell in enumerate(row):
-                        if idx in column_indices:
-                            value = cell.value if cell.value is not None else ""
-                            row_data.append(str(value))
-                    if any(row_data):  # 空行でない場合のみ追加
-                        data.append(row_data)
-            else:
-                # 全列を読み取る（従来の動作）
-                for row in sheet.iter_rows():
-                    row_data = []
-                    for cell in row:
-                        value = cell.value if cell.value is not None else ""
-                        row_data.append(str(value))
-                    if any(row_data):  # 空行でない場合のみ追加
-                        data.append(row_data)
-            
-            workbook.close()
-            return data
-            
+            workbook = self.open_workbook(excel_path)
+            try:
+                return self.read_sheet(workbook, sheet_name)
+            finally:
+                workbook.close()
+        except ConversionCancelled:
+            raise
         except Exception as e:
             print(f"Excelファイルの読み取りエラー: {e}")
             raise
     
-    def create_word_document(self, data: List[List[str]], word_path: str):
-        """データからWordドキュメントを作成"""
+    def _select_sheet(self, workbook, sheet_name: str = None):
+        if sheet_name:
+            if sheet_name in workbook.sheetnames:
+                return workbook[sheet_name]
+            print(f"Warning: Sheet '{sheet_name}' not found. Using active sheet.")
+        return workbook.active
+    
+    def _start_sheet(self, workbook, sheet_name: str = None):
+        """読み取るシートを選び、進み具合の通知を始める"""
+        sheet = self._select_sheet(workbook, sheet_name)
+        if hasattr(sheet, 'reset_dimensions') and not _has_reliable_dimension(sheet):
+            # 読み取り専用モードではiter_rowsがdimensionの範囲で行・列を打ち切るが、
+            # dimensionがない・"A1"だけのファイルでは正しくないため使わない
+            sheet.reset_dimensions()
+        # 総行数はdimensionの値を目安として使う（捨てた場合は分からない）
+        self.progress.start_sheet(sheet.title, sheet.max_row)
+        return sheet
+    
+    def _sheet_max_column(self, sheet) -> Optional[int]:
+        """シートの列数を返す（分からない場合はNone）
+        
+        通常モードのシートと、dimensionを信用した読み取り専用モードのシートでは
+        max_columnをそのまま使う。dimensionを捨てたシートだけ、シートXMLを
+        もう一度展開してセルの位置から列数を求める。
+        """
+        if sheet.max_column is not None:
+            return sheet.max_column
+        with sheet._get_source() as source:
+            return workbook_info.scan_max_column(source)
+    
+    def read_sheet(self, workbook, sheet_name: str = None) -> RowTable:
+        """開いているワークブックから1シート分のデータを読み取る"""
+        sheet = self._start_sheet(workbook, sheet_name)
+        column_indices = self._selected_column_indices(sheet)
+        return self._read_sheet_rows(sheet, column_indices)
+    
+    def _read_sheet_rows(self, sheet, column_indices: Optional[List[int]]) -> RowTable:
+        """シートのすべての行をRowTableとして読み取る（'read' 段階として計測する）"""
+        with self.instrumentation.stage('read', **self._metrics_context, sheet=sheet.title) as metrics:
+            read_rows = self._read_rows_streaming if self.streaming else self._read_rows
+            data = read_rows(sheet, column_indices)
+            metrics.rows = len(data)
+            metrics.cells = len(data) * data.width
+        return data
+    
+    def iter_sheet(self, workbook, sheet_name: str = None) -> RowStream:
+        """開いているワークブックの1シートを、行を逐次返すRowStreamとして読み取る
+        
+        行はワークブックを開いている間に消費すること。読み取り専用モードで
+        dimensionを捨てたシートでは、表の列数を先に決めるためにシートXMLの
+        セルの位置から列数を調べる。列数が分からないシート（セルの位置が
+        省略されている場合）や通常モードでは、
+        読み取り結果をリストにまとめてから返す。row_stagesがあれば順に通す。
+        """
+        sheet = self._start_sheet(workbook, sheet_name)
+        max_column = self._sheet_max_column(sheet) if self.streaming else None
+        column_indices = self._selected_column_indices(sheet, max_column)
+        if max_column == 0 or (column_indices is not None and not column_indices):
+            stream = RowStream([], 0)
+        elif max_column is not None:
+            if column_indices is not None:
+                min_col, max_col, offsets = column_bounds(column_indices)
+                rows = self._iter_rows_streaming(sheet, min_col, max_col, row_getter(offsets))
+                width = len(column_indices)
+            else:
+                rows = self._iter_rows_streaming(sheet, 1, max_column)
+                width = max_column
+            # 読み取りは出力と交互に進むため、行を取り出すのにかかった時間を合計する
+            rows = self.instrumentation.measure_rows(rows, 'read', **self._metrics_context, sheet=sheet.title)
+            stream = RowStream(rows, width)
+        else:
+            stream = as_row_stream(self._read_sheet_rows(sheet, column_indices))
+        return stream.pipe(*self.row_stages)
+    
+    def _read_rows(self, sheet, column_indices: Optional[List[int]]) -> RowTable:
+        """通常モードのシートから行を読み取る（全セルを読み込む従来の動作）"""
+        if column_indices is not None and not column_indices:
+            return RowTable()
+        
+        rows = sheet.iter_rows()
+        getter = None
+        if column_indices is not None:
+            min_col, max_col, offsets = column_bounds(column_indices)
+            rows = sheet.iter_rows(min_col=min_col, max_col=max_col)
+            getter = row_getter(offsets)
+        
+        data = RowTable()
+        for row in self.progress.read_rows(rows):
+            if getter is not None:
+                row = getter(row)
+            row_data = []
+            for cell in row:
+                value = cell.value if cell.value is not None else ""
+                row_data.append(str(value))
+            if any(row_data):  # 空行でない場合のみ追加
+                data.append(row_data)
+        return data
+    
+    def _read_rows_streaming(self, sheet, column_indices: Optional[List[int]]) -> RowTable:
+        """読み取り専用モードのシートから値のタプルを逐次読み取る
+        
+        iter_rowsの範囲を選択列の最小の列からに絞り、セルオブジェクトは作らない。
+        戻り値は_read_rowsと同じ形になる。
+        """
+        if column_indices is not None and not column_indices:
+            return RowTable()
+        
+        min_col, getter = 1, None
+        if column_indices is not None:
+            min_col, _max_col, offsets = column_bounds(column_indices)
+            # 範囲外の選択列は、どの行にもその列のセルがなければ含めない
+            getter = partial_row_getter(offsets)
+        
+        # dimensionを捨てたシートでは行ごとに長さ（最後のセルまで）が異なるが、
+        # RowTableでは短い行は最大列数まで空のセルで埋めた扱いになる
+        return RowTable.from_rows(self._iter_rows_streaming(sheet, min_col, None, getter))
+    
+    def _iter_rows_streaming(self, sheet, min_col: int, max_col: Optional[int],
+                             getter=None) -> Iterator[List[str]]:
+        """値のタプルを1行ずつ文字列のリストに変換して返す（空行は除く）"""
+        rows = sheet.iter_rows(min_col=min_col, max_col=max_col, values_only=True)
+        for values in self.progress.read_rows(rows):
+            if getter is not None:
+                values = getter(values)
+            row_data = ["" if value is None else str(value) for value in values]
+            if any(row_data):  # 空行でない場合のみ追加
+                yield row_data
+    
+    def _counted(self, data, metrics, output: str) -> RowStream:
+        """出力側で消費した行を数える（計測が有効ならmetricsに、進み具合の通知・中止の確認にも使う）"""
+        rows = as_row_stream(data)
+        if not self.instrumentation.enabled and not self.progress.active:
+            return rows
+        counted = self.progress.rendered_rows(rows, output)
+        if self.instrumentation.enabled:
+            counted = metrics.count(counted)
+        return RowStream(counted, rows.width, rows.close)
+    
+    def create_word_document(self, data: Union[List[List[str]], RowStream], word_path: str):
+        """データ（行のリストまたはRowStream）からWordドキュメントを作成"""
+        output = _target_label(word_path)
+        with self.instrumentation.stage('word', **self._metrics_context, output=output) as metrics:
+            self._create_word_document(self._counted(data, metrics, 'docx'), word_path)
+    
+    def _create_word_document(self, data: RowStream, word_path: str):
         try:
+            if self.fast_docx:
+                # 行を1行ずつ文書のXMLに直接書き込む（行がなければ空の文書）
+                from docx_writer import write_table_docx
+                max_cols = data.width if data.peek() is not None else 0
+                write_table_docx(data, word_path, max_cols)
+                print(f"Wordドキュメントを作成しました: {_target_label(word_path)}")
+                return
+            
+            # python-docxで表を作る従来の方法では行数が必要なため、RowTableにまとめる
+            data = RowTable.from_rows(data)
+            from docx import Document
             doc = Document()
             
             # タイトルを追加（最初の行をタイトルとして扱う）
@@ -160,72 +439,151 @@ class ExcelToWordPDFConverter:
                 #     p.add_run(' | '.join(row))
             
             doc.save(word_path)
-            print(f"Wordドキュメントを作成しました: {word_path}")
+            print(f"Wordドキュメントを作成しました: {_target_label(word_path)}")
             
+        except ConversionCancelled:
+            raise
         except Exception as e:
             print(f"Wordドキュメントの作成エラー: {e}")
             raise
     
-    def convert_to_pdf_from_data(self, data: List[List[str]], pdf_path: str):
-        """データから直接PDFを作成（Word経由せず）"""
+    def _table_style(self):
+        """通常モードの表のスタイル（1行目は見出し行）"""
+        from reportlab.lib import colors
+        from reportlab.platypus import TableStyle
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), self.japanese_style.fontName),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            # 文字列のままのセル（TableCells）もParagraphのセルと同じフォント・色で描画する
+            ('FONT', (0, 0), (-1, -1), self.japanese_style.fontName, self.japanese_style.fontSize,
+             self.japanese_style.leading),
+            ('TEXTCOLOR', (0, 0), (-1, -1), self.japanese_style.textColor),
+        ])
+    
+    def _pdf_canvasmaker(self):
+        """PDFを描画するCanvasのクラス（pdf_memory_limitを指定した場合はページをディスクへ書き出す）"""
+        if self.pdf_memory_limit is None:
+            from reportlab.pdfgen import canvas
+            return canvas.Canvas
+        from functools import partial
+        from pdf_spool import SpoolingCanvas
+        return partial(SpoolingCanvas, memory_limit=self.pdf_memory_limit)
+    
+    def _sheet_flowables(self, data: RowStream) -> Iterable:
+        """1シート分のフローアブル（テキストのみモードは段落を順に作るイテレーター、通常モードは表のリスト）"""
+        from reportlab.platypus import Paragraph, Spacer, Table
+        from xml.sax.saxutils import escape
+        
+        if data.peek() is None:
+            return []
+        
+        if self.text_only:
+            # テキストのみモード：シンプルなレイアウト
+            def paragraphs():
+                for row in data:
+                    text = "  ".join(row)  # セル間をスペースで区切る
+                    # セルの '<' や '&' をマークアップとして解釈しない
+                    yield Paragraph(escape(text), self.japanese_style)
+                    yield Spacer(1, 6)
+            
+            return paragraphs()
+        
+        # 通常モード：テーブル形式でデータを追加
+        from pdf_tables import ChunkedTable, TableCells
+        
+        # 折り返しが必要なセルだけをParagraphにする（不足している列は空のセルで埋める）
+        cells = TableCells(self.japanese_style, data.width)
+        
+        if self.table_chunk_rows or self.pdf_memory_limit is not None:
+            # ページに収まる行ごとにTableを作る（見出し行は各ページで繰り返す）
+            return [ChunkedTable(data, cells.row, self._table_style(),
+                                 chunk_rows=self.table_chunk_rows or 200, plan_widths=cells.plan_widths)]
+        # 1つのTableにすべての行を入れる（従来の動作、行はすべてメモリに読み込む）
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import inch
+        rows = list(data)
+        # SimpleDocTemplateの余白（左右1インチ）とフレームの内側の余白（左右6pt）を除いた幅
+        col_widths = cells.plan_widths(rows, A4[0] - 2 * inch - 12)
+        table = Table([cells.row(row, col_widths) for row in rows], colWidths=col_widths)
+        table.setStyle(self._table_style())
+        return [table]
+    
+    def _build_document(self, doc, story):
+        """doc.buildでPDFを書き出す（ページごとに進み具合を通知する）"""
+        try:
+            doc.build(story, onFirstPage=self.progress.page_done, onLaterPages=self.progress.page_done,
+                      canvasmaker=self._pdf_canvasmaker())
+        except BaseException:
+            # 書きかけのファイルを残さない（ページをディスクへ書き出している場合）
+            discard = getattr(getattr(doc, 'canv', None), 'discard', None)
+            if discard is not None:
+                discard()
+            raise
+    
+    def convert_to_pdf_from_data(self, data: Union[List[List[str]], RowStream], pdf_path: str):
+        """データ（行のリストまたはRowStream）から直接PDFを作成（Word経由せず）
+        
+        テキストのみモード（高速版・Paragraph版とも）と表のページ分割が有効な通常モードでは、
+        行を逐次読みながら描画するため、保持するのは1ページ分程度の行だけになる。
+        pdf_memory_limit を指定した場合は、書き終えたページもディスクへ書き出すため、
+        ページ数が増えてもメモリの使用量はほぼ一定になる。
+        table_chunk_rows=0（1つのTableにすべての行を入れる従来の動作）で pdf_memory_limit を
+        指定しない場合だけは、表全体を分割するためにすべての行をメモリに読み込む。
+        """
+        context = dict(self._metrics_context, output=_target_label(pdf_path))
+        # 出力側で消費した行数（表をページ単位で作る場合はdoc.buildの中で行を読む）
+        consumed = StageMetrics('pdf')
         try:
+            data = self._counted(data, consumed, 'pdf')
+            if self.text_only and self.fast_text:
+                # テキストのみモード：canvasに直接描画する（Paragraphを使わない高速版）
+                from pdf_text import TextPDFRenderer
+                with self.instrumentation.stage('pdf_build', **context) as metrics:
+                    renderer = TextPDFRenderer(self.japanese_style.fontName, self.japanese_style.fontSize,
+                                               self.japanese_style.leading)
+                    # セル間をスペースで区切る
+                    metrics.pages = renderer.render(("  ".join(row) for row in data), pdf_path,
+                                                    on_page=self.progress.page_done,
+                                                    canvasmaker=self._pdf_canvasmaker())
+                    metrics.rows, metrics.cells = consumed.rows, consumed.cells
+                print(f"PDFファイルを作成しました: {_target_label(pdf_path)}")
+                return
+            
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import SimpleDocTemplate
+            
             doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-            story = []
             
             # タイトルは追加しない（ユーザーリクエストにより削除）
             
-            if data:
-                if self.text_only:
-                    # テキストのみモード：シンプルなレイアウト
-                    for row in data:
-                        text = "  ".join(row)  # セル間をスペースで区切る
-                        p = Paragraph(text, self.japanese_style)
-                        story.append(p)
-                        story.append(Spacer(1, 6))
-                else:
-                    # 通常モード：テーブル形式でデータを追加
-                    table_data = []
-                    for row in data:
-                        # 各セルをParagraphオブジェクトに変換（長いテキストの折り返し対応）
-                        table_row = []
-                        for cell in row:
-                            p = Paragraph(cell, self.japanese_style)
-                            table_row.append(p)
-                        # 不足している列を空文字で埋める
-                        max_cols = max(len(r) for r in data)
-                        while len(table_row) < max_cols:
-                            table_row.append(Paragraph("", self.japanese_style))
-                        table_data.append(table_row)
-                    
-                    # テーブルを作成
-                    table = Table(table_data)
-                    
-                    # テーブルスタイルを設定
-                    table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'HeiseiKakuGo-W5'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 12),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ]))
-                    
-                    story.append(table)
+            with self.instrumentation.stage('pdf_story', **context) as metrics:
+                # doc.buildの進み具合に合わせて少しずつ作る（テキストのみモードの段落など）
+                from pdf_spool import FlowableFeed
+                story = FlowableFeed(self._sheet_flowables(data))
+                metrics.rows, metrics.cells = consumed.rows, consumed.cells
             
             # PDFを生成
-            doc.build(story)
-            print(f"PDFファイルを作成しました: {pdf_path}")
+            with self.instrumentation.stage('pdf_build', **context) as metrics:
+                self._build_document(doc, story)
+                metrics.pages = doc.page
+                metrics.rows, metrics.cells = consumed.rows, consumed.cells
+            print(f"PDFファイルを作成しました: {_target_label(pdf_path)}")
             
+        except ConversionCancelled:
+            raise
         except Exception as e:
             print(f"PDF作成エラー: {e}")
             raise
     
-    def convert(self, excel_path: str, output_dir: str = None, sheet_name: str = None):
-        """ExcelファイルをWordとPDFに変換する"""
-        # パスの設定
+    def prepare_output(self, excel_path: str, output_dir: str = None):
+        """入力ファイルの存在を確認し、出力ディレクトリを作成する"""
         excel_path = Path(excel_path)
         if not excel_path.exists():
             raise FileNotFoundError(f"Excelファイルが見つかりません: {excel_path}")
@@ -239,29 +597,359 @@ class ExcelToWordPDFConverter:
         
         # 出力ディレクトリが存在しない場合は作成
         output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 出力ファイル名の設定（シート名を含める）
+        return excel_path, output_dir
+    
+    def _output_paths(self, excel_path: Path, output_dir: Path, sheet_name: str = None):
+        """出力ファイル名の設定（シート名を含める）"""
         base_name = excel_path.stem
         if sheet_name:
             base_name = f"{base_name}_{sheet_name}"
-        word_path = output_dir / f"{base_name}.docx"
-        pdf_path = output_dir / f"{base_name}.pdf"
+        return output_dir / f"{base_name}.docx", output_dir / f"{base_name}.pdf"
+    
+    def _cache_options(self) -> dict:
+        """キャッシュのキーに含める変換オプション（出力の内容に影響するもの）"""
+        return {
+            "version": CONVERTER_VERSION,
+            "columns": self.column_projection.specs,
+            "text_only": self.text_only,
+            "font": [self.font_name, self.font_size, self.leading, list(self.fallback_fonts)],
+            "fast_docx": self.fast_docx,
+            "fast_text": self.fast_text,
+            "table_chunk_rows": self.table_chunk_rows,
+            "row_stages": [_stage_identity(stage) for stage in self.row_stages],
+        }
+    
+    def _cache_targets(self, word_path, pdf_path) -> dict:
+        targets = {}
+        if 'docx' in self.outputs:
+            targets['docx'] = Path(word_path)
+        if 'pdf' in self.outputs:
+            targets['pdf'] = Path(pdf_path)
+        return targets
+    
+    def _cache_key(self, excel_path, sheet_name: str = None, **options) -> Optional[str]:
+        if self.cache is None:
+            return None
+        cache_options = self._cache_options()
+        if None in cache_options["row_stages"]:
+            # 変換ステージを区別できない場合は、前回の結果が同じとは限らないためキャッシュを使わない
+            return None
+        try:
+            return self.cache.make_key(excel_path, sheet_name, dict(cache_options, **options))
+        except OSError as e:
+            print(f"キャッシュを使用できません: {e}")
+            return None
+    
+    def _restore_cached(self, cache_key: Optional[str], word_path, pdf_path):
+        """キャッシュに同じ変換結果があれば出力先にコピーし、(Word, PDF) を返す（なければNone）"""
+        if cache_key is None or not self.cache.restore(cache_key, self._cache_targets(word_path, pdf_path)):
+            return None
+        print(f"キャッシュを使用しました（変更なし）: {pdf_path if 'pdf' in self.outputs else word_path}")
+        return (str(word_path) if 'docx' in self.outputs else None,
+                str(pdf_path) if 'pdf' in self.outputs else None)
+    
+    def _store_cached(self, cache_key: Optional[str], word_path, pdf_path):
+        if cache_key is not None:
+            self.cache.store(cache_key, self._cache_targets(word_path, pdf_path))
+    
+    def convert(self, excel_path: str, output_dir: str = None, sheet_name: str = None):
+        """ExcelファイルをWordとPDFに変換する"""
+        excel_path, output_dir = self.prepare_output(excel_path, output_dir)
+        word_path, pdf_path = self._output_paths(excel_path, output_dir, sheet_name)
         
         # 処理の実行
         print(f"Excelファイルを処理中: {excel_path}")
         if sheet_name:
             print(f"対象シート: {sheet_name}")
+        self.progress.begin(1)
+        
+        # 内容と設定が前回と同じなら、キャッシュの出力を使う
+        cache_key = self._cache_key(excel_path, sheet_name)
+        cached = self._restore_cached(cache_key, word_path, pdf_path)
+        if cached:
+            self.progress.finish_sheet(sheet_name)
+            return cached
+        
+        try:
+            workbook = self.open_workbook(str(excel_path))
+        except Exception as e:
+            print(f"Excelファイルの読み取りエラー: {e}")
+            raise
+        
+        self._metrics_context = {"excel_path": str(excel_path)}
+        try:
+            # Excelの行を読みながらWordとPDFを作成（選択された形式のみ）
+            result = self.write_outputs(self.iter_sheet(workbook, sheet_name), word_path, pdf_path)
+        finally:
+            workbook.close()
+        self._store_cached(cache_key, word_path, pdf_path)
+        self.progress.finish_sheet()
+        return result
+    
+    def write_outputs(self, data: Union[List[List[str]], RowStream], word_path, pdf_path,
+                      outputs: Optional[Tuple[str, ...]] = None):
+        """読み取ったデータ（行のリストまたはRowStream）から選択された形式のファイルを作成する
+        
+        両方の形式を出力する場合は同じデータから並行して作成する
+        （RowStreamは1回の読み取りを2つの出力に分けて流す）。
+        parallel_outputs=False の場合は順番に作成する（プロファイル用）。
+        出力先はパスのほか、バイナリのファイルオブジェクトでもよい。outputs を省略した
+        場合は self.outputs の形式を作成し、作成しなかった形式の出力先はNoneを返す。
+        中止された場合は書きかけのファイルを削除する（ファイルオブジェクトはそのまま）。
+        """
+        outputs = self.outputs if outputs is None else outputs
+        targets = {'docx': _output_target(word_path) if 'docx' in outputs else None,
+                   'pdf': _output_target(pdf_path) if 'pdf' in outputs else None}
+        sinks = []
+        if targets['docx'] is not None:
+            sinks.append((self.create_word_document, targets['docx']))
+        if targets['pdf'] is not None:
+            sinks.append((self.convert_to_pdf_from_data, targets['pdf']))
+        
+        previous = {path: _modified_time(path) for _sink, path in sinks if not _is_stream(path)}
+        try:
+            if len(sinks) > 1 and not self.parallel_outputs:
+                # 順番に作る場合は、同じ行を2回使うためRowTableにまとめる
+                data = RowTable.from_rows(data)
+                for sink, path in sinks:
+                    sink(data, path)
+            elif len(sinks) > 1:
+                inputs = tee(data, len(sinks)) if isinstance(data, RowStream) else [data] * len(sinks)
+                
+                def run_sink(sink, rows, path):
+                    try:
+                        sink(rows, path)
+                    finally:
+                        # 途中で失敗した場合も、読み取り側がこの出力を待ち続けないようにする
+                        if isinstance(rows, RowStream):
+                            rows.close()
+                
+                with ThreadPoolExecutor(max_workers=len(sinks)) as executor:
+                    futures = [executor.submit(run_sink, sink, rows, path)
+                               for (sink, path), rows in zip(sinks, inputs)]
+                    for future in futures:
+                        future.result()  # 例外があればここで送出する
+            else:
+                for sink, path in sinks:
+                    sink(data, path)
+        except (ConversionCancelled, KeyboardInterrupt):
+            # 中止された場合は、この変換で書きかけたファイルを残さない
+            for path, modified in previous.items():
+                if _modified_time(path) != modified:
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+            raise
+        
+        return targets['docx'], targets['pdf']
+    
+    def convert_to_streams(self, source: Union[bytes, BinaryIO], sheet_name: str = None,
+                           word_stream: Optional[BinaryIO] = None, pdf_stream: Optional[BinaryIO] = None):
+        """ワークブック（bytes またはバイナリのファイルオブジェクト）を変換し、渡されたストリームに書き込む
         
-        # Excelデータを読み取る
-        data = self.read_excel(str(excel_path), sheet_name)
+        Wordは word_stream に、PDFは pdf_stream に書き込む（Noneの形式は作成しない）。
+        途中のファイルはディスクに書き出さない（pdf_memory_limit を指定した場合も、
+        ページは pdf_stream へ直接書き出す）。キャッシュは使わない。
+        """
+        outputs = tuple(output for output, stream in (('docx', word_stream), ('pdf', pdf_stream))
+                        if stream is not None)
+        if not outputs:
+            raise ValueError("出力先のストリームが指定されていません")
         
-        # Wordドキュメントを作成
-        self.create_word_document(data, str(word_path))
+        label = _target_label(source)
+        print(f"Excelファイルを処理中: {label}")
+        if sheet_name:
+            print(f"対象シート: {sheet_name}")
+        self.progress.begin(1)
         
-        # PDFに変換
-        self.convert_to_pdf_from_data(data, str(pdf_path))
+        try:
+            workbook = self.open_workbook(_workbook_source(source))
+        except Exception as e:
+            print(f"Excelファイルの読み取りエラー: {e}")
+            raise
         
-        return str(word_path), str(pdf_path)
+        self._metrics_context = {"excel_path": label}
+        try:
+            self.write_outputs(self.iter_sheet(workbook, sheet_name), word_stream, pdf_stream, outputs)
+        finally:
+            workbook.close()
+        self.progress.finish_sheet()
+    
+    def convert_to_bytes(self, source: Union[bytes, BinaryIO], sheet_name: str = None) -> Dict[str, bytes]:
+        """ワークブック（bytes またはバイナリのファイルオブジェクト）をメモリ上で変換する
+        
+        outputs の形式を作成し、{'docx': Wordの内容, 'pdf': PDFの内容} を返す。
+        """
+        streams = {output: io.BytesIO() for output in self.outputs}
+        self.convert_to_streams(source, sheet_name, word_stream=streams.get('docx'),
+                                pdf_stream=streams.get('pdf'))
+        return {output: stream.getvalue() for output, stream in streams.items()}
+    
+    def iter_convert_workbook(self, excel_path: str, output_dir: str = None,
+                              sheets: Optional[List[str]] = None) -> Iterator[Tuple[str, str, str]]:
+        """ワークブックを1回だけ開き、シートごとに変換して (シート名, Word, PDF) を順に返す
+        
+        sheetsを省略した場合はすべてのシートを変換する。
+        """
+        excel_path, output_dir = self.prepare_output(excel_path, output_dir)
+        print(f"Excelファイルを処理中: {excel_path}")
+        
+        try:
+            workbook = self.open_workbook_for_sheets(str(excel_path))
+        except Exception as e:
+            print(f"Excelファイルの読み取りエラー: {e}")
+            raise
+        
+        try:
+            sheet_names = list(sheets) if sheets is not None else list(workbook.sheetnames)
+            self.progress.begin(len(sheet_names))
+            for sheet_name in sheet_names:
+                word_path, pdf_path = self.convert_sheet(workbook, excel_path, output_dir, sheet_name)
+                yield sheet_name, word_path, pdf_path
+        finally:
+            workbook.close()
+    
+    def convert_sheet(self, workbook, excel_path: Path, output_dir: Path, sheet_name: str):
+        """開いているワークブックの1シートをWordとPDFに変換する"""
+        self.progress.check()
+        print(f"対象シート: {sheet_name}")
+        word_path, pdf_path = self._output_paths(Path(excel_path), Path(output_dir), sheet_name)
+        cache_key = self._cache_key(excel_path, sheet_name)
+        cached = self._restore_cached(cache_key, word_path, pdf_path)
+        if cached:
+            self.progress.finish_sheet(sheet_name)
+            return cached
+        self._metrics_context = {"excel_path": str(excel_path)}
+        result = self.write_outputs(self.iter_sheet(workbook, sheet_name), word_path, pdf_path)
+        self._store_cached(cache_key, word_path, pdf_path)
+        self.progress.finish_sheet()
+        return result
+    
+    def convert_workbook(self, excel_path: str, output_dir: str = None,
+                         sheets: Optional[List[str]] = None) -> List[Tuple[str, str, str]]:
+        """複数シートをまとめて変換する（ワークブックの読み込みは1回のみ）"""
+        return list(self.iter_convert_workbook(excel_path, output_dir, sheets))
+    
+    def convert_workbook_merged(self, excel_path: str, output_dir: str = None,
+                                sheets: Optional[List[str]] = None) -> str:
+        """複数シートを1つのPDFにまとめて変換し、PDFのパスを返す（Wordは作成しない）
+        
+        すべてのシートを1回のdoc.build（高速版のテキストのみモードは1つのcanvas）で描画するため、
+        文書ごとの準備と書き出しは1回で済む。各シートは新しいページから始まり、
+        シート名のしおり（アウトライン）が付く。シートの行は前のシートを描き終えてから読む。
+        """
+        excel_path, output_dir = self.prepare_output(excel_path, output_dir)
+        pdf_path = output_dir / f"{excel_path.stem}.pdf"
+        print(f"Excelファイルを処理中: {excel_path}")
+        
+        try:
+            workbook = self.open_workbook_for_sheets(str(excel_path))
+        except Exception as e:
+            print(f"Excelファイルの読み取りエラー: {e}")
+            raise
+        
+        try:
+            sheet_names = list(sheets) if sheets is not None else list(workbook.sheetnames)
+            if not sheet_names:
+                raise ValueError("変換するシートがありません")
+            self.progress.begin(len(sheet_names))
+            
+            # 内容と設定が前回と同じなら、キャッシュの出力を使う
+            cache_key = self._cache_key(excel_path, None, merged=sheet_names)
+            if cache_key is not None and self.cache.restore(cache_key, {'pdf': pdf_path}):
+                print(f"キャッシュを使用しました（変更なし）: {pdf_path}")
+                for sheet_name in sheet_names:
+                    self.progress.finish_sheet(sheet_name)
+                return str(pdf_path)
+            
+            self._metrics_context = {"excel_path": str(excel_path)}
+            previous = _modified_time(pdf_path)
+            try:
+                self._write_merged_pdf(workbook, sheet_names, pdf_path)
+            except (ConversionCancelled, KeyboardInterrupt):
+                # 中止された場合は、この変換で書きかけたファイルを残さない
+                if _modified_time(pdf_path) != previous:
+                    with contextlib.suppress(OSError):
+                        os.remove(pdf_path)
+                raise
+        finally:
+            workbook.close()
+        
+        if cache_key is not None:
+            self.cache.store(cache_key, {'pdf': pdf_path})
+        return str(pdf_path)
+    
+    def _write_merged_pdf(self, workbook, sheet_names: List[str], pdf_path: Path):
+        context = dict(self._metrics_context, output=str(pdf_path))
+        consumed = StageMetrics('pdf')
+        reading = []  # 描画中のシートの行
+        
+        def finish_sheet():
+            if reading:
+                reading.pop().close()
+                self.progress.finish_sheet()
+        
+        def open_sheet(sheet_name: str) -> RowStream:
+            # 前のシートを描き終えてから次のシートを読み始める
+            finish_sheet()
+            print(f"対象シート: {sheet_name}")
+            rows = self._counted(self.iter_sheet(workbook, sheet_name), consumed, 'pdf')
+            reading.append(rows)
+            return rows
+        
+        try:
+            with self.instrumentation.stage('pdf_build', **context) as metrics:
+                if self.text_only and self.fast_text:
+                    # テキストのみモード：1つのcanvasにシートを順に描画する
+                    from pdf_text import TextPDFRenderer
+                    renderer = TextPDFRenderer(self.japanese_style.fontName, self.japanese_style.fontSize,
+                                               self.japanese_style.leading)
+                    sections = ((sheet_name, ("  ".join(row) for row in open_sheet(sheet_name)))
+                                for sheet_name in sheet_names)
+                    metrics.pages = renderer.render_sections(sections, pdf_path, on_page=self.progress.page_done,
+                                                             canvasmaker=self._pdf_canvasmaker())
+                else:
+                    from reportlab.lib.pagesizes import A4
+                    from reportlab.platypus import PageBreak, SimpleDocTemplate
+                    from pdf_sections import SheetBookmark
+                    from pdf_spool import FlowableFeed
+                    
+                    def story():
+                        for index, sheet_name in enumerate(sheet_names):
+                            if index:
+                                yield PageBreak()
+                            key = f"sheet{index}"
+                            if self.text_only:
+                                yield SheetBookmark(sheet_name, key)
+                                yield from self._sheet_flowables(open_sheet(sheet_name))
+                            else:
+                                # 表はしおりに着いてから作る（前のシートの表を描き終えてから行を読む）
+                                yield SheetBookmark(sheet_name, key, contents=lambda sheet_name=sheet_name:
+                                                    list(self._sheet_flowables(open_sheet(sheet_name))))
+                    
+                    doc = SimpleDocTemplate(str(pdf_path), pagesize=A4)
+                    # フローアブルはdoc.buildの進み具合に合わせて少しずつ作る
+                    self._build_document(doc, FlowableFeed(story()))
+                    metrics.pages = doc.page
+                finish_sheet()
+                metrics.rows, metrics.cells = consumed.rows, consumed.cells
+            print(f"PDFファイルを作成しました: {pdf_path}")
+        except ConversionCancelled:
+            raise
+        except Exception as e:
+            print(f"PDF作成エラー: {e}")
+            raise
+        finally:
+            for rows in reading:
+                rows.close()
+
+
+def _print_stage_metrics(record: dict):
+    """段階ごとの計測結果を1行で表示する"""
+    memory = (f"  メモリ増加(最大) {record['peak_memory_increase_mb']:.1f}MB"
+              if record['peak_memory_increase_mb'] is not None else "")
+    pages = f"  {record['pages']}ページ" if record['pages'] is not None else ""
+    print(f"⏱ {record['stage']:<10} {record['wall_seconds']:.3f}秒 (CPU {record['cpu_seconds']:.3f}秒)"
+          f"  {record['rows']}行 / {record['cells']}セル{pages}{memory}")
 
 
 def main():
@@ -269,16 +957,64 @@ def main():
     parser = argparse.ArgumentParser(description='ExcelファイルをWord経由でPDFに変換します')
     parser.add_argument('excel_file', help='変換するExcelファイル')
     parser.add_argument('-o', '--output', help='出力ディレクトリ（省略時は入力ファイルと同じディレクトリ）')
+    parser.add_argument('--format', choices=['pdf', 'docx', 'both'], default='both',
+                        help='出力形式（デフォルト: both）')
+    parser.add_argument('--list-sheets', action='store_true', help='シート一覧（表示状態と範囲）を表示して終了')
+    parser.add_argument('--merge', action='store_true',
+                        help='すべてのシートを1つのPDFにまとめる（シートごとのしおり付き、Wordは作成しない）')
+    parser.add_argument('--no-cache', action='store_true', help='変換結果のキャッシュを使わずに変換し直す')
+    parser.add_argument('--metrics', help='段階ごとの計測結果を追記するJSON Linesファイル')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='段階ごとに、開始時から増えたメモリの最大値も計測する（tracemallocを使うため遅くなる）')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='cProfileで計測してpstats形式で保存する（キャッシュは使わず、WordとPDFは順番に作る）')
+    parser.add_argument('--pdf-memory-limit', type=float, metavar='MB',
+                        help='PDFのページをメモリに保持する上限（MB）。超えたページはディスクへ書き出す（巨大なシート向け）')
     
     args = parser.parse_args()
     
+    if args.list_sheets:
+        for info in workbook_info.list_sheets(args.excel_file, with_dimensions=True):
+            state = "" if info.visible else f" [{info.state}]"
+            print(f"{info.name}\t{info.dimension or '-'}{state}")
+        return
+    
     try:
-        converter = ExcelToWordPDFConverter()
-        word_path, pdf_path = converter.convert(args.excel_file, args.output)
+        outputs = OUTPUT_FORMATS if args.format == 'both' else (args.format,)
+        cache = None
+        if not args.no_cache and not args.profile:
+            from conversion_cache import ConversionCache
+            cache = ConversionCache()
+        instrumentation = None
+        if args.metrics or args.trace_memory:
+            instrumentation = Instrumentation(metrics_file=args.metrics, trace_memory=args.trace_memory,
+                                              hooks=[_print_stage_metrics])
+        from progress import ConsoleProgress
+        console = ConsoleProgress()
+        pdf_memory_limit = None
+        if args.pdf_memory_limit is not None:
+            pdf_memory_limit = int(args.pdf_memory_limit * 1024 * 1024)
+        # cProfileは呼び出したスレッドしか計測しないため、プロファイル時は出力を順番に作る
+        converter = ExcelToWordPDFConverter(outputs=outputs, cache=cache, instrumentation=instrumentation,
+                                            parallel_outputs=not args.profile, progress_callback=console,
+                                            pdf_memory_limit=pdf_memory_limit)
+        convert = converter.convert
+        if args.merge:
+            def convert(excel_path, output_dir):
+                return None, converter.convert_workbook_merged(excel_path, output_dir)
+        if args.profile:
+            from metrics import profiled
+            with profiled(args.profile):
+                word_path, pdf_path = convert(args.excel_file, args.output)
+        else:
+            word_path, pdf_path = convert(args.excel_file, args.output)
+        console.finish(converter.progress.state)
         
         print("\n変換完了!")
-        print(f"Word: {word_path}")
-        print(f"PDF: {pdf_path}")
+        if word_path:
+            print(f"Word: {word_path}")
+        if pdf_path:
+            print(f"PDF: {pdf_path}")
         
     except Exception as e:
         print(f"\nエラーが発生しました: {e}")
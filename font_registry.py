@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+PDF用のフォントとスタイルをプロセス全体で共有するモジュール
+
+getSampleStyleSheet() やCIDフォントの登録、ParagraphStyleの作成は
+プロセスごとに1回だけ行い、すべてのコンバーターで使い回す。
+複数のスレッドから同時に呼ばれても安全に動作する。
+"""
+
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+# reportlabは実際にフォントやスタイルが必要になるまで読み込まない
+
+# デフォルトのフォント設定
+DEFAULT_FONT_NAME = 'HeiseiKakuGo-W5'
+DEFAULT_FALLBACK_FONTS = ('HeiseiMin-W3',)
+DEFAULT_FONT_SIZE = 10
+DEFAULT_LEADING = 12
+
+_lock = threading.RLock()
+_stylesheet = None
+_font_status: Dict[str, bool] = {}  # フォント名 -> 登録できたかどうか
+_paragraph_styles: Dict[Tuple, object] = {}
+
+
+def get_stylesheet():
+    """共有のサンプルスタイルシートを返す（変更しないこと）"""
+    global _stylesheet
+    if _stylesheet is None:
+        with _lock:
+            if _stylesheet is None:
+                from reportlab.lib.styles import getSampleStyleSheet
+                _stylesheet = getSampleStyleSheet()
+    return _stylesheet
+
+
+def register_font(font_name: str) -> bool:
+    """CIDフォントを登録する（登録済みなら何もしない）。登録できたかどうかを返す"""
+    status = _font_status.get(font_name)
+    if status is not None:
+        return status
+    with _lock:
+        status = _font_status.get(font_name)
+        if status is None:
+            try:
+                from reportlab.pdfbase import pdfmetrics
+                from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+                if font_name not in pdfmetrics.getRegisteredFontNames():
+                    pdfmetrics.registerFont(UnicodeCIDFont(font_name))
+                status = True
+            except Exception as e:
+                print(f"フォント設定エラー: {e}")
+                status = False
+            _font_status[font_name] = status
+    return status
+
+
+def resolve_font(font_name: str = DEFAULT_FONT_NAME,
+                 fallback_fonts: Sequence[str] = DEFAULT_FALLBACK_FONTS) -> Optional[str]:
+    """使用できる最初のフォント名を返す（どれも登録できない場合はNone）"""
+    for name in (font_name, *fallback_fonts):
+        if register_font(name):
+            return name
+    return None
+
+
+def get_paragraph_style(font_name: str = DEFAULT_FONT_NAME, font_size: float = DEFAULT_FONT_SIZE,
+                        leading: float = DEFAULT_LEADING,
+                        fallback_fonts: Sequence[str] = DEFAULT_FALLBACK_FONTS):
+    """日本語用のParagraphStyleを返す（同じ設定なら同じオブジェクトを共有する）
+
+    フォントを登録できない場合はフォールバックのフォント、それも
+    だめな場合はサンプルスタイルシートの 'Normal' を使う。
+    """
+    key = (font_name, font_size, leading, tuple(fallback_fonts))
+    style = _paragraph_styles.get(key)
+    if style is not None:
+        return style
+    with _lock:
+        style = _paragraph_styles.get(key)
+        if style is None:
+            from reportlab.lib.styles import ParagraphStyle
+            styles = get_stylesheet()
+            resolved = resolve_font(font_name, fallback_fonts)
+            if resolved is None:
+                style = styles['Normal']
+            else:
+                style = ParagraphStyle(
+                    'Japanese',
+                    parent=styles['Normal'],
+                    fontName=resolved,
+                    fontSize=font_size,
+                    leading=leading,
+                )
+            _paragraph_styles[key] = style
+    return style
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+変換サービス（convert_server.py）の負荷テスト
+
+合成ワークブック（benchmark.pyと同じもの）または指定したファイルを、
+複数のスレッドから同時に変換サービスへ送り、応答時間（p50/p95/最大）・
+処理件数/秒・待ち行列が満杯で断られた件数（429）を表示する。
+--start-server を付けると、空いているポートで変換サービスを起動してから測定する。
+
+例:
+    python load_test.py --start-server --requests 50 --concurrency 8
+    python load_test.py --server http://127.0.0.1:8765 --file input.xlsx --requests 100 --concurrency 16
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from benchmark import generate_workbook
+from convert_client import ConversionClient, DEFAULT_SERVER, ServiceBusyError, ServiceError
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: Optional[int], max_queue: int, use_cache: bool):
+    """変換サービスを子プロセスで起動し、(プロセス, URL) を返す（応答するまで待つ）"""
+    port = _free_port()
+    command = [sys.executable, str(Path(__file__).with_name("convert_server.py")),
+               "--port", str(port), "--max-queue", str(max_queue)]
+    if workers:
+        command += ["--workers", str(workers)]
+    if not use_cache:
+        command.append("--no-cache")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    client = ConversionClient(f"http://127.0.0.1:{port}", timeout=5)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("変換サービスを起動できませんでした")
+        try:
+            client.health()
+            return process, client.server
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("変換サービスが応答しません")
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run_load(client: ConversionClient, excel_path: str, requests: int, concurrency: int,
+             retry: bool = False, **options) -> dict:
+    """requests 件の変換を concurrency 個のスレッドから送り、結果を集計する"""
+    latencies = []
+    counts = {"ok": 0, "rejected": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def one_request(_index):
+        started = time.perf_counter()
+        while True:
+            try:
+                job = client.submit(excel_path, wait=True, **options)
+                if job['status'] == 'done':
+                    for output_format in job['outputs']:
+                        client.download(job['id'], output_format)
+                    outcome = "ok"
+                else:
+                    outcome = "failed"
+                client.delete(job['id'])
+            except ServiceBusyError as e:
+                if retry:
+                    time.sleep(e.retry_after or 1)
+                    continue
+                outcome = "rejected"
+            except (ServiceError, OSError):
+                outcome = "failed"
+            break
+        elapsed = time.perf_counter() - started
+        with lock:
+            counts[outcome] += 1
+            if outcome == "ok":
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one_request, range(requests)))
+    duration = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        **counts,
+        "seconds": round(duration, 3),
+        "throughput": round(counts["ok"] / duration, 3) if duration else None,
+        "latency_p50": _round(percentile(latencies, 0.5)),
+        "latency_p95": _round(percentile(latencies, 0.95)),
+        "latency_max": _round(max(latencies) if latencies else None),
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='変換サービスに同時に変換を送り、応答時間と処理件数を測定します')
+    parser.add_argument('--server', default=DEFAULT_SERVER, help=f'サービスのURL（デフォルト: {DEFAULT_SERVER}）')
+    parser.add_argument('--start-server', action='store_true', help='空いているポートで変換サービスを起動して測定する')
+    parser.add_argument('--workers', type=int, help='--start-server のワーカープロセス数（省略時はCPUコア数）')
+    parser.add_argument('--max-queue', type=int, default=32, help='--start-server の待ち行列の上限（デフォルト: 32）')
+    parser.add_argument('--cache', action='store_true', help='--start-server で変換結果のキャッシュを使う（デフォルトは使わない）')
+    parser.add_argument('--file', help='送信するExcelファイル（省略時は合成ワークブック）')
+    parser.add_argument('--rows', type=int, default=1000, help='合成ワークブックの行数（デフォルト: 1000）')
+    parser.add_argument('--cols', type=int, default=3, help='合成ワークブックの列数（デフォルト: 3）')
+    parser.add_argument('-n', '--requests', type=int, default=50, help='送信する変換の数（デフォルト: 50）')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='同時に送信する数（デフォルト: 8）')
+    parser.add_argument('--format', choices=['pdf', 'docx', 'both'], default='pdf', help='出力形式（デフォルト: pdf）')
+    parser.add_argument('--table', action='store_true', help='通常モード（表形式）で変換する')
+    parser.add_argument('--columns', default='ALL', help='変換する列（デフォルト: ALL）')
+    parser.add_argument('--retry', action='store_true', help='429（待ち行列が満杯）の場合は待ってから送り直す')
+    parser.add_argument('-o', '--output', help='結果をJSONで保存するファイル')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    process = None
+    with tempfile.TemporaryDirectory(prefix="excel-to-pdf-load-") as workdir:
+        excel_path = args.file
+        if excel_path is None:
+            excel_path = os.path.join(workdir, f"load-r{args.rows}-c{args.cols}.xlsx")
+            generate_workbook(excel_path, args.rows, args.cols)
+        server = args.server
+        try:
+            if args.start_server:
+                process, server = start_server(args.workers, args.max_queue, args.cache)
+                print(f"🚀 変換サービスを起動しました: {server}")
+            client = ConversionClient(server)
+            health = client.health()
+            print(f"⏱ {args.requests}件を同時に{args.concurrency}件ずつ送信します"
+                  f"（ワーカー {health['workers']}、待ち行列の上限 {health['max_queue']}）")
+            result = run_load(client, excel_path, args.requests, args.concurrency, args.retry,
+                              format=args.format, table=args.table, columns=args.columns)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    print(f"\n成功: {result['ok']}  断られた(429): {result['rejected']}  失敗: {result['failed']}")
+    print(f"処理件数: {result['throughput']} 件/秒（{result['seconds']}秒）")
+    print(f"応答時間: p50 {result['latency_p50']}秒  p95 {result['latency_p95']}秒  最大 {result['latency_max']}秒")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 結果: {args.output}")
+    return 1 if result['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,8 @@ from pathlib import Path
 
 # excel_to_pdfモジュールをインポート
 from excel_to_pdf import ExcelToWordPDFConverter
+from parallel_convert import convert_sheets_parallel
+from progress import ConsoleProgress
 
 
 def select_sheet_interactive(sheets):
@@ -62,7 +64,7 @@ def select_columns_interactive():
             if choice == "" or choice == "1":
                 return ["B"]
             elif choice == "2":
-                columns = input("列を入力してください（カンマ区切り、例: A,B,D）: ").strip()
+                columns = input("列を入力してください（カンマ区切り、例: A,B,D / C:F / AA / 見出し名）: ").strip()
                 if columns:
                     # 列文字をリストに変換し、大文字に統一
                     return [col.strip().upper() for col in columns.split(",") if col.strip()]
@@ -100,26 +102,59 @@ def select_output_mode():
             sys.exit(0)
 
 
+def parse_workers_option(args):
+    """引数から --workers N（または -j N）を取り出し、(ワーカー数, 残りの引数) を返す"""
+    workers = 1
+    rest = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in ("--workers", "-j") and i + 1 < len(args):
+            value = args[i + 1]
+            i += 2
+        elif arg.startswith("--workers="):
+            value = arg.split("=", 1)[1]
+            i += 1
+        else:
+            rest.append(arg)
+            i += 1
+            continue
+        try:
+            workers = int(value)
+        except ValueError:
+            print(f"エラー: ワーカー数は整数で指定してください: {value}")
+            sys.exit(1)
+    return workers, rest
+
+
 def main():
     """メインエントリーポイント"""
     print("Excel to PDF 自動化ツール")
     print("-" * 40)
     
+    # 並列数のオプションを取り出す（0はCPUコア数）
+    workers, args = parse_workers_option(sys.argv[1:])
+    # すべてのシートを1つのPDFにまとめるオプション
+    merge = "--merge" in args
+    args = [arg for arg in args if arg != "--merge"]
+    
     # コマンドライン引数をチェック
-    if len(sys.argv) < 2:
-        print("使い方: python main.py <Excelファイル> [出力ディレクトリ]")
+    if len(args) < 1:
+        print("使い方: python main.py <Excelファイル> [出力ディレクトリ] [--workers N] [--merge]")
         print("例: python main.py sample.xlsx")
         print("例: python main.py sample.xlsx ./output")
         print("例: python main.py sample.xlsm")  # .xlsmもサポート
+        print("例: python main.py sample.xlsx ./output --workers 4  # すべてのシートを4プロセスで並列変換")
+        print("例: python main.py sample.xlsx ./output --merge  # すべてのシートを1つのPDF（しおり付き）にまとめる")
         print("\nヒント: ターミナルにExcelファイルをドラッグ&ドロップできます!")
         print("\nサポートされている形式: .xlsx, .xls, .xlsm")
         sys.exit(1)
     
     # ファイルパスを取得（引用符を削除）
-    excel_file = sys.argv[1].strip('"').strip("'")
+    excel_file = args[0].strip('"').strip("'")
     # デフォルトの出力先を設定
     default_output_path = r"C:\Users\Owner\Documents\パトレオン用\PDF"
-    output_dir = sys.argv[2].strip('"').strip("'") if len(sys.argv) > 2 else default_output_path
+    output_dir = args[1].strip('"').strip("'") if len(args) > 1 else default_output_path
     
     # ファイルの存在確認
     if not Path(excel_file).exists():
@@ -137,8 +172,9 @@ def main():
         # 出力モードを選択
         text_only = select_output_mode()
         
-        # コンバーターを初期化（まず列選択なしで）
-        converter = ExcelToWordPDFConverter(text_only=text_only)
+        # コンバーターを初期化（まず列選択なしで）。進み具合と処理速度を表示する
+        console = ConsoleProgress()
+        converter = ExcelToWordPDFConverter(text_only=text_only, progress_callback=console)
         
         # シート一覧を取得
         sheets = converter.get_sheet_names(excel_file)
@@ -154,23 +190,50 @@ def main():
         if selected_sheet is not None:
             selected_columns = select_columns_interactive()
             # コンバーターを再初期化（列選択を含む）
-            converter = ExcelToWordPDFConverter(text_only=text_only, selected_columns=selected_columns)
+            converter = ExcelToWordPDFConverter(text_only=text_only, selected_columns=selected_columns,
+                                                progress_callback=console)
         
         if selected_sheet is None:
             # すべてのシートを変換
             print("\n🔄 すべてのシートを変換します...")
-            for sheet_name in sheets:
-                print(f"\n処理中: {excel_file} - シート: {sheet_name}")
-                word_path, pdf_path = converter.convert(excel_file, output_dir, sheet_name)
-                print(f"✅ 完了: {sheet_name}")
-                print(f"  📄 Word: {word_path}")
+            if merge:
+                # 1つのPDFにまとめる（1回の処理で作るため並列にはしない）
+                pdf_path = converter.convert_workbook_merged(excel_file, output_dir, sheets)
+                console.finish(converter.progress.state)
+                print(f"✅ 完了: {len(sheets)}シート")
                 print(f"  📑 PDF: {pdf_path}")
+            elif workers == 1:
+                # ワークブックは1回だけ開き、シートごとに変換する
+                for sheet_name, word_path, pdf_path in converter.iter_convert_workbook(excel_file, output_dir, sheets):
+                    print(f"✅ 完了: {sheet_name}")
+                    print(f"  📄 Word: {word_path}")
+                    print(f"  📑 PDF: {pdf_path}")
+                console.finish(converter.progress.state)
+            else:
+                # シートをプロセスプールで並列に変換する
+                def show_progress(done, total, result):
+                    if result.ok:
+                        print(f"✅ 完了 ({done}/{total}): {result.sheet_name}")
+                        print(f"  📄 Word: {result.word_path}")
+                        print(f"  📑 PDF: {result.pdf_path}")
+                    else:
+                        print(f"❌ 失敗 ({done}/{total}): {result.sheet_name} - {result.error}")
+                
+                results = convert_sheets_parallel(
+                    excel_file, output_dir, sheets, workers=workers, progress=show_progress,
+                    text_only=converter.text_only, selected_columns=converter.selected_columns,
+                )
+                failed = [result for result in results if not result.ok]
+                if failed:
+                    print(f"\n⚠️ {len(failed)}/{len(results)}個のシートの変換に失敗しました")
+                    sys.exit(1)
         else:
             # 選択されたシートのみを変換
             print(f"\n処理中: {excel_file} - シート: {selected_sheet}")
             if converter.selected_columns != ["ALL"]:
                 print(f"選択された列: {', '.join(converter.selected_columns)}")
             word_path, pdf_path = converter.convert(excel_file, output_dir, selected_sheet)
+            console.finish(converter.progress.state)
             
             print("\n✅ 変換が完了しました!")
             print(f"📄 Word: {word_path}")
@@ -182,4 +245,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+変換の段階ごとの計測（処理時間・CPU時間・メモリ・行数・ページ数）
+
+ExcelToWordPDFConverter は次の段階ごとに StageMetrics を記録する:
+    read       : シートの読み取り（逐次読み取りでは、行を取り出すのにかかった時間の合計）
+    word       : Word文書の作成
+    pdf_story  : PDFのフローアブル（story）の作成
+    pdf_build  : PDFのレイアウトと書き出し（doc.build / canvasへの描画）
+記録はフック（1段階ごとに辞書を受け取る関数）とJSON Lines形式のファイルに出力する。
+計測を有効にしない場合（Instrumentation.disabled()）は何もしない。
+
+例:
+    instrumentation = Instrumentation(hooks=[print], metrics_file="metrics.jsonl")
+    converter = ExcelToWordPDFConverter(instrumentation=instrumentation)
+"""
+
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+class StageMetrics:
+    """1つの段階の計測結果"""
+
+    def __init__(self, stage: str, context: Optional[dict] = None):
+        self.stage = stage
+        self.context = dict(context or {})  # ファイル・シート・出力先など
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0  # その段階を実行したスレッドのCPU時間
+        # tracemallocで計測した、段階の開始時からの最大の増加量（バイト、計測しない場合はNone）。
+        # 前の段階から残っているメモリ（読み取った表など）は含まない
+        self.peak_memory_increase = None
+        self.rows = 0
+        self.cells = 0
+        self.pages = None
+
+    def count(self, rows: Iterable[list]) -> Iterator[list]:
+        """行を数えながらそのまま返す"""
+        for row in rows:
+            self.rows += 1
+            self.cells += len(row)
+            yield row
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_memory_increase_mb": (None if self.peak_memory_increase is None
+                                        else round(self.peak_memory_increase / (1024 * 1024), 3)),
+            "rows": self.rows,
+            "cells": self.cells,
+            "pages": self.pages,
+            **self.context,
+        }
+
+
+class Instrumentation:
+    """段階ごとの計測結果をフックとJSON Linesファイルに出力するクラス
+
+    trace_memory=True の場合は tracemalloc で、段階の開始時から増えたメモリの最大値も計測する
+    （tracemallocは処理を大きく遅くするため、調査時のみ有効にする）。
+    WordとPDFを並行して作る場合、増加量には並行している段階の分も含まれる。
+    """
+
+    def __init__(self, hooks: Optional[List[Callable[[dict], None]]] = None,
+                 metrics_file: Optional[str] = None, trace_memory: bool = False,
+                 enabled: bool = True):
+        self.hooks = list(hooks or [])
+        self.metrics_file = metrics_file
+        self.trace_memory = trace_memory
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    @classmethod
+    def disabled(cls) -> "Instrumentation":
+        """何も計測しないインスタンス"""
+        return cls(enabled=False)
+
+    def __getstate__(self):
+        # ワーカープロセスに渡せるよう、ロックは渡さない
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[dict], None]):
+        self.hooks.append(hook)
+
+    def emit(self, metrics: StageMetrics):
+        """計測結果をフックとファイルに出力する"""
+        if not self.enabled:
+            return
+        record = metrics.to_dict()
+        record["timestamp"] = datetime.now().isoformat(timespec="milliseconds")
+        record["pid"] = os.getpid()
+        with self._lock:
+            for hook in self.hooks:
+                hook(record)
+            if self.metrics_file:
+                # 1行ずつ追記する（複数のワーカープロセスが同じファイルに書いてもよい）
+                with open(self.metrics_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **context):
+        """with文の中の処理を1つの段階として計測する（StageMetricsを返す）"""
+        metrics = StageMetrics(name, context)
+        if not self.enabled:
+            yield metrics
+            return
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            memory_started = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_seconds = time.perf_counter() - started
+            metrics.cpu_seconds = time.thread_time() - cpu_started
+            if self.trace_memory and tracemalloc.is_tracing():
+                metrics.peak_memory_increase = max(0, tracemalloc.get_traced_memory()[1] - memory_started)
+            self.emit(metrics)
+
+    def measure_rows(self, rows: Iterable[list], name: str, **context) -> Iterable[list]:
+        """行のイテレーターから1行取り出すたびの時間を合計し、最後まで読んだら1つの段階として出力する
+
+        逐次読み取りでは読み取りと出力が交互に進むため、読み取りにかかった時間だけを計測する。
+        """
+        if not self.enabled:
+            return rows
+        return self._measure_rows(iter(rows), StageMetrics(name, context))
+
+    def _measure_rows(self, rows: Iterator[list], metrics: StageMetrics) -> Iterator[list]:
+        perf_counter, thread_time = time.perf_counter, time.thread_time
+        try:
+            while True:
+                started, cpu_started = perf_counter(), thread_time()
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    return
+                finally:
+                    metrics.wall_seconds += perf_counter() - started
+                    metrics.cpu_seconds += thread_time() - cpu_started
+                metrics.rows += 1
+                metrics.cells += len(row)
+                yield row
+        finally:
+            self.emit(metrics)
+
+
+@contextlib.contextmanager
+def profiled(output_path: str, top: int = 30):
+    """with文の中の処理をcProfileで計測し、pstats形式で保存して上位の関数を表示する
+
+    cProfileは呼び出したスレッドだけを計測する。
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top)
+        print(report.getvalue())
+        print(f"プロファイルを保存しました: {output_path}（python -m pstats {output_path} で詳細を確認できます）")
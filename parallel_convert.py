@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+複数のシート・ファイルをプロセスプールで並列に変換するモジュール
+
+PDFのレイアウト処理はCPU負荷が高いため、シート（またはファイル）単位で
+ProcessPoolExecutorに振り分ける。結果は入力の順序で返し、
+1つのシートでエラーが起きても他のシートの変換は続ける。
+"""
+
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from excel_to_pdf import ExcelToWordPDFConverter
+import workbook_info
+
+
+class ConversionResult:
+    """1シート分の変換結果"""
+
+    def __init__(self, excel_path: str, sheet_name: Optional[str] = None,
+                 word_path: Optional[str] = None, pdf_path: Optional[str] = None,
+                 error: Optional[str] = None, duration: float = 0.0):
+        self.excel_path = excel_path
+        self.sheet_name = sheet_name
+        self.word_path = word_path
+        self.pdf_path = pdf_path
+        self.error = error  # エラーメッセージ（成功時はNone）
+        self.duration = duration  # 変換にかかった秒数
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"ConversionResult({self.excel_path!r}, sheet={self.sheet_name!r}, {status})"
+
+
+# ワーカープロセスごとに1つだけ作るコンバーター
+_worker_converter = None
+
+
+def _init_worker(options: dict, quiet: bool = False):
+    """ワーカープロセスの初期化（フォント設定などを1回だけ行う）"""
+    global _worker_converter
+    if quiet:
+        # バッチ処理ではファイルごとのメッセージを出さない
+        sys.stdout = open(os.devnull, "w")
+    _worker_converter = ExcelToWordPDFConverter(**options)
+    # ライブラリの読み込みとフォント登録は最初のジョブの前に済ませておく
+    _worker_converter.preload()
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """ワーカー数を決める（None または 0 以下の場合はCPUコア数）"""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def convert_sheets_sequential(converter: ExcelToWordPDFConverter, excel_path: str,
+                              output_dir: Optional[str] = None,
+                              sheets: Optional[List[str]] = None) -> List[ConversionResult]:
+    """ワークブックを1回だけ開いてシートを順番に変換する（シートごとのエラーは結果に記録）"""
+    excel_path, output_dir = converter.prepare_output(excel_path, output_dir)
+    workbook = converter.open_workbook_for_sheets(str(excel_path))
+    try:
+        sheet_names = list(sheets) if sheets is not None else list(workbook.sheetnames)
+        converter.progress.begin(len(sheet_names))
+        results = []
+        for sheet_name in sheet_names:
+            started = time.perf_counter()
+            try:
+                word_path, pdf_path = converter.convert_sheet(workbook, excel_path, output_dir, sheet_name)
+                result = ConversionResult(str(excel_path), sheet_name, word_path, pdf_path)
+            except Exception as e:
+                result = ConversionResult(str(excel_path), sheet_name, error=str(e))
+            result.duration = time.perf_counter() - started
+            results.append(result)
+        return results
+    finally:
+        workbook.close()
+
+
+def _convert_sheet_job(excel_path: str, output_dir: Optional[str], sheet_name: str) -> ConversionResult:
+    """ワーカーで1シートを変換する"""
+    started = time.perf_counter()
+    try:
+        word_path, pdf_path = _worker_converter.convert(excel_path, output_dir, sheet_name)
+        result = ConversionResult(excel_path, sheet_name, word_path, pdf_path)
+    except Exception as e:
+        result = ConversionResult(excel_path, sheet_name, error=str(e))
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def _convert_file_job(excel_path: str, output_dir: Optional[str], all_sheets: bool,
+                      sheet_name: Optional[str] = None, merge: bool = False) -> List[ConversionResult]:
+    """ワーカーで1ファイルを変換する（all_sheets=Trueの場合は全シート、それ以外はsheet_nameかアクティブシート）
+
+    merge=Trueの場合は全シートを1つのPDFにまとめる（結果は1つ、シート名はNone）。
+    """
+    if merge:
+        started = time.perf_counter()
+        try:
+            pdf_path = _worker_converter.convert_workbook_merged(excel_path, output_dir)
+            result = ConversionResult(excel_path, pdf_path=pdf_path)
+        except Exception as e:
+            result = ConversionResult(excel_path, error=str(e))
+        result.duration = time.perf_counter() - started
+        return [result]
+
+    if all_sheets:
+        try:
+            return convert_sheets_sequential(_worker_converter, excel_path, output_dir)
+        except Exception as e:
+            return [ConversionResult(excel_path, error=str(e))]
+
+    started = time.perf_counter()
+    try:
+        word_path, pdf_path = _worker_converter.convert(excel_path, output_dir, sheet_name)
+        result = ConversionResult(excel_path, sheet_name, word_path, pdf_path)
+    except Exception as e:
+        result = ConversionResult(excel_path, sheet_name, error=str(e))
+    result.duration = time.perf_counter() - started
+    return [result]
+
+
+def _run_pool(jobs: list, job_func: Callable, workers: int, options: dict,
+              progress: Optional[Callable] = None, quiet: bool = False) -> list:
+    """ジョブをプロセスプールで実行し、入力と同じ順序で結果を返す
+
+    行単位の進み具合（progress_callback）はワーカーからは通知しない（進み具合はジョブ単位）。
+    中止する場合は options の cancel_token を CancelToken.for_processes() で作っておく。
+    """
+    options = {key: value for key, value in options.items() if key != 'progress_callback'}
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(options, quiet)) as executor:
+        futures = {executor.submit(job_func, *job): index for index, job in enumerate(jobs)}
+        done = 0
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                # ワーカープロセス自体が異常終了した場合など
+                results[index] = e
+            done += 1
+            if progress:
+                progress(done, len(jobs), results[index])
+    return results
+
+
+def convert_sheets_parallel(excel_path: str, output_dir: Optional[str] = None,
+                            sheets: Optional[List[str]] = None, workers: Optional[int] = None,
+                            progress: Optional[Callable] = None, **options) -> List[ConversionResult]:
+    """1つのワークブックのシートを並列に変換する
+
+    options はExcelToWordPDFConverterのコンストラクタ引数（text_only, selected_columns,
+    cancel_token など）。progress(完了数, 総数, ConversionResult) が1シート完了するごとに呼ばれる。
+    """
+    if sheets is None:
+        sheets = workbook_info.get_sheet_names(excel_path)
+    sheets = list(sheets)
+    workers = min(resolve_workers(workers), max(len(sheets), 1))
+
+    if workers <= 1:
+        converter = ExcelToWordPDFConverter(**options)
+        results = convert_sheets_sequential(converter, excel_path, output_dir, sheets)
+        if progress:
+            for done, result in enumerate(results, 1):
+                progress(done, len(results), result)
+        return results
+
+    jobs = [(str(excel_path), output_dir, sheet_name) for sheet_name in sheets]
+    results = _run_pool(jobs, _convert_sheet_job, workers, options, progress)
+    return [
+        result if isinstance(result, ConversionResult)
+        else ConversionResult(str(excel_path), sheet_name, error=str(result))
+        for result, (_, _, sheet_name) in zip(results, jobs)
+    ]
+
+
+def convert_files_parallel(files: Iterable, output_dir: Optional[str] = None,
+                           all_sheets: bool = False, workers: Optional[int] = None,
+                           progress: Optional[Callable] = None, sheet_name: Optional[str] = None,
+                           quiet: bool = False, merge: bool = False, **options) -> List[ConversionResult]:
+    """複数のファイルをファイル単位で並列に変換する
+
+    files の要素はファイルパス、または (ファイルパス, 出力ディレクトリ) のタプル。
+    merge=True の場合はファイルごとに全シートを1つのPDFにまとめる。
+    ワーカープロセスは最後まで使い回すため、ファイルごとの起動コストはかからない。
+    progress(完了ファイル数, 総ファイル数, そのファイルの結果リスト) がファイルごとに呼ばれる。
+    結果はファイルの順（同じファイル内はシートの順）に並ぶ。
+    """
+    jobs = []
+    for entry in files:
+        excel_path, file_output_dir = entry if isinstance(entry, tuple) else (entry, output_dir)
+        jobs.append((str(Path(excel_path)), file_output_dir, all_sheets, sheet_name, merge))
+    workers = min(resolve_workers(workers), max(len(jobs), 1))
+
+    if workers <= 1:
+        _init_worker(options)
+        file_results = []
+        for done, job in enumerate(jobs, 1):
+            if quiet:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    file_results.append(_convert_file_job(*job))
+            else:
+                file_results.append(_convert_file_job(*job))
+            if progress:
+                progress(done, len(jobs), file_results[-1])
+    else:
+        file_results = _run_pool(jobs, _convert_file_job, workers, options, progress, quiet)
+
+    # 1シートだけを変換する場合は、失敗したときもどのシートか分かるようにする
+    job_sheet = None if all_sheets or merge else sheet_name
+    results = []
+    for file_result, job in zip(file_results, jobs):
+        if isinstance(file_result, Exception):
+            results.append(ConversionResult(job[0], job_sheet, error=str(file_result)))
+        else:
+            results.extend(file_result)
+    return results
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+複数のシートを1つのPDFにまとめるためのフローアブル
+
+SheetBookmarkはシートの先頭に置く大きさ0のフローアブルで、描画したページを
+シート名のしおり（アウトライン）に登録する。シートの中身（表など）は
+描画する直前に作るため、前のシートを描き終えてから次のシートの行を読み始める。
+"""
+
+from typing import Callable, List, Optional
+
+from reportlab.platypus.flowables import Flowable
+
+
+class SheetBookmark(Flowable):
+    """シートの先頭のページをしおりに登録するフローアブル
+
+    contents を渡すと、このフローアブルに着いたときに contents() でシートの
+    フローアブルのリストを作り、しおりの後ろに続ける。
+    """
+
+    # ページの残りがなくても配置できる（reportlabのAnchorFlowableなどと同じ）
+    _ZEROSIZE = True
+
+    def __init__(self, title: str, key: str, contents: Optional[Callable[[], List[Flowable]]] = None):
+        Flowable.__init__(self)
+        self.title = title
+        self.key = key
+        self.contents = contents
+
+    def wrap(self, availWidth, availHeight):
+        if self.contents is not None:
+            # 中身を展開するためにsplitさせる
+            return 0, availHeight + 1
+        return 0, 0
+
+    def split(self, availWidth, availHeight):
+        if self.contents is None:
+            return []
+        contents, self.contents = self.contents, None
+        return [self] + list(contents())
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=0)
+        # PDFを開いたときにしおりの一覧を表示する
+        self.canv.showOutline()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+メモリの上限を決めてPDFを作るためのモジュール
+
+ReportLabのCanvasは、書き終えたページの内容をすべてメモリに保持し、
+save() のときにファイル全体をメモリ上で組み立ててから書き出す。
+そのため、ページ数の多いPDFでは使用メモリがページ数に比例して増える。
+
+SpoolingCanvasは、書き終えたページの合計サイズが memory_limit バイトを
+超えるたびに、それらのページを一時ファイルへ書き出してメモリから外す。
+最後まで残るのはページごとの参照（数十バイト）だけになり、作れるPDFの
+大きさはメモリではなくディスクの空き容量で決まる。
+FlowableFeedは、doc.build に渡すフローアブルをイテレーターから少しずつ
+補充するリストで、ストーリー全体をメモリに作らずに済む。
+"""
+
+import os
+from typing import Iterable
+
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen import canvas
+
+# 書き出す前にメモリに保持するページ内容の上限（バイト）
+DEFAULT_MEMORY_LIMIT = 16 * 1024 * 1024
+# FlowableFeedが一度に補充するフローアブルの数
+DEFAULT_BATCH = 256
+
+
+class _Written(pdfdoc.PDFObject):
+    """ファイルへ書き出し済みのオブジェクトの代わりに登録しておく目印"""
+
+
+_WRITTEN = _Written()
+
+
+class SpoolingCanvas(canvas.Canvas):
+    """書き終えたページをディスクへ書き出しながらPDFを作るCanvas
+
+    出力先と同じディレクトリの一時ファイルに書き込み、save() で出力先に置き換える。
+    途中でエラーになった場合は discard() で一時ファイルを削除する。
+    出力先にバイナリのファイルオブジェクトを渡した場合は、一時ファイルを作らずに直接書き込む。
+    doc.build の canvasmaker には functools.partial で memory_limit を指定して渡す。
+    暗号化には対応しない。
+    """
+
+    def __init__(self, filename, *args, memory_limit: int = DEFAULT_MEMORY_LIMIT, **kwargs):
+        canvas.Canvas.__init__(self, filename, *args, **kwargs)
+        self.memory_limit = max(0, memory_limit)
+        if hasattr(filename, "write"):
+            self._target = None
+            self._spool_path = None
+            self._file = filename
+        else:
+            self._target = str(filename)
+            # 出力先と同じディレクトリに作る（save() で置き換える。権限は通常のファイルと同じ）
+            directory, name = os.path.split(os.path.abspath(self._target))
+            self._spool_path = os.path.join(directory, f".{name}.{os.urandom(4).hex()}.spool")
+            self._file = open(self._spool_path, "xb")
+        self._position = 0  # 書き込んだバイト数（シークできないストリームにも書けるように自分で数える）
+        self._offsets = {}  # 書き出し済みのオブジェクトの名前 → ファイル内の位置
+        self._pending = []  # まだ書き出していないページの名前
+        self._pending_bytes = 0
+        # ファイルの先頭（PDFFileと同じヘッダー）
+        header = pdfdoc.PDFFile(self._doc._pdfVersion)
+        self._write_bytes(header.format(self._doc))
+
+    def _write_bytes(self, data: bytes) -> int:
+        offset = self._position
+        self._file.write(data)
+        self._position += len(data)
+        return offset
+
+    def _write_object(self, name: str):
+        """名前で登録されたオブジェクトを書き出し、メモリ上は目印に置き換える"""
+        doc = self._doc
+        obj = doc.idToObject[name]
+        data = pdfdoc.PDFIndirectObject(name, obj).format(doc)
+        self._offsets[name] = self._write_bytes(data)
+        doc.idToObject[name] = _WRITTEN
+
+    def showPage(self):
+        canvas.Canvas.showPage(self)
+        page = self._doc.Pages.pages[-1]
+        self._pending.append(page.__InternalName__)
+        self._pending_bytes += len(page.stream or "")
+        if self._pending_bytes > self.memory_limit:
+            self.flush_pages()
+
+    def flush_pages(self):
+        """メモリに残っているページをファイルへ書き出す"""
+        doc = self._doc
+        pages = doc.Pages.pages
+        first = len(pages) - len(self._pending)
+        for index, name in enumerate(self._pending, first):
+            page = doc.idToObject[name]
+            # ページの辞書を書き出すと、内容のストリームがオブジェクトとして登録される
+            self._write_object(name)
+            self._write_object(page.Contents.__InternalName__)
+            # ページの一覧（Kids）には参照だけを残す
+            pages[index] = pdfdoc.PDFObjectReference(name)
+        self._pending = []
+        self._pending_bytes = 0
+
+    def save(self):
+        """残りのオブジェクトと相互参照表を書き出し、出力先に置き換える"""
+        if len(self._code):
+            self.showPage()
+        self.flush_pages()
+        doc = self._doc
+        # PDFDocument.GetPDFData / format と同じ手順で残りのオブジェクトを書き出す
+        for font in doc.delayedFonts:
+            font.addObjects(doc)
+        doc.info.invariant = doc.invariant
+        doc.info.digest(doc.signature)
+        doc.Reference(doc.Catalog)
+        doc.Reference(doc.info)
+        doc.Outlines.prepare(doc, self)
+        if doc.Outlines.ready < 0:
+            doc.Catalog.Outlines = None
+        # 書き出し中に新しいオブジェクトが登録されることがあるため、番号順に最後まで進める
+        ids = []
+        number = 0
+        while True:
+            number += 1
+            if number not in doc.numberToId:
+                break
+            name = doc.numberToId[number]
+            if name not in self._offsets:
+                self._write_object(name)
+            doc.idToOffset[name] = self._offsets[name]
+            ids.append(name)
+        xref = pdfdoc.PDFCrossReferenceTable()
+        xref.addsection(0, ids)
+        xref_offset = self._write_bytes(xref.format(doc))
+        trailer = pdfdoc.PDFTrailer(startxref=xref_offset, Size=len(ids) + 1,
+                                    Root=doc.Reference(doc.Catalog), Info=doc.Reference(doc.info),
+                                    ID=doc.ID())
+        self._write_bytes(trailer.format(doc))
+        if self._spool_path is not None:
+            self._file.close()
+            os.replace(self._spool_path, self._target)
+
+    def discard(self):
+        """書きかけの一時ファイルを削除する（エラー・中止のとき。ストリームへ書いている場合は何もしない）"""
+        if self._spool_path is None:
+            return
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self._spool_path)
+        except FileNotFoundError:
+            pass
+
+
+class FlowableFeed(list):
+    """doc.build に渡すフローアブルのリスト
+
+    doc.build は先頭から1つずつ取り出して処理し、残りの数を len() で確認する。
+    残りが batch 個の半分を下回ったら、イテレーターから batch 個を補充する
+    （keepWithNextなどで先の要素を見る場合のために、少し先まで読んでおく）。
+    """
+
+    def __init__(self, flowables: Iterable, batch: int = DEFAULT_BATCH):
+        list.__init__(self)
+        self._source = iter(flowables)
+        self.batch = max(2, batch)
+
+    def __len__(self):
+        if self._source is not None and list.__len__(self) < self.batch // 2:
+            before = list.__len__(self)
+            for flowable in self._source:
+                self.append(flowable)
+                if list.__len__(self) - before >= self.batch:
+                    break
+            else:
+                self._source = None
+        return list.__len__(self)
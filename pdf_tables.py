@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+大きな表をページ単位のTableに分けて描画するモジュール
+
+1つの巨大なTableを作ると、ReportLabはページを送るたびに残りの表全体を
+分割し直すため、行数が増えると処理時間が急激に増える。ChunkedTableは
+ページに収まる行だけでTableを作り、残りの行は次のページで処理する。
+各ページの先頭には見出し行（1行目）を繰り返し表示する。
+行はリストでもイテレーターでもよく、イテレーターの場合は処理中のページ
+付近の行だけをメモリに保持する。
+TableCellsは、セルの文字列をParagraphが必要なセルだけParagraphにして
+Tableに渡すセルに変換する。列幅も一部の行の文字列の幅から先に決めるため、
+すべてのセルのParagraphを作って表全体を測り直す必要がない。
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph, Spacer, Table
+from reportlab.platypus.flowables import Flowable
+
+# Paragraphが行を折り返す位置になる文字（空白・改行）
+_BREAKS = re.compile(r"\s")
+# TableCellsが幅を覚えておく文字列の数の上限
+_WIDTH_CACHE_SIZE = 100000
+
+
+class TableCells:
+    """表のセルの文字列を、Tableに渡すセルに変換する
+
+    Paragraphはすべての文字列をマークアップとして解析するため、セルの数が多いと
+    最も時間のかかる処理になり、'<' や '&' を含むセルではエラーや表示崩れも起きる。
+    - 空のセル: 大きさ0の共有のフローアブル（Paragraph("") と同じ大きさ）
+    - 空白や改行を含まず、列の幅に収まるセル: 文字列のまま（Tableが1行で描画する）
+    - それ以外と、列の幅が決まっていないセル: マークアップの記号をエスケープした
+      Paragraph（列の幅で折り返す）
+    文字列のセルは表のスタイルのフォント・色で描画されるため、スタイルには
+    style と同じフォント（'FONT'）と色（'TEXTCOLOR'）をすべてのセルに指定しておく。
+    """
+
+    def __init__(self, style, columns: int, padding: float = 12):
+        self.style = style
+        self.columns = columns  # 1行のセル数（足りない列は空のセルで埋める）
+        self.padding = padding  # セルの左右の余白の合計（TableStyleの既定値は6 + 6）
+        self.empty = Spacer(0, 0)
+        self._widths: Dict[str, float] = {}  # 文字列 -> 幅（同じ文字列は1回だけ測る）
+
+    def text_width(self, text: str) -> float:
+        """文字列を1行で描画したときの幅（ポイント）"""
+        width = self._widths.get(text)
+        if width is None:
+            width = stringWidth(text, self.style.fontName, self.style.fontSize)
+            if len(self._widths) < _WIDTH_CACHE_SIZE:
+                self._widths[text] = width
+        return width
+
+    def plan_widths(self, rows: Sequence[Sequence[str]], avail_width: float, sample_rows: int = 200,
+                    min_width: Optional[float] = None, max_width: Optional[float] = None) -> List[float]:
+        """一部の行の文字列の幅から列幅を決める（合計は通常 avail_width）
+
+        rows[0]（見出し行）と、残りの行から等間隔に選んだ最大 sample_rows 行を測り、
+        列ごとに最も長いセルの幅を min_width〜max_width（既定は2文字分〜フレームの半分）に
+        収める。合計がフレームの幅と違う場合は、最小幅を超える部分を比例して縮めるか、
+        全体を比例して広げる。列が多く最小幅でも収まらない場合は、1〜2文字ごとに
+        折り返して行が高くなるのを避けるため、すべての列を最小幅にする
+        （表はフレームの幅より広くなる）。
+        """
+        min_width = 2 * self.style.fontSize + self.padding if min_width is None else min_width
+        max_width = avail_width / 2 if max_width is None else max_width
+        step = max(1, (len(rows) - 1) // sample_rows) if len(rows) > 1 else 1
+        sample = [rows[0]] + list(rows[1::step]) if rows else []
+
+        widths = [0.0] * self.columns
+        for row in sample:
+            for i, text in enumerate(row[:self.columns]):
+                if text:
+                    widths[i] = max(widths[i], self.text_width(text) + self.padding)
+        widths = [min(max(width, min_width), max(min_width, max_width)) for width in widths]
+
+        total = sum(widths)
+        if total > avail_width:
+            # 最小幅を超える部分を比例して縮める（最小幅より狭くはしない）
+            excess = total - min_width * len(widths)
+            if excess > total - avail_width:
+                scale = 1 - (total - avail_width) / excess
+                widths = [min_width + (width - min_width) * scale for width in widths]
+            else:
+                widths = [min_width] * len(widths)
+        elif 0 < total < avail_width:
+            # 表をフレームの幅に広げる
+            widths = [width * avail_width / total for width in widths]
+        return widths
+
+    def cell(self, text: str, col_width: Optional[float] = None):
+        """1つのセルを変換する（col_widthがNoneの場合は列の幅が分からないためParagraphにする）"""
+        if not text:
+            return self.empty
+        if (col_width is not None and _BREAKS.search(text) is None
+                and self.text_width(text) <= col_width - self.padding + 1e-6):
+            # Paragraphでも折り返されない（1語で列に収まる）
+            return text
+        return Paragraph(escape(text), self.style)
+
+    def row(self, values: Sequence[str], col_widths: Optional[List[float]] = None) -> list:
+        """1行分のセルを変換する（ChunkedTableのmake_rowとして使う）"""
+        if col_widths is None:
+            cells = [self.cell(text) for text in values]
+        else:
+            cells = [self.cell(text, col_widths[i] if i < len(col_widths) else None)
+                     for i, text in enumerate(values)]
+        if len(cells) < self.columns:
+            cells.extend([self.empty] * (self.columns - len(cells)))
+        return cells
+
+
+class _RowSource:
+    """ChunkedTableの間で共有する行の読み出し口
+
+    行は0から始まる通し番号で取り出す。イテレーターから読んだ行は
+    release() で不要になったと分かるまで保持する。
+    """
+
+    def __init__(self, rows: Iterable[Sequence[str]]):
+        self._streaming = not isinstance(rows, (list, tuple))
+        self._buffer = [] if self._streaming else rows
+        self._iterator = iter(rows) if self._streaming else None
+        self._base = 0  # _buffer[0] の通し番号
+
+    def get(self, start: int, count: int) -> list:
+        """通し番号 start から最大 count 行を返す（行が足りない場合は短くなる）"""
+        end = start + count - self._base
+        if self._iterator is not None:
+            while len(self._buffer) < end:
+                row = next(self._iterator, None)
+                if row is None:
+                    self._iterator = None
+                    break
+                self._buffer.append(row)
+        return self._buffer[start - self._base:end]
+
+    def has_row(self, index: int) -> bool:
+        return bool(self.get(index, 1))
+
+    def release(self, before: int):
+        """通し番号 before より前の行を破棄する（イテレーターから読んだ行のみ）"""
+        drop = before - self._base
+        if self._streaming and drop > 0:
+            del self._buffer[:drop]
+            self._base = before
+
+
+class ChunkedTable(Flowable):
+    """行データから1ページ分ずつTableを作って描画するフローアブル
+
+    rows[0] を見出し行とし、rows[start:] を本文として描画する。
+    make_row(row, col_widths) は1行分の文字列をセルのリストに変換する関数
+    （col_widthsは決まった列幅。列幅を決める前はNone）。
+    行の高さは前のページに載った行数（最初はchunk_rows行）ずつまとめて測るため、
+    1ページあたりの処理量はそのページに載る行数にほぼ比例する。
+    col_widths を省略した場合は、plan_widths(見出し行と最初のchunk_rows行, 使える幅) で
+    列幅を決める（TableCells.plan_widths など）。plan_widths も省略した場合は、
+    最初のchunk_rows行のTableを作って測る。
+    """
+
+    def __init__(self, rows: Iterable[Sequence[str]], make_row: Callable, style,
+                 col_widths: Optional[List[float]] = None, chunk_rows: int = 200,
+                 start: int = 1, header_cells: Optional[list] = None,
+                 page_rows: Optional[int] = None, plan_widths: Optional[Callable] = None):
+        Flowable.__init__(self)
+        self.rows = rows if isinstance(rows, _RowSource) else _RowSource(rows)
+        self.make_row = make_row
+        self.style = style
+        self.col_widths = col_widths
+        self.chunk_rows = max(1, chunk_rows)
+        self.start = start
+        self.header_cells = header_cells if header_cells is not None else make_row(self.rows.get(0, 1)[0], None)
+        # 前のページに載った行数（次のページで測る行数の目安）
+        self.page_rows = page_rows
+        self.plan_widths = plan_widths
+
+    def _make_table(self, body: list) -> Table:
+        table = Table([self.header_cells] + body, colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.style)
+        return table
+
+    def _plan_col_widths(self, avail_width: float):
+        """列幅を最初のチャンクから一度だけ決め、すべてのページで使い回す"""
+        if self.col_widths is not None:
+            return
+        if self.plan_widths is not None:
+            # セルを作らずに文字列の幅から決める
+            sample = self.rows.get(0, 1) + self.rows.get(self.start, self.chunk_rows)
+            self.col_widths = list(self.plan_widths(sample, avail_width))
+        else:
+            body = [self.make_row(row, None) for row in self.rows.get(self.start, self.chunk_rows)]
+            table = self._make_table(body)
+            table.wrap(avail_width, 0x7FFFFFFF)
+            self.col_widths = list(table._colWidths)
+        # 見出し行も決まった列幅で作り直す
+        self.header_cells = self.make_row(self.rows.get(0, 1)[0], self.col_widths)
+
+    def wrap(self, availWidth, availHeight):
+        self._plan_col_widths(availWidth)
+        # 常に分割（split）させ、ページに収まる分のTableを返す
+        return sum(self.col_widths), availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        self._plan_col_widths(availWidth)
+        # 前のページの行はもう使わない
+        self.rows.release(self.start)
+
+        fitted = []
+        used = None
+        pos = self.start
+        full = False
+        # 前のページと同じくらいの行数から測り始め、足りなければ追加で測る
+        window = self.chunk_rows if self.page_rows is None else min(self.chunk_rows, self.page_rows + 1)
+        while not full:
+            chunk = self.rows.get(pos, window)
+            if not chunk:
+                break
+            cells = [self.make_row(row, self.col_widths) for row in chunk]
+            table = self._make_table(cells)
+            table.wrap(availWidth, 0x7FFFFFFF)
+            heights = table._rowHeights
+            if used is None:
+                used = heights[0]  # 見出し行
+                if used > availHeight:
+                    return []
+            for cell_row, height in zip(cells, heights[1:]):
+                if used + height > availHeight:
+                    full = True
+                    break
+                used += height
+                fitted.append(cell_row)
+            pos += len(cells)
+
+        if not fitted and self.rows.has_row(self.start):
+            # 1行も収まらない場合は次のフレームで再試行する
+            return []
+
+        page = self._make_table(fitted)
+        end = self.start + len(fitted)
+        if not self.rows.has_row(end):
+            return [page]
+        rest = ChunkedTable(self.rows, self.make_row, self.style, self.col_widths,
+                            self.chunk_rows, end, self.header_cells, len(fitted))
+        return [page, rest]
+
+    def draw(self):
+        # 必ずsplitされるため、このフローアブル自体は描画しない
+        pass
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+テキストのみモードのPDFをcanvasへ直接書き出すモジュール
+
+Platypus（Paragraph + Spacer）を使うと、行ごとにマークアップの解析と
+レイアウトが2回ずつ発生する。ここでは文字幅をキャッシュして自前で
+折り返しと改ページを行い、reportlab.pdfgen.canvas に直接描画する。
+レイアウト（余白・行送り・段落間隔）はSimpleDocTemplate + Paragraph
+の出力に合わせている。
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+
+# フォント名ごとの文字幅キャッシュ（1ポイントあたりの幅）
+_CHAR_WIDTHS: Dict[str, Dict[str, float]] = {}
+
+# SimpleDocTemplateのFrameの内側の余白
+FRAME_PADDING = 6
+
+
+class TextPDFRenderer:
+    """文字列の行をPDFに直接描画するクラス
+
+    1行（1レコード）を1段落として扱い、段落の後に spacing ポイントの
+    間隔を空ける（Paragraph + Spacer(1, 6) と同じレイアウト）。
+    """
+
+    def __init__(self, font_name: str, font_size: float = 10, leading: float = 12,
+                 spacing: float = 6, pagesize=A4, margin: float = inch):
+        self.font_name = font_name
+        self.font_size = font_size
+        self.leading = leading
+        self.spacing = spacing
+        self.pagesize = pagesize
+        self.left = margin + FRAME_PADDING
+        self.top = pagesize[1] - margin - FRAME_PADDING
+        self.bottom = margin + FRAME_PADDING
+        self.width = pagesize[0] - 2 * (margin + FRAME_PADDING)
+        self._widths = _CHAR_WIDTHS.setdefault(font_name, {})
+
+    def char_width(self, char: str) -> float:
+        """1文字の幅（ポイント）。フォントごとにキャッシュする"""
+        width = self._widths.get(char)
+        if width is None:
+            width = pdfmetrics.stringWidth(char, self.font_name, 1)
+            self._widths[char] = width
+        return width * self.font_size
+
+    def _char_widths(self, text: str) -> List[float]:
+        widths = self._widths
+        size = self.font_size
+        try:
+            return [widths[char] * size for char in text]
+        except KeyError:
+            return [self.char_width(char) for char in text]
+
+    def string_width(self, text: str) -> float:
+        return sum(self._char_widths(text))
+
+    def wrap(self, text: str) -> List[str]:
+        """文字列を行幅に収まるように折り返す
+
+        Paragraphと同様に空白で単語に分け（連続する空白は1つにまとめる）、
+        行幅より長い単語は文字単位で分割する。
+        """
+        lines = []
+        current = []
+        current_width = 0.0
+        space_width = self.char_width(" ")
+        max_width = self.width + 1e-6
+
+        for word in text.split():
+            char_widths = self._char_widths(word)
+            word_width = sum(char_widths)
+            needed = word_width + (space_width if current else 0)
+            if current_width + needed <= max_width:
+                current.append(word)
+                current_width += needed
+                continue
+
+            if word_width <= max_width:
+                # 次の行に送る
+                lines.append(" ".join(current))
+                current = [word]
+                current_width = word_width
+                continue
+
+            # 行幅より長い単語は、現在の行の残りから文字単位で埋める
+            prefix = ""
+            if current:
+                prefix = " ".join(current) + " "
+                current_width += space_width
+            cumulative = list(accumulate(char_widths))
+            start = 0
+            while start < len(word):
+                offset = cumulative[start - 1] if start else 0.0
+                end = bisect_right(cumulative, offset + max_width - current_width, start)
+                if end == start:
+                    if prefix:
+                        # 現在の行には1文字も入らないので改行する
+                        lines.append(prefix.rstrip())
+                        prefix, current_width = "", 0.0
+                        continue
+                    end = start + 1  # 1文字でも行幅を超える場合
+                if end < len(word):
+                    lines.append(prefix + word[start:end])
+                    prefix, current_width = "", 0.0
+                else:
+                    current = [prefix + word[start:]]
+                    current_width += cumulative[-1] - offset
+                start = end
+
+        if current:
+            lines.append(" ".join(current))
+        return lines
+
+    def render(self, texts: Iterable[str], pdf_path, on_page: Optional[Callable[[], None]] = None,
+               canvasmaker=canvas.Canvas) -> int:
+        """段落のテキストをPDFに描画し、ページ数を返す
+
+        pdf_pathにはバイナリのファイルオブジェクトも渡せる。on_pageは1ページ描き終えるごとに呼ぶ。
+        canvasmakerにはpdf_spool.SpoolingCanvasなども渡せる。
+        """
+        return self.render_sections([(None, texts)], pdf_path, on_page, canvasmaker)
+
+    def render_sections(self, sections: Iterable[Tuple[Optional[str], Iterable[str]]], pdf_path,
+                        on_page: Optional[Callable[[], None]] = None, canvasmaker=canvas.Canvas) -> int:
+        """(見出し, 段落のテキスト) の組ごとに新しいページから描画し、ページ数を返す
+
+        見出しはその組の最初のページのしおり（アウトライン）に登録する（Noneなら登録しない）。
+        段落のテキストは前の組を描き終えてから取り出す。
+        """
+        target = pdf_path if hasattr(pdf_path, "write") else str(pdf_path)
+        pdf = canvasmaker(target, pagesize=self.pagesize)
+        try:
+            return self._render(pdf, sections, on_page)
+        except BaseException:
+            # 書きかけのファイルを残さない（SpoolingCanvasの場合）
+            discard = getattr(pdf, "discard", None)
+            if discard is not None:
+                discard()
+            raise
+
+    def _render(self, pdf, sections, on_page: Optional[Callable[[], None]]) -> int:
+        pages = 0  # 書き出したページ数
+        y = self.top
+        text_obj = None
+        page_used = False  # 現在のページに描画した（またはしおりを登録した）か
+
+        def new_page():
+            nonlocal y, text_obj, pages, page_used
+            if text_obj is not None:
+                pdf.drawText(text_obj)
+            pdf.showPage()
+            pages += 1
+            if on_page is not None:
+                on_page()
+            y = self.top
+            text_obj = None
+            page_used = False
+
+        for index, (title, texts) in enumerate(sections):
+            if page_used:
+                new_page()
+            else:
+                y = self.top  # 前の組の段落の間隔だけが送られてきたページはそのまま使う
+            if title is not None:
+                # この組の最初のページをしおりに登録する
+                key = f"section{index}"
+                pdf.bookmarkPage(key)
+                pdf.addOutlineEntry(title, key, level=0)
+                pdf.showOutline()
+                page_used = True
+            for text in texts:
+                lines = self.wrap(text)
+                if lines:
+                    available = int((y - self.bottom + 1e-6) // self.leading)
+                    # 段落の先頭1行だけがページ末尾に残らないようにする（Paragraphの既定と同じ）
+                    if available < len(lines) and available <= 1 and y != self.top:
+                        new_page()
+                    for line in lines:
+                        if y - self.leading < self.bottom - 1e-6:
+                            new_page()
+                        if text_obj is None:
+                            text_obj = pdf.beginText()
+                            text_obj.setFont(self.font_name, self.font_size)
+                        text_obj.setTextOrigin(self.left, y - self.font_size)
+                        text_obj.textOut(line)
+                        y -= self.leading
+                        page_used = True
+
+                # 段落の間隔（ページ末尾に収まらない場合は次のページの先頭に入る）
+                if y - self.spacing < self.bottom - 1e-6:
+                    new_page()
+                y -= self.spacing
+
+        if page_used:
+            # 最後のページを出力する（しおりだけを登録したページ（空のシート）も出力する）。
+            # 最後の段落の間隔で改ページしただけのページは何も描かないため出力しない
+            new_page()
+        pdf.save()
+        return pages
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+変換の進み具合の通知と中止（キャンセル）
+
+ExcelToWordPDFConverter に progress_callback を渡すと、読み取った行数・
+出力した行数・書き出したPDFのページ数・変換済みのシート数を
+ConversionProgress として一定間隔（デフォルト: 0.2秒）ごとに通知する。
+cancel_token に CancelToken を渡し、別のスレッドから cancel() を呼ぶと、
+読み取りと出力の処理の中で ConversionCancelled が送出されて変換が止まり、
+途中まで作った出力ファイルは削除される。
+
+例:
+    token = CancelToken()
+    converter = ExcelToWordPDFConverter(progress_callback=lambda p: print(p.fraction),
+                                        cancel_token=token)
+    # 別のスレッドから token.cancel() を呼ぶと converter.convert(...) が止まる
+"""
+
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+# 中止の確認と通知を何行ごとに行うか
+_CHECK_ROWS = 64
+# 通知の間隔（秒）
+DEFAULT_INTERVAL = 0.2
+
+
+class ConversionCancelled(Exception):
+    """変換が中止された"""
+
+
+class CancelToken:
+    """変換を途中で止めるためのトークン
+
+    別のスレッドから cancel() を呼ぶと、変換中の処理は次の確認
+    （_CHECK_ROWS 行ごと、ページごと、シートごと）で止まる。
+    プロセスプールのワーカーと共有する場合は for_processes() で作り、
+    ワーカーの初期化時に渡す。
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    @classmethod
+    def for_processes(cls) -> "CancelToken":
+        """ワーカープロセスと共有できるトークンを作る"""
+        import multiprocessing
+        return cls(multiprocessing.Event())
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        """中止されていればConversionCancelledを送出する"""
+        if self._event.is_set():
+            raise ConversionCancelled("変換が中止されました")
+
+
+class ConversionProgress:
+    """変換の進み具合（progress_callbackに渡される）
+
+    値は変換中に更新されるため、コールバックの中で読むこと。
+    """
+
+    def __init__(self, sheets_total: int = 0):
+        self.sheets_total = sheets_total
+        self.sheets_done = 0
+        self.sheet = None  # 変換中のシート名
+        self.sheet_rows = None  # 変換中のシートの行数（dimension情報がない場合はNone）
+        self.sheet_rows_read = 0  # 変換中のシートで読み取った行数（空行を含む）
+        self.sheet_rows_rendered: Dict[str, int] = {}  # 変換中のシートで出力した行数（出力形式ごと）
+        self.rows_read = 0  # 読み取った行数の合計
+        self.pages = 0  # 書き出したPDFのページ数の合計
+        self._rows_rendered_done = 0  # 変換済みのシートで出力した行数
+        self.started = time.perf_counter()
+
+    @property
+    def rows_rendered(self) -> int:
+        """出力した行数の合計（WordとPDFを作る場合は遅い方）"""
+        return self._rows_rendered_done + min(self.sheet_rows_rendered.values(), default=0)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows_read / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def sheet_fraction(self) -> float:
+        """変換中のシートの進み具合（0〜1、行数が分からない場合は0）"""
+        if not self.sheet_rows:
+            return 0.0
+        read = min(self.sheet_rows_read / self.sheet_rows, 1.0)
+        rendered = min(self.sheet_rows_rendered.values(), default=0)
+        written = min(rendered / self.sheet_rows_read, 1.0) if self.sheet_rows_read else 0.0
+        # 読み取りと出力の両方が終わって1になる（逐次読み取りでは両方が並んで進む）
+        return (read + read * written) / 2
+
+    @property
+    def fraction(self) -> float:
+        """全体の進み具合（0〜1）"""
+        if not self.sheets_total:
+            return 0.0
+        return min((self.sheets_done + self.sheet_fraction) / self.sheets_total, 1.0)
+
+    def _finish_sheet(self):
+        self.sheets_done += 1
+        self._rows_rendered_done = self.rows_rendered
+        self.sheet_rows = None
+        self.sheet_rows_read = 0
+        self.sheet_rows_rendered = {}
+
+
+class ProgressReporter:
+    """変換の処理から呼ばれ、進み具合の通知と中止の確認を行う
+
+    コールバックもトークンもない場合は何もしない（行のイテレーターもそのまま返す）。
+    """
+
+    def __init__(self, callback: Optional[Callable[[ConversionProgress], None]] = None,
+                 cancel_token: Optional[CancelToken] = None, interval: float = DEFAULT_INTERVAL):
+        self.callback = callback
+        self.cancel_token = cancel_token
+        self.interval = interval
+        self.state = ConversionProgress()
+        self._lock = threading.Lock()  # WordとPDFを並行して作る場合も通知は1つずつ
+        self._last_emit = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.callback is not None or self.cancel_token is not None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token is not None and self.cancel_token.cancelled
+
+    def check(self):
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
+    def emit(self, force: bool = False):
+        """コールバックを呼ぶ（force=False の場合は interval 秒に1回まで）"""
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_emit < self.interval:
+            return
+        with self._lock:
+            self._last_emit = now
+            self.callback(self.state)
+
+    def begin(self, sheets_total: int):
+        """変換を始める（sheets_total は変換するシートの数）"""
+        self.state = ConversionProgress(sheets_total)
+        self.check()
+        self.emit(force=True)
+
+    def start_sheet(self, sheet: str, rows: Optional[int]):
+        """シートの読み取りを始める（rows はシートの行数、分からない場合はNone）"""
+        self.check()
+        self.state.sheet = sheet
+        self.state.sheet_rows = rows
+        self.emit(force=True)
+
+    def finish_sheet(self, sheet: Optional[str] = None):
+        """1シートの変換が終わった"""
+        if sheet is not None:
+            self.state.sheet = sheet
+        self.state._finish_sheet()
+        self.emit(force=True)
+
+    def page_done(self, *_args):
+        """PDFの1ページを書き出した（reportlabのonPageコールバックとしても使える）"""
+        self.state.pages += 1
+        self.check()
+        self.emit()
+
+    def read_rows(self, rows: Iterable) -> Iterable:
+        """シートから読み取る行を数え、中止を確認しながら返す"""
+        if not self.active:
+            return rows
+        return self._read_rows(rows)
+
+    def _read_rows(self, rows: Iterable) -> Iterator:
+        state = self.state
+        for row in rows:
+            state.rows_read += 1
+            state.sheet_rows_read += 1
+            if state.sheet_rows_read % _CHECK_ROWS == 0:
+                self.check()
+                self.emit()
+            yield row
+
+    def rendered_rows(self, rows: Iterable, output: str) -> Iterable:
+        """出力側で使った行を数え、中止を確認しながら返す"""
+        if not self.active:
+            return rows
+        return self._rendered_rows(rows, output)
+
+    def _rendered_rows(self, rows: Iterable, output: str) -> Iterator:
+        rendered = self.state.sheet_rows_rendered
+        rendered[output] = count = 0
+        for row in rows:
+            count += 1
+            rendered[output] = count
+            if count % _CHECK_ROWS == 0:
+                self.check()
+                self.emit()
+            yield row
+
+
+class ConsoleProgress:
+    """進み具合と処理速度（行/秒）を1行で表示するprogress_callback（CLI用）
+
+    端末に出力している場合だけ途中経過を表示し、finish() で結果の1行を表示する。
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self.live = hasattr(self.stream, "isatty") and self.stream.isatty()
+
+    def __call__(self, progress: ConversionProgress):
+        if not self.live:
+            return
+        rows = f"{progress.rows_read:,}行"
+        if progress.sheet_rows:
+            rows = f"{progress.sheet_rows_read:,}/{progress.sheet_rows:,}行"
+        sheets = f"シート {progress.sheets_done}/{progress.sheets_total}  " if progress.sheets_total > 1 else ""
+        line = (f"⏳ {progress.fraction:4.0%}  {sheets}{rows}  {progress.pages}ページ"
+                f"  {progress.rows_per_second:,.0f}行/秒")
+        # 行を消してから書き、カーソルは行頭に戻す（続けて表示されるメッセージで上書きされる）
+        self.stream.write(f"\x1b[K{line}\r")
+        self.stream.flush()
+
+    def finish(self, progress: ConversionProgress):
+        if self.live:
+            self.stream.write("\x1b[K")
+            self.stream.flush()
+        print(f"⏱ {progress.rows_read:,}行を{progress.elapsed:.2f}秒で処理しました"
+              f"（{progress.rows_per_second:,.0f}行/秒、{progress.pages}ページ）")
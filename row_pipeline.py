@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+読み取りから出力までの行データの受け渡し（ストリーミング）
+
+シートの行をリストにまとめずに、読み取り → 変換ステージ → 出力（Word/PDF）へ
+1行ずつ流す。RowStream は行のイテレーターと列数の組で、出力側は列数を
+先に知る必要がある（表の列数を決めるため）。
+WordとPDFを同時に作る場合は tee() で1つの読み取りを2つの出力に分け、
+出力の間には一定数の行だけを保持する。
+"""
+
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from row_table import RowTable
+
+Row = List[str]
+# 変換ステージ：行のイテレーターを受け取り、行のイテレーターを返す関数（列数は変えない）
+RowStage = Callable[[Iterable[Row]], Iterable[Row]]
+
+# tee() で出力の間に保持する行のまとまり（行数 × まとまりの数）
+_BATCH_ROWS = 64
+_MAX_BATCHES = 16
+
+
+class RowStream:
+    """行を逐次取り出すイテレーターと、表の列数（width）の組"""
+
+    def __init__(self, rows: Iterable[Row], width: int, on_close: Optional[Callable] = None):
+        self._rows = iter(rows)
+        self.width = width
+        self._peeked = []
+        self._on_close = on_close
+
+    def __iter__(self) -> Iterator[Row]:
+        if self._peeked:
+            yield self._peeked.pop()
+        yield from self._rows
+
+    def peek(self) -> Optional[Row]:
+        """最初の行を消費せずに返す（行がない場合はNone）"""
+        if not self._peeked:
+            row = next(self._rows, None)
+            if row is None:
+                return None
+            self._peeked.append(row)
+        return self._peeked[0]
+
+    def pipe(self, *stages: RowStage) -> "RowStream":
+        """変換ステージを順に通したRowStreamを返す"""
+        if not stages:
+            return self
+        rows: Iterable[Row] = self
+        for stage in stages:
+            rows = stage(rows)
+        return RowStream(rows, self.width, self.close)
+
+    def close(self):
+        """読み取りを途中でやめる場合に呼ぶ（tee()の読み取りスレッドを止める）"""
+        close = getattr(self._rows, "close", None)
+        if close is not None:
+            close()
+        if self._on_close is not None:
+            self._on_close()
+
+
+def as_row_stream(data) -> RowStream:
+    """行のリスト（従来の形式）・RowTable・RowStreamをRowStreamとして返す"""
+    if isinstance(data, RowStream):
+        return data
+    if isinstance(data, RowTable):
+        return RowStream(data, data.width)
+    return RowStream(data, max((len(row) for row in data), default=0))
+
+
+def drop_empty_rows(rows: Iterable[Row]) -> Iterator[Row]:
+    """空のセルだけの行を取り除くステージ"""
+    return (row for row in rows if any(row))
+
+
+def strip_cells(rows: Iterable[Row]) -> Iterator[Row]:
+    """セルの前後の空白を取り除くステージ"""
+    return ([cell.strip() for cell in row] for row in rows)
+
+
+class _Failure:
+    """読み取りスレッドで発生した例外を出力側に渡すための入れ物"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+def tee(stream: RowStream, count: int = 2) -> List[RowStream]:
+    """1つのRowStreamを、別々のスレッドで読める count 個のRowStreamに分ける
+
+    読み取りは専用のスレッドで1回だけ行い、各出力との間には最大
+    _BATCH_ROWS × _MAX_BATCHES 行だけを保持する（遅い出力に合わせて待つ）。
+    読み取りで例外が起きた場合は、各出力側で同じ例外を送出する。
+    出力が途中で終わった場合は close() を呼ぶと、その出力には行を送らなくなる。
+    """
+    queues = [queue.Queue(_MAX_BATCHES) for _ in range(count)]
+    closed = [threading.Event() for _ in range(count)]
+
+    def put(index: int, item):
+        while not closed[index].is_set():
+            try:
+                queues[index].put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def broadcast(item):
+        for index in range(count):
+            put(index, item)
+
+    def produce():
+        try:
+            batch = []
+            for row in stream:
+                batch.append(row)
+                if len(batch) >= _BATCH_ROWS:
+                    broadcast(batch)
+                    batch = []
+                    if all(event.is_set() for event in closed):
+                        return  # すべての出力が終了した
+            if batch:
+                broadcast(batch)
+            broadcast(_END)
+        except BaseException as e:
+            broadcast(_Failure(e))
+        finally:
+            stream.close()
+
+    def consume(index: int) -> Iterator[Row]:
+        try:
+            while True:
+                item = queues[index].get()
+                if item is _END:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield from item
+        finally:
+            closed[index].set()
+
+    threading.Thread(target=produce, name="row-tee", daemon=True).start()
+    return [RowStream(consume(index), stream.width, closed[index].set) for index in range(count)]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+読み取ったシートをメモリ上に少ない容量で保持する表（RowTable）
+
+行を文字列のリストのリストで持つと、空のセルも1つずつ要素（参照）になり、
+同じ文字列（共有文字列）も値ごとに別のオブジェクトになる。横に広く空白の
+多いシートでは、元のファイルの何倍ものメモリを使う。
+RowTable は値を列ごとの番号の配列（1セル2バイト、異なる値が65535個を
+超えたら4バイト）で持ち、同じ文字列は1つだけ保持する（番号0は空のセル）。
+すべて空の列は配列を作らない。
+行は RowView（軽い読み出し専用のビュー）として取り出すため、
+行のリストを受け取っていた処理はそのまま使える。
+
+例:
+    table = RowTable.from_rows(rows)
+    for row in table:
+        print("  ".join(row))
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+# 番号の配列の型（2バイトで足りなくなったら4バイトに広げる）
+_NARROW, _WIDE = "H", "I"
+_NARROW_LIMIT = 1 << 16
+
+
+class RowTable:
+    """行を列ごとの番号の配列として保持する表（行数 × width列）"""
+
+    def __init__(self, width: int = 0):
+        self._values: List[str] = [""]  # 番号 -> 値（番号0は空のセル）
+        self._codes: Dict[str, int] = {}  # 値 -> 番号
+        # 列ごとの番号の配列（すべて空の列はNone）
+        self._columns: List[Optional[array]] = [None] * width
+        self._typecode = _NARROW
+        self._row_count = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> "RowTable":
+        """行のイテレーター（またはRowTable）からRowTableを作る"""
+        if isinstance(rows, RowTable):
+            return rows
+        table = cls()
+        for row in rows:
+            table.append(row)
+        return table
+
+    @property
+    def width(self) -> int:
+        """列数（最も長い行の長さ。短い行は空のセルで埋めた扱いになる）"""
+        return len(self._columns)
+
+    @property
+    def unique_values(self) -> int:
+        """保持している異なる値の数（空のセルを除く）"""
+        return len(self._values) - 1
+
+    def append(self, row: Sequence[str]):
+        """1行を追加する"""
+        columns = self._columns
+        length = len(row)
+        if length > len(columns):
+            columns.extend([None] * (length - len(columns)))
+
+        values, codes = self._values, self._codes
+        for index, column in enumerate(columns):
+            value = row[index] if index < length else ""
+            if value:
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(values)
+                    values.append(value)
+                    if code == _NARROW_LIMIT and self._typecode == _NARROW:
+                        self._widen()
+                        column = columns[index]
+                if column is None:
+                    # この列で最初の値：それまでの行は空のセル
+                    column = columns[index] = array(self._typecode, [0]) * self._row_count
+                column.append(code)
+            elif column is not None:
+                column.append(0)
+        self._row_count += 1
+
+    def _widen(self):
+        """異なる値が2バイトの番号に収まらなくなったら、すべての列を4バイトにする"""
+        self._typecode = _WIDE
+        # append() の途中でも使えるよう、リストは置き換えずに中身を入れ替える
+        self._columns[:] = [None if column is None else array(_WIDE, column) for column in self._columns]
+
+    def column(self, index: int) -> List[str]:
+        """1列分の値をリストで返す（値のオブジェクトは表と共有する）"""
+        column = self._columns[index]
+        if column is None:
+            return [""] * self._row_count
+        values = self._values
+        return [values[code] for code in column]
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def __getitem__(self, index: int) -> "RowView":
+        if index < 0:
+            index += self._row_count
+        if not 0 <= index < self._row_count:
+            raise IndexError("RowTable index out of range")
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator["RowView"]:
+        for index in range(self._row_count):
+            yield RowView(self, index)
+
+    def __repr__(self) -> str:
+        return f"<RowTable rows={self._row_count} width={self.width} unique_values={self.unique_values}>"
+
+
+class RowView:
+    """RowTableの1行を文字列のシーケンスとして読むビュー（値はコピーしない）"""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: RowTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._table._columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        column = self._table._columns[index]
+        return "" if column is None else self._table._values[column[self._index]]
+
+    def __iter__(self) -> Iterator[str]:
+        values, index = self._table._values, self._index
+        for column in self._table._columns:
+            yield "" if column is None else values[column[index]]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (RowView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RowView({list(self)!r})"
@@ -0,0 +1,6 @@
+"""テストからリポジトリ直下のモジュールを読み込めるようにする"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,126 @@
+"""pdf_spool（ページをディスクへ書き出すCanvasとFlowableFeed）のテスト"""
+
+import io
+import re
+
+import pytest
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from pdf_spool import FlowableFeed, SpoolingCanvas
+
+
+@pytest.fixture(autouse=True)
+def invariant(monkeypatch):
+    # 作成日時やIDを固定して、同じ内容なら同じPDFになるようにする
+    monkeypatch.setattr(rl_config, "invariant", 1)
+
+
+def _objects(data: bytes) -> dict:
+    return {int(number): body for number, body in re.findall(rb"(\d+) 0 obj\s*(.*?)\s*endobj", data, re.S)}
+
+
+def _page_contents(data: bytes) -> list:
+    """ページの一覧（Kids）の順に、各ページの内容のストリームを返す（圧縮なしのPDF）"""
+    objects = _objects(data)
+    kids = re.search(rb"/Kids \[([^\]]*)\]", data).group(1)
+    contents = []
+    for ref in re.findall(rb"(\d+) 0 R", kids):
+        page = objects[int(ref)]
+        stream = objects[int(re.search(rb"/Contents (\d+) 0 R", page).group(1))]
+        contents.append(re.search(rb"stream\r?\n(.*?)endstream", stream, re.S).group(1))
+    return contents
+
+
+def _assert_valid_xref(data: bytes):
+    """相互参照表の位置がそれぞれのオブジェクトの先頭を指していることを確かめる"""
+    start = int(re.search(rb"startxref\s+(\d+)", data).group(1))
+    table = data[start:]
+    count = int(re.match(rb"xref\s+0 (\d+)", table).group(1))
+    offsets = re.findall(rb"(\d{10}) \d{5} n", table)
+    assert len(offsets) == count - 1
+    for number, offset in enumerate(offsets, 1):
+        assert data[int(offset):].startswith(b"%d 0 obj" % number)
+
+
+def _draw_pages(pdf, pages: int):
+    for index in range(pages):
+        pdf.setFont("Helvetica", 12)
+        pdf.drawString(72, 720, f"page {index}")
+        pdf.rect(72, 72, 100 + index, 50)
+        pdf.showPage()
+    pdf.save()
+
+
+@pytest.mark.parametrize("memory_limit", [0, 1500, 10 ** 9])
+def test_spooled_pages_match_canvas(tmp_path, memory_limit):
+    expected_path = tmp_path / "canvas.pdf"
+    _draw_pages(canvas.Canvas(str(expected_path), pageCompression=0), 12)
+    spooled_path = tmp_path / "spooled.pdf"
+    _draw_pages(SpoolingCanvas(str(spooled_path), pageCompression=0, memory_limit=memory_limit), 12)
+
+    expected = expected_path.read_bytes()
+    spooled = spooled_path.read_bytes()
+    assert _page_contents(spooled) == _page_contents(expected)
+    assert len(_page_contents(spooled)) == 12
+    _assert_valid_xref(spooled)
+    # 一時ファイルは残らない
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["canvas.pdf", "spooled.pdf"]
+
+
+def test_spooling_to_stream():
+    expected = io.BytesIO()
+    _draw_pages(canvas.Canvas(expected, pageCompression=0), 5)
+    stream = io.BytesIO()
+    _draw_pages(SpoolingCanvas(stream, pageCompression=0, memory_limit=0), 5)
+
+    assert _page_contents(stream.getvalue()) == _page_contents(expected.getvalue())
+    _assert_valid_xref(stream.getvalue())
+
+
+def test_discard_removes_spool_file(tmp_path):
+    pdf = SpoolingCanvas(str(tmp_path / "out.pdf"), memory_limit=0)
+    pdf.drawString(72, 720, "partial")
+    pdf.showPage()
+    assert list(tmp_path.iterdir())  # 書きかけの一時ファイル
+    pdf.discard()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_build_with_spooling_canvas_matches_normal_build(tmp_path):
+    style = getSampleStyleSheet()["Normal"]
+    texts = [f"paragraph {index} " * (index % 7 + 1) for index in range(400)]
+
+    expected_path = tmp_path / "normal.pdf"
+    SimpleDocTemplate(str(expected_path), pagesize=A4, pageCompression=0).build(
+        [Paragraph(text, style) for text in texts])
+    spooled_path = tmp_path / "spooled.pdf"
+    SimpleDocTemplate(str(spooled_path), pagesize=A4, pageCompression=0).build(
+        FlowableFeed(Paragraph(text, style) for text in texts),
+        canvasmaker=lambda *args, **kwargs: SpoolingCanvas(*args, memory_limit=0, **kwargs))
+
+    expected = _page_contents(expected_path.read_bytes())
+    assert len(expected) > 1
+    assert _page_contents(spooled_path.read_bytes()) == expected
+
+
+def test_flowable_feed_reads_ahead_only_one_batch():
+    pulled = []
+
+    def source():
+        for index in range(100):
+            pulled.append(index)
+            yield index
+
+    feed = FlowableFeed(source(), batch=8)
+    consumed = []
+    while len(feed):
+        # doc.build と同じく先頭から1つずつ取り出す
+        assert list.__len__(feed) <= 8 + 8 // 2
+        assert len(pulled) - len(consumed) <= 8 + 8 // 2
+        consumed.append(feed[0])
+        del feed[0]
+    assert consumed == list(range(100))
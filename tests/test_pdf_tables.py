@@ -0,0 +1,127 @@
+"""pdf_tables（ページ単位に分けて描画する表とセルの変換）のテスト"""
+
+import pytest
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+from pdf_tables import ChunkedTable, TableCells
+
+STYLE = ParagraphStyle("cell", fontName="Helvetica", fontSize=9, leading=11)
+TABLE_STYLE = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+    ("FONT", (0, 0), (-1, -1), "Helvetica", 9, 11),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+])
+HEADER = ["id", "name", "note"]
+
+
+def _rows(count: int) -> list:
+    # 折り返す行（高さの違う行）も混ぜる
+    return [HEADER] + [[f"r{index}", f"name {index}", "long text " * (index % 5)] for index in range(count)]
+
+
+def _text(cell) -> str:
+    return cell if isinstance(cell, str) else getattr(cell, "text", "")
+
+
+def _split_all(flowable, width: float, height: float) -> list:
+    """ChunkedTableを最後まで分割し、ページごとのTableを返す"""
+    pages = []
+    while flowable is not None:
+        flowable.wrap(width, height)
+        parts = flowable.split(width, height)
+        assert parts, "1ページに1行も収まらない"
+        pages.append(parts[0])
+        flowable = parts[1] if len(parts) > 1 else None
+    return pages
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 200])
+def test_split_covers_every_row_once(chunk_rows):
+    rows = _rows(300)
+    cells = TableCells(STYLE, 3)
+    table = ChunkedTable(rows, cells.row, TABLE_STYLE, chunk_rows=chunk_rows, plan_widths=cells.plan_widths)
+    pages = _split_all(table, 400, 250)
+
+    assert len(pages) > 1
+    body = []
+    for page in pages:
+        # 各ページの先頭は見出し行で、ページの高さに収まり、列幅はすべてのページで同じ
+        assert [_text(cell) for cell in page._cellvalues[0]] == HEADER
+        assert page.wrap(400, 250)[1] <= 250
+        assert page._colWidths == pages[0]._colWidths
+        body.extend(_text(row[0]) for row in page._cellvalues[1:])
+    assert body == [row[0] for row in rows[1:]]
+
+
+def test_split_reads_rows_lazily():
+    pulled = []
+
+    def source():
+        for row in _rows(5000):
+            pulled.append(row)
+            yield row
+
+    cells = TableCells(STYLE, 3)
+    table = ChunkedTable(source(), cells.row, TABLE_STYLE, chunk_rows=50, plan_widths=cells.plan_widths)
+    table.wrap(400, 250)
+    page, rest = table.split(400, 250)
+    # 1ページ分を作るのに、測った分（最大chunk_rows行）より先は読まない
+    assert len(pulled) <= 1 + 50 + len(page._cellvalues)
+    rest.wrap(400, 250)
+    rest.split(400, 250)
+    # 前のページの行は保持しない
+    assert table.rows._base > 1
+
+
+def test_split_waits_for_next_frame_when_header_does_not_fit():
+    cells = TableCells(STYLE, 3)
+    table = ChunkedTable(_rows(10), cells.row, TABLE_STYLE, plan_widths=cells.plan_widths)
+    table.wrap(400, 5)
+    assert table.split(400, 5) == []
+
+
+def test_chunked_table_pages_match_single_table(tmp_path):
+    rows = _rows(600)
+    cells = TableCells(STYLE, 3)
+    width = A4[0] - 144 - 12
+    col_widths = cells.plan_widths(rows, width)
+
+    def page_count(flowable) -> int:
+        doc = SimpleDocTemplate(str(tmp_path / "out.pdf"), pagesize=A4)
+        doc.build([flowable])
+        return doc.page
+
+    single = Table([cells.row(row, col_widths) for row in rows], colWidths=col_widths, repeatRows=1)
+    single.setStyle(TABLE_STYLE)
+    chunked = ChunkedTable(rows, cells.row, TABLE_STYLE, chunk_rows=40, plan_widths=cells.plan_widths)
+    assert page_count(chunked) == page_count(single)
+
+
+def test_plan_widths_fill_frame():
+    cells = TableCells(STYLE, 4)
+    rows = [["a", "wide " * 40, "", "b"]] + [["1", "x", "", "yy"]] * 10
+    widths = cells.plan_widths(rows, 400)
+    assert sum(widths) == pytest.approx(400)
+    minimum = 2 * STYLE.fontSize + cells.padding
+    assert min(widths) >= minimum - 1e-6
+    assert widths[1] == max(widths)
+
+
+def test_plan_widths_never_below_minimum():
+    # 最小幅でもフレームに収まらない列数では、表をフレームより広くする
+    cells = TableCells(STYLE, 28)
+    rows = [[f"c{index}" for index in range(28)]] + [["abc"] * 28] * 10
+    widths = cells.plan_widths(rows, 400)
+    minimum = 2 * STYLE.fontSize + cells.padding
+    assert widths == [pytest.approx(minimum)] * 28
+    assert sum(widths) > 400
+def test_cells_use_paragraph_only_when_needed():
+    cells = TableCells(STYLE, 3)
+    row = cells.row(["short", "a <b> & c", ""], [100, 100, 100])
+    assert row[0] == "short"
+    # 空白を含むセルは折り返せるようにParagraphにし、マークアップとして解釈しない
+    assert row[1].text == "a &lt;b&gt; &amp; c"
+    assert row[2] is cells.empty
@@ -0,0 +1,72 @@
+"""row_pipeline（行の受け渡しとtee()による分岐）のテスト"""
+
+import threading
+
+import pytest
+
+from row_pipeline import RowStream, drop_empty_rows, strip_cells, tee
+
+
+def _consume_in_threads(streams, timeout: float = 10) -> tuple:
+    results = [None] * len(streams)
+    errors = [None] * len(streams)
+
+    def consume(index):
+        try:
+            results[index] = list(streams[index])
+        except BaseException as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=consume, args=(index,), daemon=True) for index in range(len(streams))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout)
+        assert not thread.is_alive(), "tee() の出力が止まった"
+    return results, errors
+
+
+def test_tee_delivers_every_row_to_each_output():
+    # 出力の間に保持する行数（64 × 16）より多くの行で、遅い出力を待つ動作も確かめる
+    rows = [[str(index), f"value {index}"] for index in range(5000)]
+    outputs = tee(RowStream(iter(rows), 2), 3)
+    assert [output.width for output in outputs] == [2, 2, 2]
+
+    results, errors = _consume_in_threads(outputs)
+    assert errors == [None, None, None]
+    assert results == [rows, rows, rows]
+
+
+def test_tee_raises_reader_error_in_each_output():
+    def failing():
+        for index in range(100):
+            yield [str(index)]
+        raise ValueError("broken sheet")
+
+    outputs = tee(RowStream(failing(), 1))
+    _results, errors = _consume_in_threads(outputs)
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_closed_output_does_not_block_others():
+    rows = [[str(index)] for index in range(5000)]
+    first, second = tee(RowStream(iter(rows), 1))
+    first.close()
+    results, errors = _consume_in_threads([second])
+    assert errors == [None]
+    assert results[0] == rows
+
+
+def test_pipe_applies_stages_in_order():
+    stream = RowStream([[" a ", ""], ["", ""], ["b", " c"]], 2).pipe(drop_empty_rows, strip_cells)
+    assert stream.width == 2
+    assert stream.peek() == ["a", ""]
+    assert list(stream) == [["a", ""], ["b", "c"]]
+
+
+@pytest.mark.parametrize("rows", [[], [["x"]]])
+def test_peek_does_not_consume(rows):
+    stream = RowStream(rows, 1)
+    first = stream.peek()
+    assert first == (rows[0] if rows else None)
+    assert list(stream) == rows
@@ -0,0 +1,35 @@
+"""row_table（列ごとの番号の配列で行を保持する表）のテスト"""
+
+from row_table import RowTable
+
+
+def test_rows_of_different_lengths_are_padded():
+    table = RowTable.from_rows([["a"], ["b", "c", "d"], [], ["", "e"]])
+    assert table.width == 3
+    assert [list(row) for row in table] == [["a", "", ""], ["b", "c", "d"], ["", "", ""], ["", "e", ""]]
+    assert table[-1] == ["", "e", ""]
+    assert table[1][1:] == ["c", "d"]
+
+
+def test_equal_values_are_stored_once():
+    table = RowTable.from_rows([["same", "x"], ["same", "y"], ["x", "same"]])
+    assert table.unique_values == 3
+    assert table.column(0)[0] is table.column(0)[1]
+
+
+def test_empty_columns_have_no_array():
+    table = RowTable.from_rows([["a", "", "b"], ["c", "", "d"]])
+    assert table._columns[1] is None
+    assert table.column(1) == ["", ""]
+
+
+def test_widens_codes_past_two_bytes():
+    # 異なる値が65535個を超えると、途中の行でも番号の配列を4バイトに広げる
+    count = 70000
+    rows = [[f"u{index}", "same", f"v{index}" if index % 2 else ""] for index in range(count)]
+    table = RowTable.from_rows(rows)
+
+    assert table._typecode == "I"
+    assert all(column.typecode == "I" for column in table._columns if column is not None)
+    assert len(table) == count
+    assert [list(row) for row in table] == rows
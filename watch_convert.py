@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Excel to PDF 監視変換ツール - フォルダを監視し、保存されたExcelファイルを自動で変換する
+
+1つのプロセスが常駐し、フォント登録やライブラリの読み込みは起動時に1回だけ行う。
+フォルダは一定間隔で走査（ポーリング）し、ファイルのサイズと更新時刻が
+一定時間変わらなくなってから変換する（Excelは一時ファイルに書いてから
+名前を変更するため、書き込み途中のファイルは変換しない）。
+変換するのは変更されたファイルだけで、--all-sheets の場合は内容が
+変わったシートだけを変換し直す。
+
+例:
+    python watch_convert.py ./input -o ./output
+    python watch_convert.py ./input -r -o ./output --all-sheets --interval 2
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from batch_convert import collect_files
+from conversion_cache import ConversionCache
+from excel_to_pdf import ExcelToWordPDFConverter
+import workbook_info
+
+# 変更を検出してから、ファイルが変わらなくなるまで待つ時間（秒）
+DEFAULT_DEBOUNCE = 2.0
+# フォルダを走査する間隔（秒）
+DEFAULT_INTERVAL = 1.0
+
+
+class FolderWatcher:
+    """フォルダを監視し、変更されたExcelファイル（シート）だけを変換するクラス"""
+
+    def __init__(self, converter: ExcelToWordPDFConverter, inputs: List[str], output_dir: str,
+                 recursive: bool = False, flat: bool = False, all_sheets: bool = False,
+                 sheet_name: Optional[str] = None, debounce: float = DEFAULT_DEBOUNCE,
+                 verbose: bool = False):
+        self.converter = converter
+        self.inputs = list(inputs)
+        self.output_root = Path(output_dir)
+        self.recursive = recursive
+        self.flat = flat
+        self.all_sheets = all_sheets
+        self.sheet_name = sheet_name
+        self.debounce = debounce
+        self.verbose = verbose
+        # ファイル -> 最後に変換した時の (サイズ, 更新時刻)
+        self._converted: Dict[Path, Tuple[int, int]] = {}
+        # ファイル -> (変更を検出した時の (サイズ, 更新時刻), 検出した時刻)
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        # ファイル -> {シート名: 指紋}（最後に変換した時のシートの内容）
+        self._sheet_fingerprints: Dict[Path, Dict[str, str]] = {}
+
+    def _output_dir(self, path: Path, root: Path) -> Path:
+        if self.flat:
+            return self.output_root
+        # 入力ディレクトリからの相対パスを出力先に再現する（batch_convert.pyと同じ）
+        return self.output_root / path.parent.relative_to(root)
+
+    def poll(self, now: Optional[float] = None) -> List[Tuple[Path, Path]]:
+        """フォルダを1回走査し、書き込みが終わった変更済みファイルを (ファイル, 基準ディレクトリ) で返す"""
+        now = time.monotonic() if now is None else now
+        ready = []
+        seen = set()
+        for path, root in collect_files(self.inputs, self.recursive):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # 走査中に削除・名前変更された
+            signature = (stat.st_size, stat.st_mtime_ns)
+            seen.add(path)
+            if self._converted.get(path) == signature:
+                self._pending.pop(path, None)
+                continue
+
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                # 新しい変更：ファイルが変わらなくなるまで待つ
+                self._pending[path] = (signature, now)
+            elif now - pending[1] >= self.debounce and _is_complete(path):
+                ready.append((path, root))
+
+        # 削除されたファイルの状態を破棄する
+        for path in list(self._converted):
+            if path not in seen:
+                del self._converted[path]
+                self._sheet_fingerprints.pop(path, None)
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+        return ready
+
+    def _changed_sheets(self, path: Path) -> Tuple[List[str], Dict[str, str]]:
+        """前回の変換から内容が変わったシートと、現在の指紋を返す
+
+        --sheet で指定したシートがブックにない場合はValueErrorを送出する
+        （変換エラーとして表示し、次に保存されるまで再試行しない）。
+        """
+        fingerprints = workbook_info.sheet_fingerprints(str(path))
+        previous = self._sheet_fingerprints.get(path, {})
+        if self.all_sheets:
+            names = list(fingerprints)
+        elif self.sheet_name in fingerprints:
+            names = [self.sheet_name]
+        else:
+            raise ValueError(f"シート '{self.sheet_name}' が見つかりません（シート: {', '.join(fingerprints)}）")
+        return [name for name in names if previous.get(name) != fingerprints[name]], fingerprints
+
+    def convert_file(self, path: Path, root: Path) -> List[str]:
+        """1つのファイルを変換し、変換したシート名のリストを返す（アクティブシートの場合は [None]）"""
+        signature = (path.stat().st_size, path.stat().st_mtime_ns)
+        output_dir = self._output_dir(path, root)
+
+        if self.all_sheets or self.sheet_name:
+            sheets, fingerprints = self._changed_sheets(path)
+            if sheets:
+                self.converter.convert_workbook(str(path), str(output_dir), sheets)
+            self._sheet_fingerprints[path] = fingerprints
+        else:
+            # アクティブシートはブックを保存するたびに変わりうるため、ファイル単位で変換する
+            sheets = [None]
+            self.converter.convert(str(path), str(output_dir))
+
+        self._converted[path] = signature
+        self._pending.pop(path, None)
+        return sheets
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """1回走査して変換し、変換したファイル数を返す"""
+        converted = 0
+        for path, root in self.poll(now):
+            started = time.perf_counter()
+            stamp = datetime.now().strftime("%H:%M:%S")
+            try:
+                if self.verbose:
+                    sheets = self.convert_file(path, root)
+                else:
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        sheets = self.convert_file(path, root)
+            except Exception as e:
+                # 壊れたファイルなどは、次に保存されるまで再試行しない
+                print(f"[{stamp}] ❌ {path}: {e}")
+                try:
+                    self._converted[path] = (path.stat().st_size, path.stat().st_mtime_ns)
+                except OSError:
+                    pass
+                self._pending.pop(path, None)
+                continue
+
+            duration = time.perf_counter() - started
+            if sheets == [None]:
+                print(f"[{stamp}] ✅ {path} ({duration:.1f}秒)")
+            elif sheets:
+                print(f"[{stamp}] ✅ {path} [{', '.join(sheets)}] ({duration:.1f}秒)")
+            else:
+                print(f"[{stamp}] ― {path}（変更されたシートはありません）")
+            converted += 1
+        return converted
+
+    def run(self, interval: float = DEFAULT_INTERVAL, stop_event: Optional[threading.Event] = None):
+        """stop_eventがセットされるまで（またはCtrl+Cまで）監視を続ける"""
+        stop_event = stop_event or threading.Event()
+        try:
+            while not stop_event.is_set():
+                self.run_once()
+                stop_event.wait(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def _is_complete(path: Path) -> bool:
+    """書き込みが終わったファイルかどうか（zipとして開けるか）を確認する"""
+    if path.suffix.lower() == ".xls":
+        return True
+    try:
+        # 書き込み途中のファイルは末尾の中央ディレクトリがないため開けない
+        with zipfile.ZipFile(path):
+            return True
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='フォルダを監視し、保存されたExcelファイルを自動でPDF（Word）に変換します')
+    parser.add_argument('inputs', nargs='+', help='監視するディレクトリ（ファイルやglobパターンも可）')
+    parser.add_argument('-o', '--output', required=True, help='出力ディレクトリ')
+    parser.add_argument('-r', '--recursive', action='store_true', help='サブディレクトリも監視する')
+    parser.add_argument('--flat', action='store_true',
+                        help='出力先にサブディレクトリ構成を再現せず、すべて同じディレクトリに出力する')
+    sheet_group = parser.add_mutually_exclusive_group()
+    sheet_group.add_argument('--all-sheets', action='store_true', help='すべてのシートを変換する（変更されたシートのみ）')
+    sheet_group.add_argument('--sheet', help='変換するシート名（省略時はアクティブシート）')
+    parser.add_argument('--columns', default='B',
+                        help='変換する列（カンマ区切り、例: B / A,C / C:F / ALL）デフォルト: B')
+    parser.add_argument('--format', choices=['pdf', 'docx', 'both'], default='pdf',
+                        help='出力形式（デフォルト: pdf）')
+    parser.add_argument('--table', action='store_true', help='通常モード（表形式）で出力する（デフォルトはテキストのみ）')
+    parser.add_argument('--font', default='HeiseiKakuGo-W5', help='PDFのフォント（CIDフォント名）デフォルト: HeiseiKakuGo-W5')
+    parser.add_argument('--font-size', type=float, default=10, help='PDFの文字サイズ（ポイント）デフォルト: 10')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'フォルダを走査する間隔（秒）デフォルト: {DEFAULT_INTERVAL}')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help=f'保存後、ファイルが変わらなくなってから変換するまでの待ち時間（秒）デフォルト: {DEFAULT_DEBOUNCE}')
+    parser.add_argument('--no-cache', action='store_true', help='変換結果のキャッシュを使わない')
+    parser.add_argument('-v', '--verbose', action='store_true', help='変換の詳細メッセージを表示する')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """メイン関数（終了コードを返す）"""
+    args = parse_args(argv)
+
+    selected_columns = [col.strip().upper() for col in args.columns.split(",") if col.strip()] or ["B"]
+    converter = ExcelToWordPDFConverter(
+        text_only=not args.table,
+        selected_columns=selected_columns,
+        outputs=['docx', 'pdf'] if args.format == 'both' else [args.format],
+        font_name=args.font,
+        font_size=args.font_size,
+        leading=args.font_size * 1.2,
+        cache=None if args.no_cache else ConversionCache(),
+    )
+    # フォント登録とライブラリの読み込みは最初の保存を待たずに済ませておく
+    converter.preload()
+
+    watcher = FolderWatcher(
+        converter, args.inputs, args.output, recursive=args.recursive, flat=args.flat,
+        all_sheets=args.all_sheets, sheet_name=args.sheet, debounce=args.debounce,
+        verbose=args.verbose,
+    )
+    print(f"👀 監視を開始しました: {', '.join(args.inputs)} → {args.output}（Ctrl+Cで終了）")
+    watcher.run(args.interval)
+    print("\n監視を終了しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Excelファイル（.xlsx/.xlsm）のメタデータをセルデータを読み込まずに取得するモジュール
+
+シート一覧は xl/workbook.xml から、シートの範囲は各シートXMLの先頭にある
+<dimension> 要素から読み取るため、シートの大きさに関係なく高速に動作する。
+"""
+
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, List, Optional
+
+from column_projection import column_index_from_string
+
+# 関係（リレーションシップ）の種類
+OFFICE_DOCUMENT_REL = "/officeDocument"
+
+# "A1" / "$A$1" 形式のセル参照
+_CELL_REF_RE = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+# シートXMLのセル要素（<c r="B12" ...>）と列文字（r属性のないセルでは空）
+_CELL_COLUMN_RE = re.compile(rb"<(?:[\w.-]+:)?c(?:\s[^>]*?\br=[\"']([A-Z]{1,3})[0-9]|[\s>/])")
+
+
+def _local_name(tag: str) -> str:
+    """名前空間を除いたタグ名・属性名を返す（Strict形式のOOXMLにも対応するため）"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _get_attr(element, name: str) -> Optional[str]:
+    """名前空間に関係なく属性値を取得する"""
+    for key, value in element.attrib.items():
+        if _local_name(key) == name:
+            return value
+    return None
+
+
+def _read_relationships(archive: zipfile.ZipFile, part_path: str) -> dict:
+    """パーツに対応する .rels を読み、{Id: (Type, 絶対パス)} を返す"""
+    directory, filename = posixpath.split(part_path)
+    rels_path = posixpath.join(directory, "_rels", f"{filename}.rels")
+    try:
+        root = ET.fromstring(archive.read(rels_path))
+    except KeyError:
+        return {}
+
+    relationships = {}
+    for rel in root:
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        relationships[rel.get("Id")] = (rel.get("Type", ""), target)
+    return relationships
+
+
+def _find_workbook_part(archive: zipfile.ZipFile) -> str:
+    """パッケージのルート関係からワークブックのパーツパスを探す"""
+    for rel_type, target in _read_relationships(archive, "").values():
+        if rel_type.endswith(OFFICE_DOCUMENT_REL):
+            return target
+    return "xl/workbook.xml"
+
+
+def _read_dimension(archive: zipfile.ZipFile, sheet_path: str) -> Optional[str]:
+    """シートXMLの先頭だけを読み、<dimension ref="..."> の値を返す"""
+    try:
+        source = archive.open(sheet_path)
+    except KeyError:
+        return None
+
+    with source:
+        for _event, element in ET.iterparse(source, events=("start",)):
+            tag = _local_name(element.tag)
+            if tag == "dimension":
+                return element.get("ref")
+            if tag == "sheetData":
+                # dimension要素がない場合はセルデータの手前で打ち切る
+                return None
+    return None
+
+
+def scan_max_column(source: BinaryIO, chunk_size: int = 1 << 20) -> Optional[int]:
+    """シートXMLのセル要素から、セルのある最大の列番号（1始まり）を求める
+
+    <dimension> は作成したアプリによっては正しくない（"A1" だけなど）ため、
+    セルの r 属性（"B12" など）を直接調べる。展開しながら正規表現で探すだけなので、
+    openpyxlで行を読むよりはるかに速い。セルがない場合は0、r 属性を省略した
+    セルがある場合は列が分からないためNoneを返す。
+    """
+    best = b""
+    tail = b""
+    while True:
+        chunk = source.read(chunk_size)
+        data = tail + chunk
+        if chunk:
+            # 最後の要素は途中で切れているかもしれないため、次のまとまりと合わせて調べる
+            cut = max(data.rfind(b"<"), 0)
+            data, tail = data[:cut], data[cut:]
+        for letters in set(_CELL_COLUMN_RE.findall(data)):
+            if not letters:
+                return None
+            if (len(letters), letters) > (len(best), best):
+                best = letters
+        if not chunk:
+            break
+    return column_index_from_string(best.decode("ascii")) if best else 0
+
+
+def _range_boundaries(ref: str):
+    """"A1:D200" 形式の範囲を (min_col, min_row, max_col, max_row) に変換する"""
+    start, _sep, end = ref.partition(":")
+    bounds = []
+    for cell in (start, end or start):
+        match = _CELL_REF_RE.match(cell.strip())
+        if not match:
+            raise ValueError(f"無効な範囲です: {ref}")
+        bounds.append((column_index_from_string(match.group(1)), int(match.group(2))))
+    (min_col, min_row), (max_col, max_row) = bounds
+    return min_col, min_row, max_col, max_row
+
+
+class SheetInfo:
+    """シートのメタデータ"""
+
+    def __init__(self, name: str, state: str = "visible", dimension: Optional[str] = None):
+        self.name = name
+        self.state = state  # visible / hidden / veryHidden
+        self.dimension = dimension  # 例: "A1:D200"（取得できない場合はNone）
+
+    @property
+    def visible(self) -> bool:
+        return self.state == "visible"
+
+    @property
+    def max_row(self) -> Optional[int]:
+        bounds = self._bounds()
+        return bounds[3] if bounds else None
+
+    @property
+    def max_column(self) -> Optional[int]:
+        bounds = self._bounds()
+        return bounds[2] if bounds else None
+
+    def _bounds(self):
+        if not self.dimension:
+            return None
+        try:
+            return _range_boundaries(self.dimension)
+        except ValueError:
+            return None
+
+    def __repr__(self):
+        return f"SheetInfo(name={self.name!r}, state={self.state!r}, dimension={self.dimension!r})"
+
+
+def list_sheets(excel_path: str, with_dimensions: bool = False) -> List[SheetInfo]:
+    """ワークブック内のシート情報をブック内の順序で返す
+
+    with_dimensions=Trueの場合は各シートの範囲（dimension）も読み取る。
+    """
+    with zipfile.ZipFile(excel_path) as archive:
+        workbook_part = _find_workbook_part(archive)
+        root = ET.fromstring(archive.read(workbook_part))
+        relationships = _read_relationships(archive, workbook_part) if with_dimensions else {}
+
+        sheets = []
+        for element in root.iter():
+            if _local_name(element.tag) != "sheet":
+                continue
+            info = SheetInfo(element.get("name"), element.get("state", "visible"))
+            if with_dimensions:
+                rel = relationships.get(_get_attr(element, "id"))
+                if rel is not None:
+                    info.dimension = _read_dimension(archive, rel[1])
+            sheets.append(info)
+        return sheets
+
+
+def get_sheet_names(excel_path: str) -> List[str]:
+    """ワークブック内のシート名のリストを返す"""
+    return [info.name for info in list_sheets(excel_path)]
+
+
+# シートの値に影響する、ワークブック全体で共有されるパーツ
+_SHARED_PART_TYPES = ("/sharedStrings", "/styles")
+
+
+def sheet_fingerprints(excel_path: str) -> Dict[str, str]:
+    """シートごとの変更検出用の指紋を {シート名: 指紋} で返す
+
+    zipの中央ディレクトリにある各パーツのCRC32だけを使うため、データを
+    展開せずに計算できる。シートのXMLに加えて共有文字列（sharedStrings）と
+    スタイル（日付などの表示形式）も指紋に含めるため、これらが変わった
+    場合はすべてのシートの指紋が変わる。
+    """
+    with zipfile.ZipFile(excel_path) as archive:
+        crcs = {info.filename: info.CRC for info in archive.infolist()}
+        workbook_part = _find_workbook_part(archive)
+        root = ET.fromstring(archive.read(workbook_part))
+        relationships = _read_relationships(archive, workbook_part)
+
+    shared = "-".join(
+        f"{crcs.get(target, 0):08x}"
+        for rel_type, target in sorted(relationships.values())
+        if rel_type.endswith(_SHARED_PART_TYPES)
+    )
+    fingerprints = {}
+    for element in root.iter():
+        if _local_name(element.tag) != "sheet":
+            continue
+        rel = relationships.get(_get_attr(element, "id"))
+        sheet_crc = crcs.get(rel[1], 0) if rel is not None else 0
+        fingerprints[element.get("name")] = f"{sheet_crc:08x}-{shared}"
+    return fingerprints